@@ -0,0 +1,44 @@
+"""
+Valvoline Weather Analytics — LLM Answer Cache Keys
+
+Managers ask the same few questions about the same store many times a
+day, and each one used to cost a full llama3.1 generation. Answers are
+cached (in a ForecastCache: TTL, size bound, single-flight) under
+
+    (store_id, digest of the system prompt, normalized conversation)
+
+The system prompt carries the store profile, today's date and the live
+7-day forecast, so a new forecast snapshot or a new day changes the
+digest and old answers stop matching; they age out by TTL and size.
+Normalization only removes differences that cannot change the answer:
+case, whitespace, quote style and trailing punctuation.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+DEFAULT_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_ENTRIES = 1024
+
+_QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"'})
+
+
+def normalize_message(text):
+    """'  How will RAIN affect this week?? ' → 'how will rain affect this week'."""
+    text = unicodedata.normalize('NFKC', text or '').translate(_QUOTES).lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.rstrip(' ?!.')
+
+
+def prompt_digest(system_prompt):
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:32]
+
+
+def answer_key(store_id, system_prompt, conversation):
+    """
+    Cache key for an answer. conversation is the list of user/assistant
+    messages ({'role', 'content'}) after the system prompt.
+    """
+    turns = tuple((m['role'], normalize_message(m['content'])) for m in conversation)
+    return (store_id, prompt_digest(system_prompt), turns)
@@ -6,30 +6,57 @@ Run with:
     uvicorn api:app --host 0.0.0.0 --port 8000 --reload
 
 Endpoints:
-    POST /v1/chat/completions → OpenAI-compatible (for OpenWebUI)
+    POST /v1/chat/completions → OpenAI-compatible (for OpenWebUI), SSE when stream=true
     GET  /v1/models           → OpenAI-compatible model list
     POST /predict/impact      → weather impact % forecast
     POST /predict/7days       → 7-day OC forecast
     POST /predict/historical  → historical store weather profile
     POST /predict/chat        → natural language query handler
+    GET  /predict/fleet/week/{start_date} → 7-day forecast for every store (NDJSON)
+    POST /weather/warm        → prefetch every store's forecast into the cache
+    POST /forecasts/refresh   → rebuild the precomputed forecast table now
+    GET  /stats/prompts       → per-store prompt size, token and timing stats
     GET  /stores              → list all stores
     GET  /health              → health check
 """
 
+import os
 import pickle
 import re
-import numpy as np
 import pandas as pd
-import holidays
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, List
 from functools import lru_cache
-from fastapi import FastAPI, HTTPException
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-import requests
+import httpx
 from pathlib import Path
 
+from snapshot import SNAPSHOT_DIRNAME, load_snapshot, snapshot_is_current
+from shared_models import (MODEL_GROUPS, SHARED_MODELS_DIRNAME, load_shared_metadata, load_shared_models,
+                           shared_models_are_current)
+from store_profiles import DOW_NAMES, build_store_profiles
+from answer_cache import DEFAULT_MAX_ENTRIES as ANSWER_CACHE_SIZE, DEFAULT_TTL_SECONDS as ANSWER_CACHE_TTL, answer_key
+from forecast_cache import DEFAULT_TTL_SECONDS, ForecastCache, forecast_key
+from http_clients import UpstreamClients, UpstreamConfig
+from intent_router import match_intent, render_answer
+from llm_queue import DEFAULT_QUEUE_DEPTH, DEFAULT_WAIT_SECONDS, AdmissionQueue, QueueRejected, parse_priority
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware, observe_stage, stage
+from llm_usage import SORT_KEYS as PROMPT_SORT_KEYS, PromptStats, ollama_usage
+from profiling import DEFAULT_SAMPLE_INTERVAL, ProfileMiddleware
+from precompute import DEFAULT_INTERVAL_SECONDS as PRECOMPUTE_DEFAULT_INTERVAL, Precomputer
+from forward_batch import ForwardBatchPredictor, compile_label_encoders, weather_arrays
+from holiday_calendar import to_days
+from weather_classes import classify_weather_arrays, wx_types
+from weather_fetch import BATCH_SIZE as WEATHER_BATCH_SIZE, fetch_forecasts
+
 # ════════════════════════════════════════════════
 # PATHS
 # ════════════════════════════════════════════════
@@ -56,8 +83,26 @@ else:
 # LOAD MODELS
 # ════════════════════════════════════════════════
 print('Loading models...')
-with open(MODEL_PATH, 'rb') as f:
-    models = pickle.load(f)
+
+# SHARED_MODELS=1 serves both model trios from memory-mapped arrays
+# (scripts/build_shared_models.py) that all workers share. Features and
+# label encoders come from the export's manifest, so the boosters in the
+# pickle are never unpickled.
+SHARED_MODELS      = os.environ.get('SHARED_MODELS', '0').lower() in ('1', 'true', 'yes')
+shared_models_path = Path(MODEL_PATH).parent / SHARED_MODELS_DIRNAME
+shared_models      = None
+models             = None
+if SHARED_MODELS:
+    if shared_models_are_current(shared_models_path, MODEL_PATH):
+        shared_models = load_shared_models(shared_models_path)
+        models        = dict.fromkeys(key for keys, _ in MODEL_GROUPS.values() for key in keys)
+        models.update(load_shared_metadata(shared_models_path))
+        print(f'  Using shared models {shared_models_path}')
+    else:
+        print(f'  Shared models {shared_models_path} missing or stale — serving per-process boosters')
+if models is None:
+    with open(MODEL_PATH, 'rb') as f:
+        models = pickle.load(f)
 
 model_B        = models['model_B_oc_regression']
 model_Q05      = models['model_Q05_lower_bound']
@@ -69,13 +114,26 @@ FEATURES       = models['features']
 FWD_FEATURES   = models['forward_features']
 CATEGORICALS   = models['categoricals']
 label_encoders = models['label_encoders']
+encoder_tables = compile_label_encoders(label_encoders)
 print('Models loaded')
 
 # ════════════════════════════════════════════════
 # LOAD DATA
 # ════════════════════════════════════════════════
+def load_processed_data():
+    """Prefer the memory-mapped snapshot (scripts/build_snapshot.py) over parsing the CSV."""
+    csv_path      = Path(DATA_PATH) / 'processed_data.csv'
+    snapshot_path = Path(DATA_PATH) / SNAPSHOT_DIRNAME
+    if snapshot_is_current(snapshot_path, csv_path):
+        print(f'  Using snapshot {snapshot_path}')
+        return load_snapshot(snapshot_path)
+    if snapshot_path.exists():
+        print(f'  Snapshot {snapshot_path} is stale — falling back to CSV')
+    return pd.read_csv(csv_path, parse_dates=['invoice_date'])
+
+
 print('Loading data...')
-df = pd.read_csv(f'{DATA_PATH}/processed_data.csv', parse_dates=['invoice_date'])
+df = load_processed_data()
 print(f'  Data loaded — {len(df):,} rows, {df["store_id"].nunique()} stores')
 
 store_info_df = pd.read_csv(STORE_INFO)
@@ -98,18 +156,19 @@ store_typical_oc_lookup = (
     .median().to_dict()
 )
 
+# Static per-store attributes: one O(1) lookup instead of a scan of df
+store_profiles  = build_store_profiles(df, store_dow_baseline_lookup)
+store_row_index = df.groupby('store_id').indices
+print(f'  Store profiles built — {len(store_profiles)} stores')
+
 # ════════════════════════════════════════════════
 # CACHED HELPER FUNCTIONS
 # Safe to cache — training data never changes at runtime
 # ════════════════════════════════════════════════
 
-@lru_cache(maxsize=500)
 def get_store_dow_baseline(store_id, dow):
-    key = (store_id, dow)
-    if key in store_dow_baseline_lookup:
-        return float(store_dow_baseline_lookup[key])
-    rows = df[df['store_id'] == store_id]['store_dow_baseline']
-    return float(rows.mean()) if len(rows) > 0 else 45.0
+    profile = store_profiles.get(store_id)
+    return profile.dow_baseline[dow] if profile else 45.0
 
 
 @lru_cache(maxsize=5000)
@@ -123,14 +182,14 @@ def get_typical_oc(store_id, dow, month):
 @lru_cache(maxsize=500)
 def get_historical_impact(store_id):
     """Returns tuple of tuples (hashable) for lru_cache."""
-    store_rows = df[df['store_id'] == store_id]
-    if len(store_rows) == 0:
+    rows = store_row_index.get(store_id)
+    if rows is None:
         return None
 
-    store_data = df[
-        (df['store_id'] == store_id) &
-        (df['is_abnormal_day'] == 0) &
-        (df['oc_count'] > 0)
+    store_rows = df.iloc[rows]
+    store_data = store_rows[
+        (store_rows['is_abnormal_day'] == 0) &
+        (store_rows['oc_count'] > 0)
     ]
     normal_avg = store_data[store_data['severity'] == 0]['oc_count'].mean()
 
@@ -201,240 +260,149 @@ WX_LABELS = {
 }
 
 
-def classify_weather(tavg, prcp, snow, wspd):
-    has_heavy_rain = prcp > 10
-    has_rain       = prcp > 0.1
-    has_heavy_snow = snow > 150 and tavg <= 2
-    has_snow       = snow > 0   and tavg <= 2
-    is_freezing    = tavg <= 0
-    is_very_cold   = 0  < tavg <= 7
-    is_hot         = 27 < tavg <= 35
-    has_high_wind  = wspd > 30
-    severity = 0
-    if is_freezing:    severity += 2
-    elif is_very_cold: severity += 1
-    if has_heavy_snow: severity += 2
-    elif has_snow:     severity += 1
-    if has_heavy_rain: severity += 1
-    if has_high_wind:  severity += 1
-    if severity >= 3:  return 'severe'
-    if has_heavy_snow: return 'heavy_snow'
-    if has_snow:       return 'any_snow'
-    if has_heavy_rain: return 'heavy_rain'
-    if has_rain:       return 'light_rain'
-    if has_high_wind:  return 'high_wind'
-    if is_freezing:    return 'freezing'
-    if is_very_cold:   return 'very_cold'
-    if is_hot:         return 'hot'
-    return 'clear'
-
-
-def get_weather_forecast(store_id, days=7):
-    """Fetch real weather forecast via Open-Meteo. Free, no API key needed."""
+# Open-Meteo responses are shared across requests for WEATHER_CACHE_TTL seconds
+weather_cache = ForecastCache(ttl=float(os.environ.get('WEATHER_CACHE_TTL', DEFAULT_TTL_SECONDS)))
+
+# Pooled async clients for Open-Meteo and Ollama (see http_clients.py)
+upstream = UpstreamClients(UpstreamConfig.open_meteo(), UpstreamConfig.ollama(OLLAMA_PATH))
+
+
+async def get_weather_forecast(store_id, days=7):
+    """Fetch real weather forecast via Open-Meteo (cached). Free, no API key needed."""
     if store_id not in store_coords:
         return None
     lat = store_coords[store_id]['store_latitude']
     lon = store_coords[store_id]['store_longitude']
+
+    async def fetch():
+        return await fetch_one_forecast(lat, lon, days=days)
+
     try:
-        url = (
-            f"https://api.open-meteo.com/v1/forecast?"
-            f"latitude={lat}&longitude={lon}"
-            f"&daily=temperature_2m_max,temperature_2m_min,"
-            f"temperature_2m_mean,precipitation_sum,snowfall_sum,"
-            f"windspeed_10m_max"
-            f"&timezone=auto"
-            f"&forecast_days={days}"
-        )
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()['daily']
-        forecast = []
-        for i in range(min(days, len(data['time']))):
-            forecast.append({
-                'date': data['time'][i],
-                'tavg': float(data['temperature_2m_mean'][i] or 15.0),
-                'tmin': float(data['temperature_2m_min'][i]  or 10.0),
-                'tmax': float(data['temperature_2m_max'][i]  or 20.0),
-                'prcp': float(data['precipitation_sum'][i]   or 0.0),
-                'snow': float((data['snowfall_sum'][i] or 0.0) * 10),
-                'wspd': float(data['windspeed_10m_max'][i]   or 0.0),
-            })
-        return forecast
+        with stage('weather_fetch'):
+            forecast = await weather_cache.get_or_fetch_async(forecast_key(lat, lon, 'days', days), fetch)
     except Exception as e:
         print(f'Weather forecast error for store {store_id}: {e}')
         return None
+    return [dict(day) for day in forecast]
+
+
+async def get_weather_week(store_id, start_date, days=7):
+    """
+    Daily weather for start_date .. start_date + days - 1 via Open-Meteo (cached).
+    Raises on network or upstream errors; callers decide how to report them.
+    """
+    lat   = store_coords[store_id]['store_latitude']
+    lon   = store_coords[store_id]['store_longitude']
+    start = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+    end   = (pd.Timestamp(start_date) + pd.Timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+    async def fetch():
+        return await fetch_one_forecast(lat, lon, start=start, end=end)
+
+    with stage('weather_fetch'):
+        forecast = await weather_cache.get_or_fetch_async(forecast_key(lat, lon, 'range', start, end), fetch)
+    return [dict(day) for day in forecast]
+
+
+async def fetch_one_forecast(lat, lon, days=None, start=None, end=None):
+    result = (await fetch_forecasts(upstream.weather, [(lat, lon)], days, start, end))[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+async def warm_weather_cache(store_ids=None, days=None, start=None, end=None, errors=None):
+    """
+    Fill weather_cache for many stores with batched multi-location
+    Open-Meteo calls (rolling `days` horizon or fixed start..end range).
+    Locations already cached are skipped. Returns counts; if an `errors`
+    dict is passed, each failed location's cache key maps to its exception.
+    """
+    store_ids = [s for s in (store_profiles if store_ids is None else store_ids) if s in store_coords]
+    horizon   = ('days', days) if days is not None else ('range', start, end)
+    missing   = {}
+    for s in store_ids:
+        lat = store_coords[s]['store_latitude']
+        lon = store_coords[s]['store_longitude']
+        key = forecast_key(lat, lon, *horizon)
+        if key not in missing and not weather_cache.contains(key):
+            missing[key] = (lat, lon)
+
+    results = await fetch_forecasts(upstream.weather, list(missing.values()), days, start, end)
+    failed  = 0
+    for key, forecast in zip(missing, results):
+        if isinstance(forecast, Exception):
+            failed += 1
+            if errors is not None:
+                errors[key] = forecast
+        else:
+            weather_cache.put(key, forecast)
+    if failed:
+        print(f'Weather warm-up: {failed} of {len(missing)} locations failed')
+    return {
+        'stores'   : len(store_ids),
+        'locations': len(missing),
+        'fetched'  : len(missing) - failed,
+        'failed'   : failed,
+        'calls'    : -(-len(missing) // WEATHER_BATCH_SIZE),
+    }
 
 
-def predict_day_forward(store_id, forecast_date, weather):
-    date  = pd.Timestamp(forecast_date)
-    dow   = date.dayofweek
-    month = date.month
+# Vectorised forward model — one fused model call for any number of store-days
+forward_batch = ForwardBatchPredictor(
+    shared_models['model_FWD_interval'] if shared_models else (model_FWD, model_FWD_Q05, model_FWD_Q95),
+    FWD_FEATURES,
+    encoder_tables, store_profiles, get_typical_oc,
+)
 
-    store_rows = df[df['store_id'] == store_id]
-    if len(store_rows) == 0:
-        return None
-    store_info = store_rows.iloc[0]
-    typical_oc = get_typical_oc(store_id, dow, month)
-
-    tavg = float(weather.get('tavg', 15))
-    prcp = float(weather.get('prcp', 0))
-    snow = float(weather.get('snow', 0))
-    wspd = float(weather.get('wspd', 0))
-    tmin = float(weather.get('tmin', tavg - 5))
-    tmax = float(weather.get('tmax', tavg + 5))
-
-    is_freezing     = int(tavg <= 0)
-    is_very_cold    = int(0  < tavg <= 7)
-    is_cold         = int(7  < tavg <= 16)
-    is_comfortable  = int(16 < tavg <= 27)
-    is_hot          = int(27 < tavg <= 35)
-    is_extreme_heat = int(tavg > 35)
-    has_rain        = int(prcp > 0.1)
-    has_heavy_rain  = int(prcp > 10)
-    has_snow        = int(snow > 0   and tavg <= 2)
-    has_heavy_snow  = int(snow > 150 and tavg <= 2)
-    has_high_wind   = int(wspd > 30)
-
-    severity = 0
-    if is_freezing or is_extreme_heat: severity += 2
-    elif is_very_cold or is_hot:       severity += 1
-    if has_heavy_snow:   severity += 2
-    elif has_snow:       severity += 1
-    if has_heavy_rain:   severity += 1
-    if has_high_wind:    severity += 1
-    severity = min(severity, 4)
-
-    ts      = date
-    month_n = ts.month
-    day     = ts.day
-    us_hols               = holidays.US(years=[ts.year])
-    is_holiday            = int(ts in us_hols)
-    is_day_before_holiday = int((ts + pd.Timedelta(days=1)) in us_hols)
-    is_day_after_holiday  = int((ts - pd.Timedelta(days=1)) in us_hols)
-    is_thanksgiving_week  = int(month_n == 11 and 25 <= day <= 26)
-    is_christmas_week     = int(month_n == 12 and 24 <= day <= 26)
-    is_newyear_week       = int(month_n ==  1 and  1 <= day <=  2)
-    is_july4_week         = int(month_n ==  7 and  3 <= day <=  5)
-    is_laborday_week      = int(month_n ==  9 and  1 <= day <=  2)
-    is_memday_week        = int(month_n ==  5 and 27 <= day <= 28)
-    is_blackfriday_week   = int(month_n == 11 and 25 <= day <= 26)
-
-    # ── FIX 1: p_abnormal matches training data (0.0 for normal days) ──
-    p_abn = 0.0
-    if (is_holiday or is_thanksgiving_week or is_christmas_week or
-            is_newyear_week or is_day_after_holiday):
-        p_abn = 0.7
-    if is_christmas_week and is_day_before_holiday:
-        p_abn = 1.0
-
-    s_bay     = int(store_info.get('bay_count', 3))
-    s_market  = store_info.get('market_id', 0)
-    s_area    = store_info.get('area_id', 0)
-    s_region  = store_info.get('region_id', 0)
-    s_mktarea = store_info.get('marketing_area_id', 0)
-    s_tz      = store_info.get('tz_code', 0)
-    s_sun     = int(store_info.get('is_sunday_closed_store', 0))
-    s_fleet   = float(store_info.get('store_fleet_dependency', 0.067))
-    s_area_oc = float(store_info.get('area_avg_oc', 45))
-    s_mkt_oc  = float(store_info.get('market_avg_oc', 45))
-    s_vs_area = float(store_info.get('store_vs_area_demand', 1.0))
-    s_vs_mkt  = float(store_info.get('store_vs_market_demand', 1.0))
-    s_rain    = float(store_info.get('store_rain_sensitivity', 0.947))
-    s_snow    = float(store_info.get('store_snow_sensitivity', 0.960))
-    s_vol     = float(store_info.get('store_dow_volatility', 5.0))
-    s_growth  = float(store_info.get('store_growth_rate', 1.0))
-
-    feat = {
-        'dow': dow, 'month': month_n, 'year': date.year,
-        'day_of_year': date.dayofyear,
-        'week_of_year': date.isocalendar()[1],
-        'quarter': date.quarter,
-        'is_weekend': int(dow >= 5), 'is_monday': int(dow == 0),
-        'is_friday': int(dow == 4), 'is_saturday': int(dow == 5),
-        'is_holiday': is_holiday,
-        'is_day_before_holiday': is_day_before_holiday,
-        'is_day_after_holiday': is_day_after_holiday,
-        'is_thanksgiving_week': is_thanksgiving_week,
-        'is_christmas_week': is_christmas_week,
-        'is_newyear_week': is_newyear_week,
-        'is_july4_week': is_july4_week,
-        'is_laborday_week': is_laborday_week,
-        'is_memday_week': is_memday_week,
-        'is_blackfriday_week': is_blackfriday_week,
-        'tavg': tavg, 'tmin': tmin, 'tmax': tmax,
-        'temp_range': tmax - tmin,
-        'prcp': prcp, 'snow': snow, 'wspd': wspd,
-        'is_freezing': is_freezing, 'is_very_cold': is_very_cold,
-        'is_cold': is_cold, 'is_comfortable': is_comfortable,
-        'is_hot': is_hot, 'is_extreme_heat': is_extreme_heat,
-        'has_rain': has_rain, 'has_heavy_rain': has_heavy_rain,
-        'has_snow': has_snow, 'has_heavy_snow': has_heavy_snow,
-        'has_high_wind': has_high_wind, 'severity': severity,
-        'bay_count': s_bay, 'market_id': s_market,
-        'area_id': s_area, 'region_id': s_region,
-        'marketing_area_id': s_mktarea, 'tz_code': s_tz,
-        'is_sunday_closed_store': s_sun,
-        'store_dow_baseline': typical_oc,
-        'area_avg_oc': s_area_oc, 'market_avg_oc': s_mkt_oc,
-        'store_vs_area_demand': s_vs_area,
-        'store_vs_market_demand': s_vs_mkt,
-        'store_fleet_dependency': s_fleet,
-        'temp_x_market': tavg * s_market,
-        'rain_x_market': prcp * s_market,
-        'snow_x_market': snow * s_market,
-        'sev_x_market': severity * s_market,
-        'temp_x_region': tavg * s_region,
-        'snow_x_region': snow * s_region,
-        'rain_x_region': prcp * s_region,
-        'sev_x_region': severity * s_region,
-        'fleet_dep_x_sev': s_fleet * severity,
-        'fleet_dep_x_snow': s_fleet * has_heavy_snow,
-        'fleet_dep_x_rain': s_fleet * has_heavy_rain,
-        'bay_x_severity': s_bay * severity,
-        'store_rain_sensitivity': s_rain,
-        'store_snow_sensitivity': s_snow,
-        'store_dow_volatility': s_vol,
-        'store_growth_rate': s_growth,
-        'p_abnormal': p_abn,
-        # ── FIX 2: pre-storm features explicitly set ──
-        'next_day_heavy_rain': 0,
-        'next_day_heavy_snow': 0,
-    }
 
-    for col, le in label_encoders.items():
-        if col in feat:
-            try:
-                feat[col] = int(le.transform([str(int(feat[col]))])[0])
-            except:
-                feat[col] = 0
-
-    row_fwd = pd.DataFrame([feat]).reindex(columns=FWD_FEATURES, fill_value=0)
-    pred  = float(np.maximum(model_FWD.predict(row_fwd)[0],     0))
-    # ── FIX 3: ensure predicted always within bounds ──
-    lower = float(min(np.maximum(model_FWD_Q05.predict(row_fwd)[0], 0), pred))
-    upper = float(max(np.maximum(model_FWD_Q95.predict(row_fwd)[0], 0), pred))
-    pct   = ((pred - typical_oc) / typical_oc * 100) if typical_oc else 0
-
-    wx_type = classify_weather(tavg, prcp, snow, wspd)
-    return {
-        'date'         : str(date.date()),
-        'day'          : date.strftime('%A'),
-        'weather'      : WX_LABELS.get(wx_type, 'Clear ☀️'),
-        'wx_type'      : wx_type,
-        'typical_oc'   : round(typical_oc),
-        'predicted_oc' : round(pred),
-        'lower_90'     : round(lower),
-        'upper_90'     : round(upper),
-        'pct_vs_normal': round(pct, 1),
-        'severity'     : severity,
-    }
+def predict_forward_batch(store_ids, dates, weather_list):
+    """
+    Forward forecast for many (store, date, weather) rows at once.
+    Returns one result dict per row, or None where the store is unknown.
+    """
+    known = [i for i, s in enumerate(store_ids) if s in store_profiles]
+    results = [None] * len(store_ids)
+    if not known:
+        return results
+
+    days    = to_days([dates[i] for i in known])
+    weather = weather_arrays([weather_list[i] for i in known])
+    out     = forward_batch.predict([store_ids[i] for i in known], days, weather)
+
+    types = wx_types(out['wx_code'])
+    dows  = forward_batch.calendar.date_parts(days)['dow'].tolist()
+    for j, i in enumerate(known):
+        wx_type = types[j]
+        results[i] = {
+            'date'         : str(days[j]),
+            'day'          : DOW_NAMES[dows[j]],
+            'weather'      : WX_LABELS.get(wx_type, 'Clear ☀️'),
+            'wx_type'      : wx_type,
+            'typical_oc'   : round(float(out['typical_oc'][j])),
+            'predicted_oc' : round(float(out['pred'][j])),
+            'lower_90'     : round(float(out['lower'][j])),
+            'upper_90'     : round(float(out['upper'][j])),
+            'pct_vs_normal': round(float(out['pct_vs_normal'][j]), 1),
+            'severity'     : int(out['severity'][j]),
+        }
+    return results
+
+
+def predict_day_forward(store_id, forecast_date, weather):
+    if store_id not in store_profiles:
+        return None
+    return predict_forward_batch([store_id], [forecast_date], [weather])[0]
 
 
 def get_weather_impact(store_id, weather_7days, start_date):
-    store_rows = df[df['store_id'] == store_id]
-    if len(store_rows) == 0:
+    if store_id not in store_profiles:
         return None
+    with stage('weather_impact'):
+        return weather_impact_rows(store_id, weather_7days, start_date)
+
 
+def weather_impact_rows(store_id, weather_7days, start_date):
     history   = get_historical_impact_list(store_id)
     hist_dict = {h['condition']: h['pct_vs_normal'] for h in (history or [])}
 
@@ -451,14 +419,16 @@ def get_weather_impact(store_id, weather_7days, start_date):
         'severe'    : hist_dict.get('Severe Weather', NETWORK_BASE['severe'][0]),
     }
 
+    types   = wx_types(classify_weather_arrays(
+        [float(wx.get('tavg', 15)) for wx in weather_7days],
+        [float(wx.get('prcp', 0))  for wx in weather_7days],
+        [float(wx.get('snow', 0))  for wx in weather_7days],
+        [float(wx.get('wspd', 0))  for wx in weather_7days],
+    )['wx_code'])
+
     results = []
-    for i, wx in enumerate(weather_7days):
+    for i, wx_type in enumerate(types):
         date    = pd.Timestamp(start_date) + pd.Timedelta(days=i)
-        tavg    = float(wx.get('tavg', 15))
-        prcp    = float(wx.get('prcp', 0))
-        snow    = float(wx.get('snow', 0))
-        wspd    = float(wx.get('wspd', 0))
-        wx_type = classify_weather(tavg, prcp, snow, wspd)
         pct     = STORE_IMPACT[wx_type]
         normal  = get_typical_oc(store_id, date.dayofweek, date.month)
         expected = round(normal * (1 + pct / 100))
@@ -478,19 +448,123 @@ def get_weather_impact(store_id, weather_7days, start_date):
     return results
 
 
-def build_system_prompt(store_id):
-    """Build rich system prompt with real store data for this store."""
-    store_rows = df[df['store_id'] == store_id]
-    if len(store_rows) == 0:
+# ════════════════════════════════════════════════
+# PRECOMPUTED FORECASTS
+# ════════════════════════════════════════════════
+
+def compute_forecast_rows(store_ids, weeks):
+    """Impact rows and forward predictions for many stores' daily forecasts."""
+    rows_ids, rows_dates, rows_wx = [], [], []
+    for store_id, week in zip(store_ids, weeks):
+        rows_ids.extend([store_id] * len(week))
+        rows_dates.extend(day['date'] for day in week)
+        rows_wx.extend(week)
+    predictions = predict_forward_batch(rows_ids, rows_dates, rows_wx)
+
+    rows, k = {}, 0
+    for store_id, week in zip(store_ids, weeks):
+        rows[store_id] = {
+            'weather'    : week,
+            'impact'     : get_weather_impact(store_id, week, week[0]['date']),
+            'predictions': predictions[k:k + len(week)],
+        }
+        k += len(week)
+    return rows
+
+
+# A rebuild with weather for fewer than this share of the stores fails
+# instead of replacing the current table (Open-Meteo down or rate-limiting)
+PRECOMPUTE_MIN_COVERAGE = float(os.environ.get('PRECOMPUTE_MIN_COVERAGE', 0.5))
+
+
+async def build_forecast_table():
+    """Rolling 7-day weather, impact and model predictions for every store."""
+    await warm_weather_cache(days=7)
+    store_ids, weeks, located = [], [], 0
+    for store_id in store_profiles:
+        if store_id not in store_coords:
+            continue
+        located += 1
+        lat  = store_coords[store_id]['store_latitude']
+        lon  = store_coords[store_id]['store_longitude']
+        week = weather_cache.get(forecast_key(lat, lon, 'days', 7))
+        if week:
+            store_ids.append(store_id)
+            weeks.append([dict(day) for day in week])
+    if not store_ids or len(store_ids) < PRECOMPUTE_MIN_COVERAGE * located:
+        raise RuntimeError(f'weather for only {len(store_ids)} of {located} stores')
+    return await run_in_threadpool(compute_forecast_rows, store_ids, weeks)
+
+
+# Rebuilt every PRECOMPUTE_INTERVAL seconds by a background task; 0 disables it
+PRECOMPUTE_INTERVAL = float(os.environ.get('PRECOMPUTE_INTERVAL', PRECOMPUTE_DEFAULT_INTERVAL))
+precomputer = Precomputer(build_forecast_table, interval=PRECOMPUTE_INTERVAL or PRECOMPUTE_DEFAULT_INTERVAL)
+
+
+def precomputed_week(store_id, start_date=None):
+    """
+    (row, age_seconds) from the precomputed table if it is fresh, has the
+    store and — when start_date is given — its forecast starts that day.
+    """
+    hit = precomputer.lookup(store_id)
+    if hit is None:
+        return None
+    row, age = hit
+    if start_date is not None:
+        if len(row['weather']) != 7 or row['weather'][0]['date'] != pd.Timestamp(start_date).strftime('%Y-%m-%d'):
+            return None
+    return row, age
+
+
+async def current_forecast(store_id):
+    """
+    (weather, impact, age) of the store's rolling 7-day forecast — from the
+    precomputed table when fresh (age in seconds), else fetched live
+    (age None). (None, None, None) when no weather is available.
+    """
+    hit = precomputed_week(store_id)
+    if hit is not None:
+        row, age = hit
+        return row['weather'], row['impact'], age
+    forecast = await get_weather_forecast(store_id, days=7)
+    if not forecast:
         return None, None, None
+    return forecast, get_weather_impact(store_id, forecast, forecast[0]['date']), None
+
+
+def week_report(forecast, impact):
+    """/predict/week rows from daily weather and its get_weather_impact rows."""
+    return [{
+        'date'        : raw['date'],
+        'day'         : f['day'],
+        'weather'     : f['weather'],
+        'temp_c'      : round(raw['tavg'], 1),
+        'precip_mm'   : round(raw['prcp'], 1),
+        'wind_kmh'    : round(raw['wspd'], 1),
+        'normal_oc'   : f['normal_oc'],
+        'pct_impact'  : f['pct_impact'],
+        'predicted_oc': f['expected_oc'],
+        'range_low'   : f['low_oc'],
+        'range_high'  : f['high_oc'],
+    } for raw, f in zip(forecast, impact)]
+
+
+@lru_cache(maxsize=None)
+def system_prompt_sections(store_id):
+    """
+    (head, body, city, state): the static parts of a store's system prompt
+    around the date line, built once per store. None for unknown stores;
+    call it for known stores only, so client-supplied ids cannot grow the
+    cache (build_system_prompt checks first).
+    """
+    store = store_profiles.get(store_id)
+    if store is None:
+        return None
 
-    store     = store_rows.iloc[0]
-    city      = store['store_city']
-    state     = store['store_state']
-    rain_sens = float(store.get('store_rain_sensitivity', 0.947))
-    snow_sens = float(store.get('store_snow_sensitivity', 0.960))
-    rain_pct  = round((rain_sens - 1) * 100, 1)
-    snow_pct  = round((snow_sens - 1) * 100, 1)
+    city     = store.city
+    state    = store.state
+    rain_pct = store.rain_impact_pct
+    snow_pct = store.snow_impact_pct
 
     history  = get_historical_impact_list(store_id)
     hist_str = '\n'.join([
@@ -498,17 +572,17 @@ def build_system_prompt(store_id):
         for h in (history or [])
     ])
 
-    dow_names   = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     typical_str = '\n'.join([
-        f"  {name}: {round(get_store_dow_baseline(store_id, i))} OC"
-        for i, name in enumerate(dow_names)
+        f"  {name}: {round(store.dow_baseline[i])} OC"
+        for i, name in enumerate(DOW_NAMES)
     ])
 
-    system_prompt = f"""You are a Valvoline Instant Oil Change weather analytics assistant.
+    head = """You are a Valvoline Instant Oil Change weather analytics assistant.
 You help store managers understand how weather affects their store visits.
 You are backed by a machine learning model trained on 5 years of real Valvoline data (2018-2022).
-Today's date: {datetime.now().strftime('%A, %B %d, %Y')}
+"""
 
+    body = f"""
 STORE INFORMATION:
 - Store ID   : {store_id}
 - Location   : {city}, {state}
@@ -553,16 +627,53 @@ ANSWER INSTRUCTIONS:
 - The range is more valuable to the business than the point estimate
 - Example: "90% confident between 35 and 55 OC, most likely around 45" """
 
+    return head, body, city, state
+
+
+def build_system_prompt(store_id):
+    """Rich system prompt with real store data: cached static sections + today's date."""
+    if store_id not in store_profiles:
+        return None, None, None
+    with stage('prompt_build'):
+        sections = system_prompt_sections(store_id)
+    if sections is None:
+        return None, None, None
+    head, body, city, state = sections
+    system_prompt = f"{head}Today's date: {datetime.now().strftime('%A, %B %d, %Y')}\n{body}"
     return system_prompt, city, state
 
 
+# PRERENDER_PROMPTS=1 builds every store's prompt sections at startup
+PRERENDER_PROMPTS = os.environ.get('PRERENDER_PROMPTS', '0').lower() in ('1', 'true', 'yes')
+
+
+def prerender_system_prompts():
+    """Build every store's static prompt sections now instead of on first chat."""
+    for store_id in store_profiles:
+        system_prompt_sections(store_id)
+    return system_prompt_sections.cache_info().currsize
+
+
 # ════════════════════════════════════════════════
 # FASTAPI APP
 # ════════════════════════════════════════════════
+@asynccontextmanager
+async def lifespan(app):
+    if PRERENDER_PROMPTS:
+        n = await run_in_threadpool(prerender_system_prompts)
+        print(f'  System prompts pre-rendered — {n} stores')
+    if PRECOMPUTE_INTERVAL > 0:
+        precomputer.start()
+    yield
+    await precomputer.stop()
+    await upstream.aclose()
+
+
 app = FastAPI(
     title       = 'Valvoline Weather Analytics API',
     description = 'GenAI-backed weather impact forecasting for store managers',
-    version     = '1.0.0'
+    version     = '1.0.0',
+    lifespan    = lifespan,
 )
 
 app.add_middleware(
@@ -572,6 +683,14 @@ app.add_middleware(
     allow_methods     = ['*'],
     allow_headers     = ['*'],
 )
+# Per-route request counts and latency for GET /metrics
+app.add_middleware(MetricsMiddleware)
+# X-Profile: 1 / ?profile=1 → Server-Timing breakdown; 'sample' also saves a stack profile to PROFILE_DIR
+app.add_middleware(
+    ProfileMiddleware,
+    profile_dir = os.environ.get('PROFILE_DIR') or None,
+    interval    = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL)),
+)
 
 # ── Request Models ──
 class WeatherDay(BaseModel):
@@ -590,7 +709,7 @@ class ImpactRequest(BaseModel):
 class ForecastRequest(BaseModel):
     store_id  : int
     start_date: str
-    weather   : List[WeatherDay]
+    weather   : Optional[List[WeatherDay]] = None     # None → live forecast
 
 class ChatRequest(BaseModel):
     store_id  : int
@@ -599,6 +718,133 @@ class ChatRequest(BaseModel):
     start_date: Optional[str] = None
 
 
+def ollama_request(messages, stream):
+    return {
+        'model'   : 'llama3.1:8b',
+        'messages': messages,
+        'stream'  : stream,
+        'options' : {'temperature': 0.3, 'num_predict': 400}
+    }
+
+
+async def ollama_chat(messages):
+    """
+    One non-streaming Ollama chat completion over the shared LLM client.
+    Returns (answer, usage) — see llm_usage.ollama_usage.
+    """
+    response = await upstream.llm.post('/api/chat', json=ollama_request(messages, False))
+    response.raise_for_status()
+    body = response.json()
+    return body['message']['content'], ollama_usage(body)
+
+
+async def ollama_chat_stream(messages, usage=None):
+    """
+    Streaming Ollama chat completion: yields content pieces as Ollama
+    generates them (one NDJSON object per token batch, last one has done).
+    The final chunk's token counts and timings are written into usage.
+    Raises if the stream ends before the done chunk, so a cut-off answer
+    is never taken for a complete one.
+    """
+    done = False
+    async with upstream.llm.stream('POST', '/api/chat', json=ollama_request(messages, True)) as response:
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            part = json.loads(line)
+            if part.get('error'):
+                raise RuntimeError(part['error'])
+            content = part.get('message', {}).get('content')
+            if content:
+                yield content
+            if part.get('done'):
+                if usage is not None:
+                    usage.update(ollama_usage(part))
+                done = True
+                break
+    if not done:
+        raise RuntimeError('Ollama closed the stream before the answer was done')
+
+
+# Ollama unreachable (not started, wrong host) rather than failing mid-request
+OLLAMA_DOWN = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+# Answers are reused for the same store, system prompt and question (see answer_cache.py)
+answer_cache = ForecastCache(
+    ttl         = float(os.environ.get('ANSWER_CACHE_TTL', ANSWER_CACHE_TTL)),
+    max_entries = int(os.environ.get('ANSWER_CACHE_SIZE', ANSWER_CACHE_SIZE)),
+)
+
+
+# Prompt sizes, token counts and timings per store (GET /stats/prompts)
+prompt_stats = PromptStats()
+
+
+def record_generation(store_id, messages, usage):
+    prompt_stats.record(store_id, messages, usage)
+    print(f"  LLM store {store_id}: {usage['prompt_tokens']} prompt tokens in {usage['prompt_eval_ms']} ms, "
+          f"{usage['completion_tokens']} generated in {usage['eval_ms']} ms")
+
+
+# Admission control in front of Ollama (see llm_queue.py)
+llm_queue = AdmissionQueue(
+    concurrency = int(os.environ.get('LLM_CONCURRENCY', upstream.llm_config.max_connections)),
+    max_queue   = int(os.environ.get('LLM_QUEUE_DEPTH', DEFAULT_QUEUE_DEPTH)),
+    max_wait    = float(os.environ.get('LLM_QUEUE_TIMEOUT', DEFAULT_WAIT_SECONDS)),
+)
+
+
+def queue_rejection(e):
+    return HTTPException(status_code=e.status, detail=e.reason, headers={'Retry-After': str(e.retry_after)})
+
+
+async def cached_ollama_chat(store_id, messages, priority=None):
+    """
+    ollama_chat through answer_cache → (answer, usage). Identical
+    concurrent questions share one generation; failures are not cached.
+    usage['cached'] is True when no new generation was run. Generations
+    wait for an llm_queue slot and may raise QueueRejected.
+    """
+    key       = answer_key(store_id, messages[0]['content'], messages[1:])
+    generated = []
+
+    async def generate():
+        t0 = time.perf_counter()
+        async with llm_queue.slot(parse_priority(priority)):
+            observe_stage('llm_queue', time.perf_counter() - t0)
+            with stage('llm_call'):
+                answer, usage = await ollama_chat(messages)
+        record_generation(store_id, messages, usage)
+        generated.append(True)
+        return answer, usage
+
+    answer, usage = await answer_cache.get_or_fetch_async(key, generate)
+    return answer, dict(usage, cached=not generated)
+
+
+# Numeric forecast questions are answered from the forecast rows (see intent_router.py)
+FAST_PATH_ANSWERS = os.environ.get('FAST_PATH_ANSWERS', '1').lower() in ('1', 'true', 'yes')
+
+
+async def fast_path_answer(store_id, question):
+    """Templated answer for a recognised numeric question, or None to ask the LLM."""
+    if not FAST_PATH_ANSWERS:
+        return None
+    intent = match_intent(question)
+    if intent is None or store_id not in store_profiles:
+        return None
+    _, impact, _ = await current_forecast(store_id)
+    store  = store_profiles[store_id]
+    answer = render_answer(intent, impact, store_id, store.city, store.state)
+    if answer is not None:
+        print(f'  Fast-path {intent.name} answer for store {store_id}')
+    return answer
+
+
 # ════════════════════════════════════════════════
 # OPENAI-COMPATIBLE ENDPOINTS (for OpenWebUI)
 # ════════════════════════════════════════════════
@@ -616,55 +862,58 @@ def list_models_openai():
     }
 
 
-@app.post('/v1/chat/completions')
-async def openai_chat(request: dict):
-    messages = request.get('messages', [])
+def openai_chat_question(messages):
+    """(store_id, last user message) of an OpenAI-style conversation."""
+    with stage('store_lookup'):
+        last_message = ''
+        for msg in reversed(messages):
+            if msg.get('role') == 'user':
+                last_message = msg.get('content', '')
+                break
 
-    last_message = ''
-    for msg in reversed(messages):
-        if msg.get('role') == 'user':
-            last_message = msg.get('content', '')
-            break
+        store_match = re.search(r'\b(\d{5,6})\b', last_message)
+        store_id    = int(store_match.group(1)) if store_match else 79609
 
-    store_match = re.search(r'\b(\d{5,6})\b', last_message)
-    store_id    = int(store_match.group(1)) if store_match else 79609
+        if store_id not in store_profiles:
+            store_id = 79609
+    return store_id, last_message
 
-    if store_id not in df['store_id'].values:
-        store_id = 79609
 
+async def openai_chat_messages(store_id, messages):
+    """
+    Ollama messages for an OpenAI-style conversation: the store's system
+    prompt followed by the user/assistant history.
+    """
     system_prompt, city, state = build_system_prompt(store_id)
 
     try:
-        forecast_data = get_weather_forecast(store_id, days=7)
-        if forecast_data:
-            start_date = forecast_data[0]['date']
-            impact     = get_weather_impact(store_id, forecast_data, start_date)
-            if impact:
-                forecast_str = (
-                    f'\n\n⚠️ IMPORTANT — YOU MUST USE THIS REAL FORECAST DATA:\n'
-                    f'Live 7-day weather forecast for {city}, {state} '
-                    f'starting TODAY {datetime.now().strftime("%A %B %d")}:\n'
-                )
-                for f, raw in zip(impact, forecast_data):
-                    forecast_str += (
-                        f"  {f['day']} {f['date']}: {f['weather']} "
-                        f"(temp:{raw['tavg']:.1f}°C, rain:{raw['prcp']:.1f}mm, "
-                        f"wind:{raw['wspd']:.1f}km/h) → "
-                        f"90% confident between {f['low_oc']} and {f['high_oc']} OC "
-                        f"(point estimate: {f['expected_oc']} OC, "
-                        f"{f['pct_impact']:+.1f}% vs your normal {f['normal_oc']})\n"
-                    )
+        forecast_data, impact, _ = await current_forecast(store_id)
+        if impact:
+            forecast_str = (
+                f'\n\n⚠️ IMPORTANT — YOU MUST USE THIS REAL FORECAST DATA:\n'
+                f'Live 7-day weather forecast for {city}, {state} '
+                f'starting TODAY {datetime.now().strftime("%A %B %d")}:\n'
+            )
+            for f, raw in zip(impact, forecast_data):
                 forecast_str += (
-                    f'\nToday is {datetime.now().strftime("%A %B %d %Y")}.\n'
-                    f'The forecast above starts TODAY and covers the next 7 days.\n'
-                    f'When manager asks about "next week" or "upcoming days", '
-                    f'use ONLY these real forecast numbers above.\n'
-                    f'Do NOT shift dates — use the exact dates shown above.\n'
-                    f'ALWAYS lead your answer with the confidence range: '
-                    f'"90% confident between X and Y OC" before giving the point estimate.\n'
+                    f"  {f['day']} {f['date']}: {f['weather']} "
+                    f"(temp:{raw['tavg']:.1f}°C, rain:{raw['prcp']:.1f}mm, "
+                    f"wind:{raw['wspd']:.1f}km/h) → "
+                    f"90% confident between {f['low_oc']} and {f['high_oc']} OC "
+                    f"(point estimate: {f['expected_oc']} OC, "
+                    f"{f['pct_impact']:+.1f}% vs your normal {f['normal_oc']})\n"
                 )
-                system_prompt += forecast_str
-                print(f'  Auto-fetched forecast for store {store_id} ({city}, {state})')
+            forecast_str += (
+                f'\nToday is {datetime.now().strftime("%A %B %d %Y")}.\n'
+                f'The forecast above starts TODAY and covers the next 7 days.\n'
+                f'When manager asks about "next week" or "upcoming days", '
+                f'use ONLY these real forecast numbers above.\n'
+                f'Do NOT shift dates — use the exact dates shown above.\n'
+                f'ALWAYS lead your answer with the confidence range: '
+                f'"90% confident between X and Y OC" before giving the point estimate.\n'
+            )
+            system_prompt += forecast_str
+            print(f'  Auto-fetched forecast for store {store_id} ({city}, {state})')
     except Exception as e:
         print(f'Auto-forecast warning: {e}')
 
@@ -672,25 +921,119 @@ async def openai_chat(request: dict):
     for msg in messages:
         if msg.get('role') in ['user', 'assistant']:
             ollama_messages.append({'role': msg['role'], 'content': msg['content']})
+    return ollama_messages
+
 
+def chat_chunk(created, delta, finish_reason=None, usage=None):
+    """
+    One server-sent chat.completion.chunk event; with usage, the final
+    usage-only chunk (stream_options.include_usage).
+    """
+    chunk = {
+        'id'     : 'chatcmpl-valvoline',
+        'object' : 'chat.completion.chunk',
+        'created': created,
+        'model'  : 'valvoline-weather',
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+    }
+    if usage is not None:
+        chunk['choices'] = []
+        chunk['usage']   = usage
+    return f'data: {json.dumps(chunk)}\n\n'
+
+
+async def iter_answer_stream(answer, usage, include_usage=False):
+    """A ready answer (fast path) as a chat.completion.chunk event stream."""
+    created = int(datetime.now().timestamp())
+    yield chat_chunk(created, {'role': 'assistant'})
+    yield chat_chunk(created, {'content': answer})
+    yield chat_chunk(created, {}, 'stop')
+    if include_usage:
+        yield chat_chunk(created, None, usage=usage)
+    yield 'data: [DONE]\n\n'
+
+
+async def iter_chat_stream(store_id, ollama_messages, include_usage=False, admitted_at=None):
+    """
+    Proxy Ollama's token stream as OpenAI chat.completion.chunk events.
+    The caller has already acquired an llm_queue slot (at admitted_at,
+    on llm_queue's clock), so a busy queue is a 429/503 before the stream
+    starts; the slot is released when the stream ends or is abandoned.
+    A completed stream is cached. Errors after the stream has started are
+    reported as answer text, the same way the non-streaming path reports them.
+    """
+    created = int(datetime.now().timestamp())
+    usage   = ollama_usage({})
     try:
-        response = requests.post(
-            f'http://{OLLAMA_PATH}:11434/api/chat',
-            json={
-                'model'   : 'llama3.1:8b',
-                'messages': ollama_messages,
-                'stream'  : False,
-                'options' : {'temperature': 0.3, 'num_predict': 400}
-            },
-            timeout=120
-        )
-        response.raise_for_status()
-        answer = response.json()['message']['content']
-    except requests.exceptions.ConnectionError:
-        answer = 'Ollama is not running. Please start with: ollama serve'
-    except Exception as e:
-        answer = f'Error connecting to Ollama: {str(e)}'
+        yield chat_chunk(created, {'role': 'assistant'})
+        try:
+            pieces = []
+            with stage('llm_call'):
+                async for piece in ollama_chat_stream(ollama_messages, usage):
+                    pieces.append(piece)
+                    yield chat_chunk(created, {'content': piece})
+            record_generation(store_id, ollama_messages, usage)
+            key = answer_key(store_id, ollama_messages[0]['content'], ollama_messages[1:])
+            answer_cache.put(key, (''.join(pieces), usage))
+        except OLLAMA_DOWN:
+            yield chat_chunk(created, {'content': 'Ollama is not running. Please start with: ollama serve'})
+        except Exception as e:
+            yield chat_chunk(created, {'content': f'Error connecting to Ollama: {str(e)}'})
+    finally:
+        llm_queue.release(llm_queue.clock() - admitted_at if admitted_at is not None else None)
+    yield chat_chunk(created, {}, 'stop')
+    if include_usage:
+        yield chat_chunk(created, None, usage=usage)
+    yield 'data: [DONE]\n\n'
+
+
+def sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type = 'text/event-stream',
+        headers    = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 
+@app.post('/v1/chat/completions')
+async def openai_chat(request: dict, x_priority: Optional[str] = Header(None)):
+    """
+    OpenAI-compatible chat. Generations go through llm_queue: 429/503 with
+    Retry-After when it is saturated; 'X-Priority: batch' queues behind
+    interactive requests.
+    """
+    messages           = request.get('messages', [])
+    store_id, question = openai_chat_question(messages)
+    stream             = bool(request.get('stream'))
+    include_usage      = bool((request.get('stream_options') or {}).get('include_usage'))
+    usage              = ollama_usage({})
+
+    answer = await fast_path_answer(store_id, question)
+    if answer is None:
+        ollama_messages = await openai_chat_messages(store_id, messages)
+        if stream:
+            cached = answer_cache.get(answer_key(store_id, ollama_messages[0]['content'], ollama_messages[1:]))
+            if cached is None:
+                t0 = time.perf_counter()
+                try:
+                    await llm_queue.acquire(parse_priority(x_priority))
+                except QueueRejected as e:
+                    raise queue_rejection(e)
+                observe_stage('llm_queue', time.perf_counter() - t0)
+                return sse_response(iter_chat_stream(store_id, ollama_messages, include_usage, llm_queue.clock()))
+            answer, usage = cached[0], dict(cached[1], cached=True)
+        else:
+            try:
+                answer, usage = await cached_ollama_chat(store_id, ollama_messages, x_priority)
+            except QueueRejected as e:
+                raise queue_rejection(e)
+            except OLLAMA_DOWN:
+                answer = 'Ollama is not running. Please start with: ollama serve'
+            except Exception as e:
+                answer = f'Error connecting to Ollama: {str(e)}'
+
+    if stream:
+        return sse_response(iter_answer_stream(answer, usage, include_usage))
     return {
         'id'     : 'chatcmpl-valvoline',
         'object' : 'chat.completion',
@@ -701,7 +1044,7 @@ async def openai_chat(request: dict):
             'message'      : {'role': 'assistant', 'content': answer},
             'finish_reason': 'stop'
         }],
-        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        'usage': usage,
     }
 
 
@@ -713,41 +1056,109 @@ async def openai_chat(request: dict):
 def health():
     return {
         'status' : 'ok',
-        'models' : 'loaded',
-        'stores' : df['store_id'].nunique(),
-        'version': '1.0.0'
+        'models' : 'shared' if shared_models else 'loaded',
+        'stores' : len(store_profiles),
+        'version': '1.0.0',
+        'weather_cache': weather_cache.stats(),
+        'answer_cache' : answer_cache.stats(),
+        'llm'          : prompt_stats.totals(),
+        'llm_queue'    : llm_queue.stats(),
+        'precompute'   : precomputer.stats(),
     }
 
 
+@app.post('/weather/warm')
+async def warm_weather(days: int = Query(7, ge=1, le=16)):
+    """Prefetch the rolling forecast for every store in batched Open-Meteo calls."""
+    result = await warm_weather_cache(days=days)
+    result['cache'] = weather_cache.stats()
+    return result
+
+
+@app.post('/forecasts/refresh')
+async def refresh_forecasts():
+    """Rebuild the precomputed forecast table now instead of waiting for the schedule."""
+    try:
+        await precomputer.refresh()
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f'Forecast refresh failed: {e}')
+    return precomputer.stats()
+
+
+@app.get('/stats/prompts')
+def prompt_costs(sort: str = Query('prompt_tokens', description=f'One of {PROMPT_SORT_KEYS}'),
+                 top: int = Query(20, ge=1, le=1000)):
+    """Per-store average prompt size, token counts and Ollama timings, most expensive first."""
+    try:
+        stores = prompt_stats.per_store(sort=sort, top=top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for row in stores:
+        store = store_profiles.get(row['store_id'])
+        if store is not None:
+            row['city'], row['state'] = store.city, store.state
+    return {'sort': sort, 'totals': prompt_stats.totals(), 'stores': stores}
+
+
+@REGISTRY.collector
+def service_metrics():
+    """Cache, upstream and LLM queue counters, read from their stats() at scrape time."""
+    caches = {name: {'hits': st['hits'] + st.get('coalesced', 0), 'misses': st['misses']}
+              for name, st in (('weather', weather_cache.stats()), ('answer', answer_cache.stats()),
+                               ('precompute', precomputer.stats()))}
+    info = system_prompt_sections.cache_info()
+    caches['system_prompt'] = {'hits': info.hits, 'misses': info.misses}
+    yield ('valvoline_cache_hits_total', 'counter', 'Lookups served from a cache (incl. joined in-flight loads).',
+           [({'cache': name}, c['hits']) for name, c in caches.items()])
+    yield ('valvoline_cache_misses_total', 'counter', 'Lookups a cache could not serve.',
+           [({'cache': name}, c['misses']) for name, c in caches.items()])
+    yield ('valvoline_cache_hit_ratio', 'gauge', 'hits / (hits + misses) since startup.',
+           [({'cache': name}, c['hits'] / (c['hits'] + c['misses']) if c['hits'] + c['misses'] else 0.0)
+            for name, c in caches.items()])
+
+    upstreams = upstream.stats()
+    yield ('valvoline_upstream_requests_total', 'counter', 'HTTP requests sent to Open-Meteo (weather) and Ollama (llm).',
+           [({'upstream': name}, st['requests']) for name, st in upstreams.items()])
+    yield ('valvoline_upstream_errors_total', 'counter', 'Failed upstream requests by transport error or HTTP status class.',
+           [({'upstream': name, 'kind': kind}, n) for name, st in upstreams.items() for kind, n in st['errors'].items()])
+
+    queue = llm_queue.stats()
+    yield ('valvoline_llm_queue_active', 'gauge', 'Generations holding an LLM slot.', [({}, queue['active'])])
+    yield ('valvoline_llm_queue_waiting', 'gauge', 'Requests waiting for an LLM slot.', [({}, queue['queued'])])
+    yield ('valvoline_llm_queue_rejected_total', 'counter', 'Chat requests refused by the LLM queue.',
+           [({'reason': 'full'}, queue['rejected']), ({'reason': 'timeout'}, queue['timed_out'])])
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, stage, cache, upstream and queue metrics."""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get('/stores')
 def list_stores():
-    stores = df.groupby('store_id').agg(
-        city  = ('store_city',  'first'),
-        state = ('store_state', 'first'),
-    ).reset_index()
-    return {'stores': stores.to_dict('records')}
+    return {'stores': [
+        {'store_id': s.store_id, 'city': s.city, 'state': s.state}
+        for s in store_profiles.values()
+    ]}
 
 
 @app.get('/stores/{store_id}')
 def get_store(store_id: int):
-    rows = df[df['store_id'] == store_id]
-    if len(rows) == 0:
+    store = store_profiles.get(store_id)
+    if store is None:
         raise HTTPException(status_code=404, detail=f'Store {store_id} not found')
-    store     = rows.iloc[0]
-    rain_sens = float(store.get('store_rain_sensitivity', 0.947))
-    snow_sens = float(store.get('store_snow_sensitivity', 0.960))
-    dow_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     typical_by_dow = {
-        name: round(get_store_dow_baseline(store_id, i))
-        for i, name in enumerate(dow_names)
+        name: round(store.dow_baseline[i])
+        for i, name in enumerate(DOW_NAMES)
     }
     return {
         'store_id'         : store_id,
-        'city'             : store['store_city'],
-        'state'            : store['store_state'],
-        'bay_count'        : int(store.get('bay_count', 3)),
-        'rain_impact_pct'  : round((rain_sens - 1) * 100, 1),
-        'snow_impact_pct'  : round((snow_sens - 1) * 100, 1),
+        'city'             : store.city,
+        'state'            : store.state,
+        'bay_count'        : store.bay_count,
+        'rain_impact_pct'  : store.rain_impact_pct,
+        'snow_impact_pct'  : store.snow_impact_pct,
         'typical_oc_by_dow': typical_by_dow,
     }
 
@@ -758,34 +1169,62 @@ def predict_impact(req: ImpactRequest):
     results      = get_weather_impact(req.store_id, weather_list, req.start_date)
     if results is None:
         raise HTTPException(status_code=404, detail=f'Store {req.store_id} not found')
-    store = df[df['store_id'] == req.store_id].iloc[0]
+    store = store_profiles[req.store_id]
     return {
         'store_id'  : req.store_id,
-        'city'      : store['store_city'],
-        'state'     : store['store_state'],
+        'city'      : store.city,
+        'state'     : store.state,
         'start_date': req.start_date,
         'forecast'  : results,
     }
 
 
 @app.post('/predict/7days')
-def predict_7days(req: ForecastRequest):
-    if len(req.weather) != 7:
+async def predict_7days(req: ForecastRequest):
+    """
+    7-day forward forecast for the given weather, or — without weather —
+    for the live forecast (served from the precomputed table when it
+    covers start_date).
+    """
+    if req.weather is not None and len(req.weather) != 7:
         raise HTTPException(status_code=400, detail='Exactly 7 weather days required')
-    results = []
-    for i, wx in enumerate(req.weather):
-        date   = pd.Timestamp(req.start_date) + pd.Timedelta(days=i)
-        result = predict_day_forward(req.store_id, date, wx.dict())
-        if result:
-            results.append(result)
-    store = df[df['store_id'] == req.store_id].iloc[0]
-    return {
+    store = store_profiles.get(req.store_id)
+    if store is None:
+        raise HTTPException(status_code=404, detail=f'Store {req.store_id} not found')
+    try:
+        start = pd.Timestamp(req.start_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f'Invalid start_date {req.start_date}')
+
+    snapshot_age = None
+    hit = precomputed_week(req.store_id, start) if req.weather is None else None
+    if hit is not None:
+        results, snapshot_age = hit[0]['predictions'], hit[1]
+    else:
+        if req.weather is not None:
+            weather = [wx.dict() for wx in req.weather]
+        else:
+            if req.store_id not in store_coords:
+                raise HTTPException(status_code=404, detail=f'Store {req.store_id} has no location')
+            try:
+                weather = await get_weather_week(req.store_id, start)
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f'Weather forecast unavailable: {e}')
+        dates   = [start + pd.Timedelta(days=i) for i in range(len(weather))]
+        results = await run_in_threadpool(
+            predict_forward_batch, [req.store_id] * len(dates), dates, weather
+        )
+
+    result = {
         'store_id'  : req.store_id,
-        'city'      : store['store_city'],
-        'state'     : store['store_state'],
+        'city'      : store.city,
+        'state'     : store.state,
         'start_date': req.start_date,
         'forecast'  : results,
     }
+    if snapshot_age is not None:
+        result['snapshot_age_s'] = round(snapshot_age, 1)
+    return result
 
 
 @app.post('/predict/historical')
@@ -793,15 +1232,13 @@ def predict_historical(store_id: int):
     results = get_historical_impact_list(store_id)
     if results is None:
         raise HTTPException(status_code=404, detail=f'Store {store_id} not found')
-    store     = df[df['store_id'] == store_id].iloc[0]
-    rain_sens = float(store.get('store_rain_sensitivity', 0.947))
-    snow_sens = float(store.get('store_snow_sensitivity', 0.960))
+    store = store_profiles[store_id]
     return {
         'store_id'        : store_id,
-        'city'            : store['store_city'],
-        'state'           : store['store_state'],
-        'rain_impact_pct' : round((rain_sens - 1) * 100, 1),
-        'snow_impact_pct' : round((snow_sens - 1) * 100, 1),
+        'city'            : store.city,
+        'state'           : store.state,
+        'rain_impact_pct' : store.rain_impact_pct,
+        'snow_impact_pct' : store.snow_impact_pct,
         'network_rain_avg': -0.9,
         'network_snow_avg': -1.8,
         'history'         : results,
@@ -809,38 +1246,48 @@ def predict_historical(store_id: int):
 
 
 @app.post('/predict/chat')
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest, x_priority: Optional[str] = Header(None)):
     system_prompt, city, state = build_system_prompt(req.store_id)
     if system_prompt is None:
         raise HTTPException(status_code=404, detail=f'Store {req.store_id} not found')
 
+    if not req.weather:
+        answer = await fast_path_answer(req.store_id, req.message)
+        if answer is not None:
+            return {
+                'store_id': req.store_id,
+                'city'    : city,
+                'state'   : state,
+                'question': req.message,
+                'answer'  : answer,
+                'usage'   : ollama_usage({}),
+            }
+
+    forecast_age = None
     try:
-        forecast_data = get_weather_forecast(req.store_id, days=7)
-        if forecast_data:
-            start_date = forecast_data[0]['date']
-            impact     = get_weather_impact(req.store_id, forecast_data, start_date)
-            if impact:
-                forecast_str = (
-                    f'\n\n⚠️ IMPORTANT — USE THIS REAL FORECAST DATA:\n'
-                    f'Live 7-day weather forecast for {city}, {state} '
-                    f'starting TODAY {datetime.now().strftime("%A %B %d")}:\n'
-                )
-                for f, raw in zip(impact, forecast_data):
-                    forecast_str += (
-                        f"  {f['day']} {f['date']}: {f['weather']} "
-                        f"(temp:{raw['tavg']:.1f}°C, rain:{raw['prcp']:.1f}mm, "
-                        f"wind:{raw['wspd']:.1f}km/h) → "
-                        f"90% confident between {f['low_oc']} and {f['high_oc']} OC "
-                        f"(point estimate: {f['expected_oc']} OC, "
-                        f"{f['pct_impact']:+.1f}% vs your normal {f['normal_oc']})\n"
-                    )
+        forecast_data, impact, forecast_age = await current_forecast(req.store_id)
+        if impact:
+            forecast_str = (
+                f'\n\n⚠️ IMPORTANT — USE THIS REAL FORECAST DATA:\n'
+                f'Live 7-day weather forecast for {city}, {state} '
+                f'starting TODAY {datetime.now().strftime("%A %B %d")}:\n'
+            )
+            for f, raw in zip(impact, forecast_data):
                 forecast_str += (
-                    f'\nToday is {datetime.now().strftime("%A %B %d %Y")}.\n'
-                    f'Use ONLY these forecast numbers. Do NOT ignore weather impact.\n'
-                    f'ALWAYS lead your answer with the confidence range: '
-                    f'"90% confident between X and Y OC" before giving the point estimate.\n'
+                    f"  {f['day']} {f['date']}: {f['weather']} "
+                    f"(temp:{raw['tavg']:.1f}°C, rain:{raw['prcp']:.1f}mm, "
+                    f"wind:{raw['wspd']:.1f}km/h) → "
+                    f"90% confident between {f['low_oc']} and {f['high_oc']} OC "
+                    f"(point estimate: {f['expected_oc']} OC, "
+                    f"{f['pct_impact']:+.1f}% vs your normal {f['normal_oc']})\n"
                 )
-                system_prompt += forecast_str
+            forecast_str += (
+                f'\nToday is {datetime.now().strftime("%A %B %d %Y")}.\n'
+                f'Use ONLY these forecast numbers. Do NOT ignore weather impact.\n'
+                f'ALWAYS lead your answer with the confidence range: '
+                f'"90% confident between X and Y OC" before giving the point estimate.\n'
+            )
+            system_prompt += forecast_str
     except Exception as e:
         print(f'Auto-forecast warning: {e}')
 
@@ -858,124 +1305,57 @@ def chat(req: ChatRequest):
             system_prompt += forecast_str
 
     try:
-        response = requests.post(
-            f'http://{OLLAMA_PATH}:11434/api/chat',
-            json={
-                'model'   : 'llama3.1:8b',
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user',   'content': req.message}
-                ],
-                'stream'  : False,
-                'options' : {'temperature': 0.3, 'num_predict': 400}
-            },
-            timeout=120
-        )
-        response.raise_for_status()
-        answer = response.json()['message']['content']
-    except requests.exceptions.ConnectionError:
+        answer, usage = await cached_ollama_chat(req.store_id, [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user',   'content': req.message}
+        ], x_priority)
+    except QueueRejected as e:
+        raise queue_rejection(e)
+    except OLLAMA_DOWN:
         raise HTTPException(status_code=503, detail='Ollama not running')
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return {
+    result = {
         'store_id': req.store_id,
         'city'    : city,
         'state'   : state,
         'question': req.message,
         'answer'  : answer,
+        'usage'   : usage,
     }
+    if forecast_age is not None:
+        result['snapshot_age_s'] = round(forecast_age, 1)
+    return result
 
 
 @app.get('/predict/week/{store_id}/{start_date}')
-def predict_week(store_id: int, start_date: str):
+async def predict_week(store_id: int, start_date: str):
     """Predict OC for a specific week. Leads with confidence range."""
     try:
-        if store_id not in store_coords:
+        store = store_profiles.get(store_id)
+        if store is None or store_id not in store_coords:
             raise HTTPException(status_code=404, detail=f'Store {store_id} not found')
 
-        lat   = store_coords[store_id]['store_latitude']
-        lon   = store_coords[store_id]['store_longitude']
         start = pd.Timestamp(start_date)
         end   = start + pd.Timedelta(days=6)
-
-        url = (
-            f"https://api.open-meteo.com/v1/forecast?"
-            f"latitude={lat}&longitude={lon}"
-            f"&daily=temperature_2m_mean,temperature_2m_min,"
-            f"temperature_2m_max,precipitation_sum,snowfall_sum,"
-            f"windspeed_10m_max"
-            f"&timezone=auto"
-            f"&start_date={start_date}"
-            f"&end_date={end.strftime('%Y-%m-%d')}"
-        )
-        response = requests.get(url, timeout=10)
-        data     = response.json()['daily']
-
-        forecast = []
-        for i in range(len(data['time'])):
-            forecast.append({
-                'date': data['time'][i],
-                'tavg': float(data['temperature_2m_mean'][i] or 15.0),
-                'tmin': float(data['temperature_2m_min'][i]  or 10.0),
-                'tmax': float(data['temperature_2m_max'][i]  or 20.0),
-                'prcp': float(data['precipitation_sum'][i]   or 0.0),
-                'snow': float((data['snowfall_sum'][i] or 0.0) * 10),
-                'wspd': float(data['windspeed_10m_max'][i]   or 0.0),
-            })
-
-        history   = get_historical_impact_list(store_id)
-        hist_dict = {h['condition']: h['pct_vs_normal'] for h in (history or [])}
-
-        STORE_IMPACT = {
-            'clear'     : 0.00,
-            'very_cold' : hist_dict.get('Very Cold',      NETWORK_BASE['very_cold'][0]),
-            'hot'       : hist_dict.get('Hot',            NETWORK_BASE['hot'][0]),
-            'light_rain': hist_dict.get('Light Rain',     NETWORK_BASE['light_rain'][0]),
-            'heavy_rain': hist_dict.get('Heavy Rain',     NETWORK_BASE['heavy_rain'][0]),
-            'any_snow'  : hist_dict.get('Any Snow',       NETWORK_BASE['any_snow'][0]),
-            'heavy_snow': hist_dict.get('Any Snow',       NETWORK_BASE['heavy_snow'][0]),
-            'freezing'  : hist_dict.get('Freezing',       NETWORK_BASE['freezing'][0]),
-            'high_wind' : NETWORK_BASE['high_wind'][0],
-            'severe'    : hist_dict.get('Severe Weather', NETWORK_BASE['severe'][0]),
-        }
-
-        store  = df[df['store_id'] == store_id].iloc[0]
-        report = []
-
-        for raw in forecast:
-            date      = pd.Timestamp(raw['date'])
-            dow       = date.dayofweek
-            month     = date.month
-            wx_type   = classify_weather(raw['tavg'], raw['prcp'], raw['snow'], raw['wspd'])
-            pct       = STORE_IMPACT.get(wx_type, 0.0)
-            normal_oc = get_typical_oc(store_id, dow, month)
-            predicted = round(normal_oc * (1 + pct / 100))
-            # ── FIX 4: CI scaling x1.30 for 90% coverage ──
-            ci = round((normal_oc * 0.15 + 3) * 1.30)
-
-            report.append({
-                'date'        : raw['date'],
-                'day'         : date.strftime('%A'),
-                'weather'     : WX_LABELS.get(wx_type, 'Clear'),
-                'temp_c'      : round(raw['tavg'], 1),
-                'precip_mm'   : round(raw['prcp'], 1),
-                'wind_kmh'    : round(raw['wspd'], 1),
-                'normal_oc'   : round(normal_oc),
-                'pct_impact'  : round(pct, 1),
-                'predicted_oc': predicted,
-                'range_low'   : max(0, predicted - ci),
-                'range_high'  : predicted + ci,
-            })
+        hit   = precomputed_week(store_id, start)
+        if hit is not None:
+            row, snapshot_age = hit
+            report = week_report(row['weather'], row['impact'])
+        else:
+            snapshot_age = None
+            forecast     = await get_weather_week(store_id, start_date)
+            report       = week_report(forecast, get_weather_impact(store_id, forecast, start_date))
 
         weekly_total      = sum(r['predicted_oc'] for r in report)
         weekly_range_low  = sum(r['range_low']    for r in report)
         weekly_range_high = sum(r['range_high']   for r in report)
 
-        return {
+        result = {
             'store_id'          : store_id,
-            'city'              : store['store_city'],
-            'state'             : store['store_state'],
+            'city'              : store.city,
+            'state'             : store.state,
             'week_start'        : start_date,
             'week_end'          : end.strftime('%Y-%m-%d'),
             'predictions'       : report,
@@ -985,6 +1365,9 @@ def predict_week(store_id: int, start_date: str):
             'model_mae'         : 5.73,
             'note'              : '90% confident weekly OC falls between weekly_range_low and weekly_range_high'
         }
+        if snapshot_age is not None:
+            result['snapshot_age_s'] = round(snapshot_age, 1)
+        return result
 
     except HTTPException:
         raise
@@ -992,6 +1375,88 @@ def predict_week(store_id: int, start_date: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def fleet_week_weather(store_id, start_date, end_date, failed):
+    """
+    7 days of weather for one store, or an error message. Locations whose
+    batched request just failed (`failed`, from warm_weather_cache) raise
+    that error instead of being fetched again one store at a time.
+    """
+    if store_id not in store_coords:
+        raise KeyError('no coordinates')
+    key = forecast_key(store_coords[store_id]['store_latitude'],
+                       store_coords[store_id]['store_longitude'], 'range', start_date, end_date)
+    if key in failed:
+        raise failed[key]
+    week = await get_weather_week(store_id, start_date)
+    if len(week) != 7:
+        raise ValueError(f'{len(week)} forecast days returned')
+    return week
+
+
+async def iter_fleet_week(start_date, chunk_size):
+    """
+    Yield one NDJSON line per store with its 7-day forward forecast.
+    Stores are scored chunk_size at a time, so memory is bounded by the
+    chunk and the first lines go out before the rest of the fleet is scored.
+    A chunk's weather comes from one batched multi-location request, and
+    stores it failed for get an error line without a per-store retry;
+    model scoring runs in the threadpool to keep the event loop free.
+    """
+    start     = pd.Timestamp(start_date)
+    dates     = [start + pd.Timedelta(days=i) for i in range(7)]
+    first     = dates[0].strftime('%Y-%m-%d')
+    last      = dates[-1].strftime('%Y-%m-%d')
+    store_ids = list(store_profiles)
+
+    for c in range(0, len(store_ids), chunk_size):
+        chunk  = store_ids[c:c + chunk_size]
+        failed = {}
+        await warm_weather_cache(chunk, start=first, end=last, errors=failed)
+        weeks = await asyncio.gather(
+            *(fleet_week_weather(store_id, first, last, failed) for store_id in chunk),
+            return_exceptions=True,
+        )
+        chunk_ids, rows_ids, rows_dates, rows_wx, errors = [], [], [], [], []
+        for store_id, week in zip(chunk, weeks):
+            if isinstance(week, Exception):
+                errors.append({'store_id': store_id, 'error': f'weather unavailable: {week}'})
+                continue
+            chunk_ids.append(store_id)
+            rows_ids.extend([store_id] * 7)
+            rows_dates.extend(dates)
+            rows_wx.extend(week)
+
+        results = await run_in_threadpool(predict_forward_batch, rows_ids, rows_dates, rows_wx)
+        for k, store_id in enumerate(chunk_ids):
+            store    = store_profiles[store_id]
+            forecast = results[k * 7:(k + 1) * 7]
+            yield json.dumps({
+                'store_id'        : store_id,
+                'city'            : store.city,
+                'state'           : store.state,
+                'week_start'      : dates[0].strftime('%Y-%m-%d'),
+                'forecast'        : forecast,
+                'weekly_total'    : sum(f['predicted_oc'] for f in forecast),
+                'weekly_lower_90' : sum(f['lower_90']     for f in forecast),
+                'weekly_upper_90' : sum(f['upper_90']     for f in forecast),
+            }) + '\n'
+        for err in errors:
+            yield json.dumps(err) + '\n'
+
+
+@app.get('/predict/fleet/week/{start_date}')
+def predict_fleet_week(start_date: str, chunk_size: int = Query(64, ge=1, le=500)):
+    """7-day forward forecast with 90% interval for every store, streamed as NDJSON."""
+    try:
+        pd.Timestamp(start_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f'Invalid start_date {start_date}')
+    return StreamingResponse(
+        iter_fleet_week(start_date, chunk_size),
+        media_type='application/x-ndjson',
+    )
+
+
 # ════════════════════════════════════════════════
 # RUN
 # ════════════════════════════════════════════════
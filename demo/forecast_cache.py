@@ -0,0 +1,197 @@
+"""
+Valvoline Weather Analytics — Forecast Cache
+
+Weather forecasts for a location change a few times a day, but every chat
+and forecast request used to fetch them from Open-Meteo again. This cache
+keeps each forecast for a TTL, keyed by rounded coordinates and horizon,
+and coalesces concurrent misses (single-flight): the first caller for a
+key fetches, later callers for the same key wait for that result instead
+of issuing their own request.
+
+Both thread callers (get_or_fetch) and coroutines (get_or_fetch_async)
+are supported. Nothing here is weather-specific; the API also keeps LLM
+answers in one (see answer_cache.py). Failed fetches are not cached; every
+waiter of a failed flight sees the same exception. If the fetching
+coroutine is cancelled (its client went away), the waiters are not: one
+of them takes over the fetch.
+"""
+
+import asyncio
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_ENTRIES = 4096
+COORD_DECIMALS      = 4           # ~11 m; stores never share a grid cell by accident
+
+
+def forecast_key(lat, lon, *horizon):
+    """Cache key for a location and horizon, e.g. ('days', 7) or ('range', start, end)."""
+    return (round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS)) + horizon
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done  = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _LeaderCancelled(Exception):
+    """Set on an async flight whose fetching task was cancelled; waiters retry."""
+
+
+class ForecastCache:
+    """
+    Thread-safe TTL cache with single-flight loading.
+
+    ttl         : seconds an entry stays fresh
+    max_entries : oldest entries are dropped beyond this size
+    clock       : monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl         = float(ttl)
+        self.max_entries = int(max_entries)
+        self.clock       = clock
+        self._entries    = {}          # key → (expires_at, value)
+        self._flights    = {}          # key → _Flight (threads)
+        self._futures    = {}          # key → asyncio.Future (event loop)
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+        self.coalesced   = 0
+        self.errors      = 0
+
+    def get(self, key):
+        """Fresh cached value or None (counted as a hit or miss); does not fetch."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def contains(self, key):
+        """True if key has a fresh entry; not counted as a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > self.clock()
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Cached value for key, or the result of fetch() — called at most once
+        per key at a time. Concurrent callers for a missing key share it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, flight.value)
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.value
+
+    async def get_or_fetch_async(self, key, fetch):
+        """
+        Async get_or_fetch: fetch is a coroutine function, awaited at most
+        once per key at a time; concurrent awaiters share its result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = asyncio.get_running_loop().create_future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                return await self.get_or_fetch_async(key, fetch)
+
+        try:
+            value = await fetch()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            future.set_exception(e)
+            future.exception()          # retrieved here; waiters re-raise it
+            raise
+        else:
+            with self._lock:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+            if not future.done():       # leader cancelled: a waiter takes over
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+
+    def _store(self, key, value):
+        # Caller holds the lock
+        self._entries.pop(key, None)
+        self._entries[key] = (self.clock() + self.ttl, value)
+        if len(self._entries) > self.max_entries:
+            now = self.clock()
+            for k in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+                del self._entries[k]
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits'     : self.hits,
+                'misses'   : self.misses,
+                'coalesced': self.coalesced,
+                'errors'   : self.errors,
+                'entries'  : len(self._entries),
+                'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                'ttl'      : self.ttl,
+            }
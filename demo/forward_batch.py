@@ -0,0 +1,270 @@
+"""
+Valvoline Weather Analytics — Batch Forward Predictor
+
+Builds the FWD_FEATURES matrix for N (store, date, weather) rows with
+NumPy and evaluates model_FWD / model_FWD_Q05 / model_FWD_Q95 together,
+in one fused pass per batch (tree_engine.fuse_models).
+The single-day predict_day_forward, /predict/7days and bulk endpoints all
+go through here, so the serving features are built in exactly one place.
+"""
+
+import numpy as np
+
+from holiday_calendar import HolidayCalendar, to_days
+from metrics import stage
+from tree_engine import fuse_models
+from weather_classes import WEATHER_FLAGS, classify_weather_arrays
+
+# Same defaults predict_day_forward has always applied to missing inputs
+WEATHER_DEFAULTS = {'tavg': 15.0, 'prcp': 0.0, 'snow': 0.0, 'wspd': 0.0}
+
+
+def weather_arrays(weather_list):
+    """
+    List of weather dicts → dict of float arrays (tavg, prcp, snow, wspd,
+    tmin, tmax). Missing or None tmin/tmax default to tavg ∓ 5.
+    """
+    cols = {}
+    for key, default in WEATHER_DEFAULTS.items():
+        cols[key] = np.array([
+            float(default if w.get(key) is None else w[key]) for w in weather_list
+        ], dtype=float)
+    for key, offset in (('tmin', -5.0), ('tmax', 5.0)):
+        given = np.array([
+            np.nan if w.get(key) is None else float(w[key]) for w in weather_list
+        ], dtype=float)
+        cols[key] = np.where(np.isnan(given), cols['tavg'] + offset, given)
+    return cols
+
+
+# Code given to categories the encoder never saw (and to NaN)
+UNKNOWN_CODE = 0
+
+# Label ranges up to this wide get a dense lookup array
+DENSE_SPAN = 1 << 16
+
+
+class EncoderTable:
+    """
+    A LabelEncoder fit on str(int(value)) labels, compiled once into an
+    integer lookup: a dense array indexed by value - offset when the label
+    range is small, sorted keys + searchsorted otherwise. Values whose
+    str(int(v)) is not a training label get UNKNOWN_CODE.
+    """
+
+    def __init__(self, le, unknown=UNKNOWN_CODE):
+        codes = {}
+        for code, label in enumerate(le.classes_):
+            label = str(label)
+            if label.lstrip('-').isdigit() and str(int(label)) == label:
+                codes[int(label)] = code
+        self.unknown = unknown
+        self.codes   = codes
+        keys         = np.array(sorted(codes), dtype=np.int64)
+        self.keys    = keys
+        self.lo      = int(keys[0])  if len(keys) else 0
+        self.hi      = int(keys[-1]) if len(keys) else -1
+        self.dense   = None
+        if len(keys) and self.hi - self.lo < DENSE_SPAN:
+            self.dense = np.full(self.hi - self.lo + 1, unknown, dtype=np.int64)
+            self.dense[keys - self.lo] = [codes[k] for k in keys.tolist()]
+        else:
+            self.values = np.array([codes[k] for k in keys.tolist()], dtype=np.int64)
+
+    def encode(self, values):
+        """Array of codes for an array of numeric values."""
+        values = np.trunc(np.asarray(values, dtype=float))
+        out    = np.full(values.shape, self.unknown, dtype=np.int64)
+        # Range check in float space also rejects NaN/inf before the int cast
+        inside = (values >= self.lo) & (values <= self.hi)
+        if not inside.any():
+            return out
+        ints = values[inside].astype(np.int64)
+        if self.dense is not None:
+            out[inside] = self.dense[ints - self.lo]
+            return out
+        pos   = np.searchsorted(self.keys, ints)
+        known = self.keys[pos] == ints
+        out[np.flatnonzero(inside)[known]] = self.values[pos[known]]
+        return out
+
+
+def compile_label_encoders(label_encoders):
+    """{column: LabelEncoder} → {column: EncoderTable}, done once at model load."""
+    return {
+        col: le if isinstance(le, EncoderTable) else EncoderTable(le)
+        for col, le in label_encoders.items()
+    }
+
+
+# Store attributes that never change between requests; they are encoded
+# once into each store's template row.
+STATIC_FEATURES = (
+    'bay_count', 'market_id', 'area_id', 'region_id', 'marketing_area_id', 'tz_code',
+    'is_sunday_closed_store', 'area_avg_oc', 'market_avg_oc',
+    'store_vs_area_demand', 'store_vs_market_demand', 'store_fleet_dependency',
+    'store_rain_sensitivity', 'store_snow_sensitivity', 'store_dow_volatility',
+    'store_growth_rate',
+)
+
+# Raw (unencoded) store values the weather interaction columns multiply by
+INTERACTION_ATTRS = ('market_id', 'region_id', 'store_fleet_dependency', 'bay_count')
+
+
+class ForwardBatchPredictor:
+    """
+    Vectorised forward model inference.
+
+    models         : (model_FWD, model_FWD_Q05, model_FWD_Q95), or a fused model with
+                     predict(X) → (n_rows, 3) such as shared_models provides
+    features       : FWD_FEATURES column order
+    label_encoders : {column: LabelEncoder or EncoderTable}
+    store_profiles : {store_id: StoreProfile}
+    typical_oc     : callable (store_id, dow, month) → typical OC
+    engine         : tree_engine engine for LightGBM models ('native' or 'flat')
+    calendar       : HolidayCalendar (built once if not given)
+
+    Each store gets a template row aligned to features with its static,
+    already label-encoded attributes; a request copies the template rows
+    and fills only the date, holiday, weather and interaction slots.
+    """
+
+    def __init__(self, models, features, label_encoders, store_profiles, typical_oc,
+                 engine='native', calendar=None):
+        self.features       = list(features)
+        self.calendar       = calendar or HolidayCalendar()
+        self.models         = models if hasattr(models, 'predict') else fuse_models(models, self.features, engine)
+        self.encoders       = compile_label_encoders(label_encoders)
+        self.store_profiles = store_profiles
+        self.typical_oc     = typical_oc
+        self.column         = {f: j for j, f in enumerate(self.features)}
+        self._build_templates()
+
+    def _build_templates(self):
+        store_ids           = sorted(self.store_profiles)
+        self.template_index = {s: i for i, s in enumerate(store_ids)}
+        profiles            = [self.store_profiles[s] for s in store_ids]
+        raw = {
+            name: np.array([getattr(p, name) for p in profiles], dtype=float)
+            for name in STATIC_FEATURES
+        }
+        templates = np.zeros((len(store_ids), len(self.features)))
+        for name, values in raw.items():
+            if name not in self.column:
+                continue
+            enc = self.encoders.get(name)
+            templates[:, self.column[name]] = enc.encode(values) if enc is not None else values
+        self.templates = templates
+        self.store_raw = {name: raw[name] for name in INTERACTION_ATTRS}
+
+    def build_matrix(self, store_ids, dates, weather):
+        """
+        Returns (X, extras). X is float (N, len(features)); extras carries
+        typical_oc, severity and wx_code per row for the response.
+        """
+        store_ids = [int(s) for s in store_ids]
+        n         = len(store_ids)
+        if n == 0:
+            extras = {'typical_oc': np.empty(0), 'severity': np.empty(0, dtype=int),
+                      'wx_code': np.empty(0, dtype=int)}
+            return np.empty((0, len(self.features))), extras
+        rows      = np.array([self.template_index[s] for s in store_ids], dtype=np.intp)
+        days      = to_days(dates)
+
+        # ── Calendar columns (precomputed per day, gathered by ordinal) ──
+        parts = self.calendar.date_parts(days)
+        dow   = parts['dow']
+        month = parts['month']
+        typical_oc = np.array([
+            self.typical_oc(s, d, m) for s, d, m in zip(store_ids, dow.tolist(), month.tolist())
+        ], dtype=float)
+
+        # ── Weather flags, severity and wx_type in one vectorised pass ──
+        tavg, prcp = weather['tavg'], weather['prcp']
+        snow, wspd = weather['snow'], weather['wspd']
+        tmin, tmax = weather['tmin'], weather['tmax']
+        wx         = classify_weather_arrays(tavg, prcp, snow, wspd)
+        severity   = wx['severity']
+
+        # ── Holidays (precomputed calendar) ──
+        hol = self.calendar.lookup(days)
+
+        # ── Store values for the interactions (raw ids, not encoded) ──
+        s_market = self.store_raw['market_id'][rows]
+        s_region = self.store_raw['region_id'][rows]
+        s_fleet  = self.store_raw['store_fleet_dependency'][rows]
+        s_bay    = self.store_raw['bay_count'][rows]
+
+        cols = {
+            'dow': dow, 'month': month, 'year': parts['year'],
+            'day_of_year': parts['day_of_year'],
+            'week_of_year': parts['week_of_year'],
+            'quarter': parts['quarter'],
+            'is_weekend': (dow >= 5).astype(int), 'is_monday': (dow == 0).astype(int),
+            'is_friday': (dow == 4).astype(int), 'is_saturday': (dow == 5).astype(int),
+            'tavg': tavg, 'tmin': tmin, 'tmax': tmax,
+            'temp_range': tmax - tmin,
+            'prcp': prcp, 'snow': snow, 'wspd': wspd,
+            'severity': severity,
+            'store_dow_baseline': typical_oc,
+            'temp_x_market': tavg * s_market,
+            'rain_x_market': prcp * s_market,
+            'snow_x_market': snow * s_market,
+            'sev_x_market': severity * s_market,
+            'temp_x_region': tavg * s_region,
+            'snow_x_region': snow * s_region,
+            'rain_x_region': prcp * s_region,
+            'sev_x_region': severity * s_region,
+            'fleet_dep_x_sev': s_fleet * severity,
+            'fleet_dep_x_snow': s_fleet * wx['has_heavy_snow'],
+            'fleet_dep_x_rain': s_fleet * wx['has_heavy_rain'],
+            'bay_x_severity': s_bay * severity,
+            # Pre-storm features are not known for a forecast day
+            'next_day_heavy_rain': np.zeros(n),
+            'next_day_heavy_snow': np.zeros(n),
+        }
+
+        cols.update({flag: wx[flag] for flag in WEATHER_FLAGS})
+        cols.update(hol)
+
+        # Categoricals were label-encoded from str(int(value)) at training time
+        for col, enc in self.encoders.items():
+            if col in cols:
+                cols[col] = enc.encode(cols[col])
+
+        X = self.templates[rows]
+        for name, values in cols.items():
+            j = self.column.get(name)
+            if j is not None:
+                X[:, j] = values
+        return X, {'typical_oc': typical_oc, 'severity': severity, 'wx_code': wx['wx_code']}
+
+    def predict(self, store_ids, dates, weather):
+        """
+        Point forecast and 90% interval for every row. Returns a dict of
+        arrays: pred, lower, upper, typical_oc, pct_vs_normal, severity, wx_code.
+        """
+        with stage('feature_build'):
+            X, extras = self.build_matrix(store_ids, dates, weather)
+        if len(X) == 0:
+            empty = np.empty(0)
+            return {k: empty for k in ('pred', 'lower', 'upper', 'typical_oc', 'pct_vs_normal',
+                                       'severity', 'wx_code')}
+        with stage('model_predict'):
+            raw = self.models.predict(X)
+        pred  = np.maximum(raw[:, 0], 0)
+        lower = np.minimum(np.maximum(raw[:, 1], 0), pred)
+        upper = np.maximum(np.maximum(raw[:, 2], 0), pred)
+
+        typical = extras['typical_oc']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(typical != 0, (pred - typical) / typical * 100, 0.0)
+        return {
+            'pred'         : pred,
+            'lower'        : lower,
+            'upper'        : upper,
+            'typical_oc'   : typical,
+            'pct_vs_normal': pct,
+            'severity'     : extras['severity'],
+            'wx_code'      : extras['wx_code'],
+        }
@@ -0,0 +1,141 @@
+"""
+Valvoline Weather Analytics — Holiday Calendar
+
+Holiday and abnormal-day features depend only on the date. Rather than
+building holidays.US for every request, the calendar is computed once for
+a fixed span of years into flat arrays indexed by day ordinal (days since
+the span start), so the features for any date vector are one gather.
+
+The date parts the forward model uses (day of week, month, year, day of
+year, ISO week, quarter) are tabled the same way, so a request turns its
+dates into ordinals once and gathers every calendar column without
+pandas.
+
+The same columns are what the training data uses, so feature code on
+either side can call HolidayCalendar.frame(dates) and get identical values.
+"""
+
+import holidays
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 2018
+LAST_YEAR  = 2035
+
+# Output columns, in the order they appear in FWD_FEATURES
+HOLIDAY_COLUMNS = (
+    'is_holiday', 'is_day_before_holiday', 'is_day_after_holiday',
+    'is_thanksgiving_week', 'is_christmas_week', 'is_newyear_week',
+    'is_july4_week', 'is_laborday_week', 'is_memday_week',
+    'is_blackfriday_week', 'p_abnormal',
+)
+
+# (month, first day, last day) of the fixed holiday windows
+HOLIDAY_WINDOWS = {
+    'is_thanksgiving_week': (11, 25, 26),
+    'is_christmas_week'   : (12, 24, 26),
+    'is_newyear_week'     : (1,   1,  2),
+    'is_july4_week'       : (7,   3,  5),
+    'is_laborday_week'    : (9,   1,  2),
+    'is_memday_week'      : (5,  27, 28),
+}
+
+
+# Date-part columns, as the training data derives them from invoice_date
+DATE_COLUMNS = ('dow', 'month', 'year', 'day_of_year', 'week_of_year', 'quarter')
+
+
+def to_days(dates):
+    """Any date-like scalar or vector → datetime64[D] array."""
+    try:
+        # datetime64 arrays, ISO strings, dates and Timestamps convert directly
+        return np.atleast_1d(np.asarray(dates, dtype='datetime64[D]'))
+    except (TypeError, ValueError):
+        return np.atleast_1d(np.asarray(pd.to_datetime(dates).values, dtype='datetime64[D]'))
+
+
+def compute_date_features(days):
+    """Date-part columns for a datetime64[D] array as {column: int64 array}."""
+    idx = pd.DatetimeIndex(np.asarray(days, dtype='datetime64[D]'))
+    return {
+        'dow'         : idx.dayofweek.to_numpy(np.int64),
+        'month'       : idx.month.to_numpy(np.int64),
+        'year'        : idx.year.to_numpy(np.int64),
+        'day_of_year' : idx.dayofyear.to_numpy(np.int64),
+        'week_of_year': idx.isocalendar().week.to_numpy(np.int64),
+        'quarter'     : idx.quarter.to_numpy(np.int64),
+    }
+
+
+def compute_holiday_features(days):
+    """
+    Holiday columns for a datetime64[D] array, computed from scratch.
+    Returns {column: array}; flags are int8, p_abnormal float64.
+    """
+    days  = np.asarray(days, dtype='datetime64[D]')
+    if len(days) == 0:
+        return {col: np.zeros(0, dtype=np.float64 if col == 'p_abnormal' else np.int8)
+                for col in HOLIDAY_COLUMNS}
+    idx   = pd.DatetimeIndex(days)
+    month = idx.month.to_numpy()
+    day   = idx.day.to_numpy()
+    years = range(int(idx.year.min()) - 1, int(idx.year.max()) + 2)
+    hols  = np.array(sorted(holidays.US(years=years).keys()), dtype='datetime64[D]')
+
+    cols = {
+        'is_holiday'           : np.isin(days, hols),
+        'is_day_before_holiday': np.isin(days + 1, hols),
+        'is_day_after_holiday' : np.isin(days - 1, hols),
+    }
+    for col, (m, first, last) in HOLIDAY_WINDOWS.items():
+        cols[col] = (month == m) & (day >= first) & (day <= last)
+    cols['is_blackfriday_week'] = cols['is_thanksgiving_week']
+
+    p_abn = np.where(
+        cols['is_holiday'] | cols['is_thanksgiving_week'] | cols['is_christmas_week'] |
+        cols['is_newyear_week'] | cols['is_day_after_holiday'], 0.7, 0.0)
+    cols['p_abnormal'] = np.where(cols['is_christmas_week'] & cols['is_day_before_holiday'], 1.0, p_abn)
+
+    return {col: cols[col].astype(np.float64 if col == 'p_abnormal' else np.int8)
+            for col in HOLIDAY_COLUMNS}
+
+
+class HolidayCalendar:
+    """
+    Precomputed holiday and date-part columns for every day of
+    first_year..last_year. Dates outside the span are computed on the fly
+    with the same code.
+    """
+
+    def __init__(self, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        self.start        = np.datetime64(f'{first_year}-01-01', 'D')
+        self.end          = np.datetime64(f'{last_year}-12-31', 'D')
+        all_days          = np.arange(self.start, self.end + 1)
+        self.columns      = compute_holiday_features(all_days)
+        self.date_columns = compute_date_features(all_days)
+        self.n_days       = len(all_days)
+
+    def _gather(self, table, compute, days):
+        ordinal = (days - self.start).astype(np.int64)
+        inside  = (ordinal >= 0) & (ordinal < self.n_days)
+        if inside.all():
+            return {col: values[ordinal] for col, values in table.items()}
+
+        out  = {col: np.zeros(len(days), dtype=values.dtype) for col, values in table.items()}
+        rest = compute(days[~inside])
+        for col, values in table.items():
+            out[col][inside]  = values[ordinal[inside]]
+            out[col][~inside] = rest[col]
+        return out
+
+    def lookup(self, dates):
+        """{column: array} for a date vector (datetime64[D] or anything pd.to_datetime takes)."""
+        return self._gather(self.columns, compute_holiday_features, to_days(dates))
+
+    def date_parts(self, dates):
+        """DATE_COLUMNS for a date vector, gathered like lookup."""
+        return self._gather(self.date_columns, compute_date_features, to_days(dates))
+
+    def frame(self, dates):
+        """Holiday columns for dates as a DataFrame, row-aligned with dates."""
+        return pd.DataFrame(self.lookup(dates))
@@ -0,0 +1,143 @@
+"""
+Valvoline Weather Analytics — Upstream HTTP Clients
+
+Outbound calls (Open-Meteo weather, Ollama chat) go through two shared
+httpx.AsyncClient instances, one per upstream, so request handlers await
+network I/O instead of blocking the event loop, and keep-alive
+connections are reused across requests.
+
+Each upstream has its own connection limits and timeouts, configurable
+through environment variables:
+
+    OPEN_METEO_URL               (https://api.open-meteo.com)
+    OPEN_METEO_MAX_CONNECTIONS   (20)
+    OPEN_METEO_TIMEOUT           (10 s read, 5 s connect)
+    OLLAMA_URL                   (http://<ollama host>:11434)
+    OLLAMA_MAX_CONNECTIONS       (4 — generation is GPU-bound)
+    OLLAMA_TIMEOUT               (120 s read, 5 s connect)
+
+Every request is counted per upstream, with failures broken down by
+transport exception (ConnectError, ReadTimeout, ...) or HTTP status class.
+"""
+
+import os
+
+import httpx
+
+CONNECT_TIMEOUT = 5.0
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(name)
+    return default if value in (None, '') else cast(value)
+
+
+class UpstreamConfig:
+    """Base URL, pool limits and timeouts of one upstream service."""
+
+    def __init__(self, base_url, max_connections, read_timeout, max_keepalive=None):
+        self.base_url        = base_url.rstrip('/')
+        self.max_connections = int(max_connections)
+        self.max_keepalive   = int(max_keepalive if max_keepalive is not None else max_connections)
+        self.read_timeout    = float(read_timeout)
+
+    @classmethod
+    def open_meteo(cls):
+        return cls(
+            _env('OPEN_METEO_URL', 'https://api.open-meteo.com'),
+            _env('OPEN_METEO_MAX_CONNECTIONS', 20, int),
+            _env('OPEN_METEO_TIMEOUT', 10.0, float),
+        )
+
+    @classmethod
+    def ollama(cls, host):
+        return cls(
+            _env('OLLAMA_URL', f'http://{host}:11434'),
+            _env('OLLAMA_MAX_CONNECTIONS', 4, int),
+            _env('OLLAMA_TIMEOUT', 120.0, float),
+        )
+
+    def client(self, transport=None, counts=None):
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_keepalive)
+        if counts is not None:
+            transport = CountingTransport(transport or httpx.AsyncHTTPTransport(limits=limits), counts)
+        return httpx.AsyncClient(
+            base_url  = self.base_url,
+            limits    = limits,
+            timeout   = httpx.Timeout(self.read_timeout, connect=CONNECT_TIMEOUT),
+            transport = transport,
+        )
+
+
+class UpstreamCounts:
+    """Requests sent to one upstream and how many failed, by kind."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors   = {}
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def stats(self):
+        return {'requests': self.requests, 'errors': dict(self.errors)}
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport and counts requests, transport errors and 4xx/5xx responses."""
+
+    def __init__(self, transport, counts):
+        self.transport = transport
+        self.counts    = counts
+
+    async def handle_async_request(self, request):
+        self.counts.requests += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            self.counts.error(type(e).__name__)
+            raise
+        if response.status_code >= 400:
+            self.counts.error(f'http_{response.status_code // 100}xx')
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class UpstreamClients:
+    """
+    The shared weather and LLM clients. Created on app startup and closed
+    on shutdown; a client is also created on first use if startup was
+    skipped. transport replaces the network (httpx.MockTransport in tests).
+    """
+
+    def __init__(self, weather_config, llm_config, transport=None):
+        self.weather_config = weather_config
+        self.llm_config     = llm_config
+        self.transport      = transport
+        self.counts         = {'weather': UpstreamCounts(), 'llm': UpstreamCounts()}
+        self._weather       = None
+        self._llm           = None
+
+    @property
+    def weather(self):
+        if self._weather is None:
+            self._weather = self.weather_config.client(self.transport, self.counts['weather'])
+        return self._weather
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = self.llm_config.client(self.transport, self.counts['llm'])
+        return self._llm
+
+    def stats(self):
+        return {name: counts.stats() for name, counts in self.counts.items()}
+
+    async def aclose(self):
+        for client in (self._weather, self._llm):
+            if client is not None:
+                await client.aclose()
+        self._weather = self._llm = None
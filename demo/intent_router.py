@@ -0,0 +1,111 @@
+"""
+Valvoline Weather Analytics — Fast-Path Intent Router
+
+Plain numeric forecast questions ("how many oil changes tomorrow?",
+"what's my weekly range?") have exact answers in the 7-day impact rows,
+and sending them to the LLM costs seconds. match_intent recognises a
+small set of such questions and render_answer turns the forecast rows
+into a templated sentence, leading with the 90% range the same way the
+LLM is instructed to.
+
+The patterns are deliberately narrow. A question must ask for a number
+(how many / expect / range / total ...) about exactly one period (a day or
+the week) and must not ask why, compare, mention weather or anything
+else the rows cannot answer. Everything else goes to the LLM.
+"""
+
+import re
+from collections import namedtuple
+from datetime import date
+
+Intent = namedtuple('Intent', 'name day_offset weekday')
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+_NUMERIC = re.compile(
+    r"\b(how many|how busy|expect(?:ed)?|forecast(?:ed)?|predict(?:ed|ion)?|oil changes?|oc|"
+    r"visits?|cars?|customers?|range|total|volume)\b")
+_OTHER   = re.compile(
+    r"\b(why|how (?:does|do|did|will|would|is|are) (?:the )?(?:weather|rain|snow|it)|affect\w*|impact\w*|"
+    r"compar\w*|versus|vs|explain|what if|if|staff\w*|histor\w*|last (?:year|week|month)|usual(?:ly)?|"
+    r"normal(?:ly)?|average|rain\w*|snow\w*|storm\w*|wind\w*|cold|hot|heat|freez\w*|weather|temperature|"
+    r"fleet|retail|promotion|marketing)\b")
+_WEEK    = re.compile(
+    r"\b(this week|next week|the week|weekly|coming week|upcoming week|next (?:7|seven) days|"
+    r"rest of the week|week ahead)\b")
+_DAYS    = re.compile(r"\b(today|tonight|day after tomorrow|tomorrow|" + '|'.join(WEEKDAYS) + r")s?\b")
+
+
+def match_intent(message):
+    """Intent for a numeric forecast question, or None to use the LLM."""
+    text = (message or '').lower()
+    if not _NUMERIC.search(text) or _OTHER.search(text):
+        return None
+    week = _WEEK.search(text)
+    days = {m.group(1) for m in _DAYS.finditer(text)}
+    if 'day after tomorrow' in days:
+        days.discard('tomorrow')
+    if week and not days:
+        return Intent('week', None, None)
+    if len(days) != 1 or week:
+        return None
+    day = days.pop()
+    if day in ('today', 'tonight'):
+        return Intent('day', 0, None)
+    if day == 'tomorrow':
+        return Intent('day', 1, None)
+    if day == 'day after tomorrow':
+        return Intent('day', 2, None)
+    return Intent('day', None, day.capitalize())
+
+
+def _label(row):
+    d = date.fromisoformat(row['date'])
+    return f"{row['day']} {d.strftime('%B')} {d.day}"
+
+
+def _day_answer(row, prefix, store_id, city, state):
+    text = (f"{prefix}{_label(row)} at store {store_id} ({city}, {state}): 90% confident between "
+            f"{row['low_oc']} and {row['high_oc']} oil changes, most likely around {row['expected_oc']}.")
+    if row['pct_impact']:
+        text += (f" Forecast is {row['weather']}, {row['pct_impact']:+.1f}% vs your normal "
+                 f"{row['day']} of {row['normal_oc']}.")
+    else:
+        text += f" Forecast is {row['weather']} — a normal {row['day']} for you is about {row['normal_oc']}."
+    return text
+
+
+def _week_answer(rows, store_id, city, state):
+    low, high = sum(r['low_oc'] for r in rows), sum(r['high_oc'] for r in rows)
+    expected  = sum(r['expected_oc'] for r in rows)
+    text = (f"Next {len(rows)} days ({_label(rows[0])} – {_label(rows[-1])}) at store {store_id} "
+            f"({city}, {state}): 90% confident between {low} and {high} oil changes in total, "
+            f"most likely around {expected}.")
+    biggest = max(rows, key=lambda r: abs(r['pct_impact']))
+    if biggest['pct_impact']:
+        text += (f" Biggest weather effect: {biggest['day']} ({biggest['weather']}, "
+                 f"{biggest['pct_impact']:+.1f}%).")
+    for r in rows:
+        text += (f"\n- {_label(r)}: {r['low_oc']}–{r['high_oc']} (most likely {r['expected_oc']}), "
+                 f"{r['weather']} {r['pct_impact']:+.1f}%")
+    return text
+
+
+def render_answer(intent, impact, store_id, city, state):
+    """
+    Templated answer from get_weather_impact rows (day 0 = today), or None
+    if the rows do not cover the asked day.
+    """
+    if not impact:
+        return None
+    if intent.name == 'week':
+        return _week_answer(impact, store_id, city, state)
+    if intent.weekday is not None:
+        rows = [r for r in impact if r['day'] == intent.weekday]
+        if not rows:
+            return None
+        return _day_answer(rows[0], '', store_id, city, state)
+    if intent.day_offset >= len(impact):
+        return None
+    prefix = {0: 'Today, ', 1: 'Tomorrow, '}.get(intent.day_offset, '')
+    return _day_answer(impact[intent.day_offset], prefix, store_id, city, state)
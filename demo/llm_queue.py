@@ -0,0 +1,160 @@
+"""
+Valvoline Weather Analytics — LLM Admission Queue
+
+There is one Ollama instance. Letting every chat request call it at once
+makes all of them slow together until the 120 s timeouts pile up. The
+AdmissionQueue lets `concurrency` generations run, parks up to
+`max_queue` more in priority order (interactive chat before batch jobs,
+FIFO within a priority), and refuses the rest immediately:
+
+    429 — queue full, nothing was waited for
+    503 — waited max_wait seconds without getting a slot
+
+Both carry a Retry-After estimate from the recent average generation time
+and the current queue length. Wait times are kept for metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+INTERACTIVE = 0
+BATCH       = 1
+PRIORITIES  = {'interactive': INTERACTIVE, 'batch': BATCH}
+
+DEFAULT_QUEUE_DEPTH  = 16
+DEFAULT_WAIT_SECONDS = 30.0
+WAIT_SAMPLES         = 1000
+SERVICE_SMOOTHING    = 0.2          # EWMA weight of the newest generation time
+
+
+def parse_priority(value):
+    """'batch' → BATCH; anything else (or None) → INTERACTIVE."""
+    return PRIORITIES.get((value or '').strip().lower(), INTERACTIVE)
+
+
+class QueueRejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status      = status
+        self.reason      = reason
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Priority semaphore for one event loop.
+
+    concurrency : generations allowed at once
+    max_queue   : requests allowed to wait for a slot
+    max_wait    : seconds a request may wait before a 503
+    """
+
+    def __init__(self, concurrency, max_queue=DEFAULT_QUEUE_DEPTH, max_wait=DEFAULT_WAIT_SECONDS,
+                 clock=time.monotonic):
+        self.concurrency = max(1, int(concurrency))
+        self.max_queue   = max(0, int(max_queue))
+        self.max_wait    = float(max_wait)
+        self.clock       = clock
+        self.active      = 0
+        self.queued      = 0
+        self.admitted    = 0
+        self.rejected    = 0
+        self.timed_out   = 0
+        self.service_s   = None        # EWMA of slot hold time
+        self._heap       = []          # (priority, seq, future)
+        self._seq        = itertools.count()
+        self._waits      = deque(maxlen=WAIT_SAMPLES)
+
+    def retry_after(self):
+        """Seconds until a new request would likely get a slot (at least 1)."""
+        per_slot = self.service_s if self.service_s is not None else 10.0
+        return max(1, math.ceil(per_slot * (self.queued + 1) / self.concurrency))
+
+    def check(self):
+        """Raise QueueRejected(429) now if a new request could not even queue."""
+        if self.active >= self.concurrency and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueRejected(429, 'LLM queue is full', self.retry_after())
+
+    async def acquire(self, priority=INTERACTIVE):
+        if self.active < self.concurrency and not self.queued:
+            self.active += 1
+            self._admit(0.0)
+            return
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueRejected(429, 'LLM queue is full', self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), future))
+        self.queued += 1
+        t0 = self.clock()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._free_slot()          # slot was granted as we gave up
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise QueueRejected(503, 'Timed out waiting for the LLM', self.retry_after()) from None
+            raise
+        finally:
+            self.queued -= 1
+        self._admit(self.clock() - t0)
+
+    def release(self, held_for=None):
+        if held_for is not None:
+            self.service_s = held_for if self.service_s is None else (
+                SERVICE_SMOOTHING * held_for + (1 - SERVICE_SMOOTHING) * self.service_s)
+        self._free_slot()
+
+    @asynccontextmanager
+    async def slot(self, priority=INTERACTIVE):
+        await self.acquire(priority)
+        t0 = self.clock()
+        try:
+            yield
+        finally:
+            self.release(self.clock() - t0)
+
+    def _free_slot(self):
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        # Give free slots to the best waiters still waiting
+        while self.active < self.concurrency and self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
+                self.active += 1
+
+    def _admit(self, waited):
+        self.admitted += 1
+        self._waits.append(waited)
+
+    def stats(self):
+        waits = sorted(self._waits)
+
+        def pct(q):
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1) if waits else 0.0
+
+        return {
+            'concurrency'  : self.concurrency,
+            'max_queue'    : self.max_queue,
+            'active'       : self.active,
+            'queued'       : self.queued,
+            'admitted'     : self.admitted,
+            'rejected'     : self.rejected,
+            'timed_out'    : self.timed_out,
+            'wait_p50_ms'  : pct(0.50),
+            'wait_p95_ms'  : pct(0.95),
+            'wait_max_ms'  : round(waits[-1] * 1000, 1) if waits else 0.0,
+            'avg_service_s': round(self.service_s, 2) if self.service_s is not None else None,
+        }
@@ -0,0 +1,106 @@
+"""
+Valvoline Weather Analytics — LLM Token Accounting
+
+Ollama reports what each generation cost: prompt_eval_count tokens read
+in prompt_eval_duration, eval_count tokens generated in eval_duration
+(durations in nanoseconds). ollama_usage turns that into an OpenAI-style
+usage block with the timings alongside, and PromptStats aggregates it per
+store together with the prompt size in characters, so the stores whose
+prompts cost the most prompt-processing time can be found and trimmed.
+"""
+
+import threading
+
+USAGE_TIMINGS = ('load_ms', 'prompt_eval_ms', 'eval_ms', 'total_ms')
+SORT_KEYS     = ('prompt_tokens', 'prompt_chars', 'prompt_eval_ms', 'eval_ms', 'total_ms', 'requests')
+
+
+def _ms(ns):
+    return round((ns or 0) / 1e6, 1)
+
+
+def ollama_usage(body):
+    """Usage block from an Ollama /api/chat response (or final stream chunk)."""
+    prompt     = int(body.get('prompt_eval_count') or 0)
+    completion = int(body.get('eval_count') or 0)
+    return {
+        'prompt_tokens'    : prompt,
+        'completion_tokens': completion,
+        'total_tokens'     : prompt + completion,
+        'load_ms'          : _ms(body.get('load_duration')),
+        'prompt_eval_ms'   : _ms(body.get('prompt_eval_duration')),
+        'eval_ms'          : _ms(body.get('eval_duration')),
+        'total_ms'         : _ms(body.get('total_duration')),
+    }
+
+
+def prompt_chars(messages):
+    return sum(len(m.get('content') or '') for m in messages)
+
+
+class _StoreTotals:
+    __slots__ = ('requests', 'prompt_chars', 'prompt_tokens', 'completion_tokens',
+                 'max_prompt_tokens', 'load_ms', 'prompt_eval_ms', 'eval_ms', 'total_ms')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+class PromptStats:
+    """Thread-safe per-store totals of prompt sizes, token counts and timings."""
+
+    def __init__(self):
+        self._stores = {}
+        self._lock   = threading.Lock()
+
+    def record(self, store_id, messages, usage):
+        chars = prompt_chars(messages)
+        with self._lock:
+            t = self._stores.get(store_id)
+            if t is None:
+                t = self._stores[store_id] = _StoreTotals()
+            t.requests          += 1
+            t.prompt_chars      += chars
+            t.prompt_tokens     += usage['prompt_tokens']
+            t.completion_tokens += usage['completion_tokens']
+            t.max_prompt_tokens  = max(t.max_prompt_tokens, usage['prompt_tokens'])
+            for name in USAGE_TIMINGS:
+                setattr(t, name, getattr(t, name) + usage[name])
+
+    def per_store(self, sort='prompt_tokens', top=None):
+        """Per-store averages, most expensive first by the given average."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f'sort must be one of {SORT_KEYS}')
+        with self._lock:
+            rows = []
+            for store_id, t in self._stores.items():
+                n = t.requests
+                rows.append({
+                    'store_id'         : store_id,
+                    'requests'         : n,
+                    'prompt_chars'     : round(t.prompt_chars / n),
+                    'prompt_tokens'    : round(t.prompt_tokens / n),
+                    'max_prompt_tokens': t.max_prompt_tokens,
+                    'completion_tokens': round(t.completion_tokens / n),
+                    'load_ms'          : round(t.load_ms / n, 1),
+                    'prompt_eval_ms'   : round(t.prompt_eval_ms / n, 1),
+                    'eval_ms'          : round(t.eval_ms / n, 1),
+                    'total_ms'         : round(t.total_ms / n, 1),
+                })
+        rows.sort(key=lambda r: r[sort], reverse=True)
+        return rows[:top] if top else rows
+
+    def totals(self):
+        with self._lock:
+            stores = list(self._stores.values())
+        requests = sum(t.requests for t in stores)
+        prompt   = sum(t.prompt_tokens for t in stores)
+        return {
+            'requests'           : requests,
+            'prompt_tokens'      : prompt,
+            'completion_tokens'  : sum(t.completion_tokens for t in stores),
+            'avg_prompt_tokens'  : round(prompt / requests) if requests else 0,
+            'avg_prompt_eval_ms' : round(sum(t.prompt_eval_ms for t in stores) / requests, 1) if requests else 0.0,
+            'avg_eval_ms'        : round(sum(t.eval_ms for t in stores) / requests, 1) if requests else 0.0,
+        }
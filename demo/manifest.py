@@ -0,0 +1,61 @@
+"""
+Valvoline Weather Analytics — Build Manifests
+
+The columnar data snapshot (snapshot.py) and the shared model arrays
+(shared_models.py) are both directories of files built from one source
+file and described by a manifest.json. This module holds the part they
+share: the source stats a manifest records, writing the manifest once
+everything else is on disk, and reading it back and checking it against
+the source currently on disk.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def source_stats(path, digest=False):
+    """
+    {'size', 'mtime_ns'} of path, or {'size', 'sha256'} with digest=True
+    for sources copied around separately from what was built from them
+    (mtimes do not survive the copy into the Docker image).
+    """
+    if digest:
+        data = Path(path).read_bytes()
+        return {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def write_manifest(out_dir, manifest):
+    """Write manifest.json atomically; call it last, after the files it describes."""
+    # Manifest last: a half-written build has no manifest and is ignored.
+    tmp = Path(out_dir) / (MANIFEST_NAME + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(Path(out_dir) / MANIFEST_NAME)
+    return manifest
+
+
+def read_manifest(out_dir, version):
+    """The manifest under out_dir, or None if there is none or it has another version."""
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    if manifest.get('version') != version:
+        return None
+    return manifest
+
+
+def built_from(manifest, source_path, digest=False):
+    """
+    True if manifest was built from the source currently on disk. A
+    missing source (e.g. inside the Docker image) or a manifest that
+    recorded none counts as current.
+    """
+    if not Path(source_path).exists() or manifest.get('source') is None:
+        return True
+    return manifest['source'] == source_stats(source_path, digest)
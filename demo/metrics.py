@@ -0,0 +1,236 @@
+"""
+Valvoline Weather Analytics — Prometheus Metrics
+
+A small in-process metrics registry rendered in the Prometheus text
+exposition format (GET /metrics), without the prometheus_client
+dependency:
+
+    Counter    monotonically increasing, per label set
+    Histogram  cumulative buckets + sum + count, per label set
+    collectors functions called at scrape time that turn existing stats()
+               dicts (caches, upstream clients, LLM queue) into samples
+
+MetricsMiddleware times every request per route template (until the last
+body chunk, so streamed responses count in full) and stage() times the
+parts of a request — store lookup, weather fetch, weather impact,
+feature build, model predict, prompt build, LLM queue and LLM call — into
+one histogram labelled by stage. While a request is being profiled
+(profiling.py) its stage timings are also collected in request_stages.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; spans a cached lookup (sub-ms) to a long LLM generation
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _fmt(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name       = name
+        self.doc        = documentation
+        self.labelnames = tuple(labelnames)
+        self._values    = {}
+        self._lock      = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.doc}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_labels(self.labelnames, k)} {_fmt(v)}' for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            i = 0
+            while i < len(self.buckets) and value > self.buckets[i]:
+                i += 1
+            series[0][i] += 1
+            series[1]    += value
+            series[2]    += 1
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[2] if series else 0
+
+    def sum(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[1] if series else 0.0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", _fmt(bound))])} '
+                             f'{cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {n}')
+        return lines
+
+
+class Registry:
+    """Named metrics plus scrape-time collectors, rendered together."""
+
+    def __init__(self):
+        self._metrics    = {}
+        self._collectors = []
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn):
+        """
+        Register fn() → iterable of (name, kind, documentation, samples),
+        samples being [(labels dict, value)], called on every scrape.
+        Usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            for name, kind, doc, samples in fn():
+                lines.append(f'# HELP {name} {doc}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels.keys(), labels.values())} {_fmt(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'valvoline_http_requests_total', 'HTTP requests by route template, method and status.',
+    ('method', 'route', 'status'))
+HTTP_LATENCY  = REGISTRY.histogram(
+    'valvoline_http_request_duration_seconds', 'HTTP request latency until the last body byte.',
+    ('method', 'route'))
+STAGE_LATENCY = REGISTRY.histogram(
+    'valvoline_stage_duration_seconds', 'Time spent in each stage of a request.', ('stage',))
+
+
+# (stage, seconds) of the current request while it is being profiled (see profiling.py)
+request_stages = ContextVar('request_stages', default=None)
+
+
+def observe_stage(name, seconds):
+    STAGE_LATENCY.observe(seconds, stage=name)
+    timings = request_stages.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as one observation of stage `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - t0)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP_REQUESTS and HTTP_LATENCY. The route
+    label is the matched path template (/stores/{store_id}), or
+    'unmatched', so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        t0     = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            HTTP_LATENCY.observe(time.perf_counter() - t0, method=scope['method'], route=route)
+            HTTP_REQUESTS.inc(method=scope['method'], route=route, status=status[0])
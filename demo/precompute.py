@@ -0,0 +1,137 @@
+"""
+Valvoline Weather Analytics — Precomputed Forecasts
+
+The rolling 7-day forecast for a store (weather, impact rows and forward
+model predictions) is the same for every request until the weather
+changes. A background asyncio task rebuilds it for all stores every
+PRECOMPUTE_INTERVAL seconds and publishes the result as one immutable
+ForecastTable; request handlers read the current table instead of
+fetching and scoring on demand, and fall back to the live path when the
+table is missing, stale, or does not cover what was asked.
+
+A table is stale once it is older than max_age or was built on a previous
+calendar day (its forecast no longer starts today). A refresh that fails
+or builds nothing (weather unreachable) never replaces the last good
+table; it is counted as a failure and retried after RETRY_SECONDS.
+"""
+
+import asyncio
+import time
+from datetime import date
+
+DEFAULT_INTERVAL_SECONDS = 30 * 60
+RETRY_SECONDS            = 60
+
+
+class ForecastTable:
+    """
+    One precomputed snapshot: store_id → row dict, plus when it was built.
+    Never mutated after publishing; a refresh replaces the whole table.
+    """
+
+    def __init__(self, rows, built_at=None, duration=0.0, clock=time.time):
+        self.rows      = rows
+        self.clock     = clock
+        self.built_at  = clock() if built_at is None else built_at
+        self.built_day = date.fromtimestamp(self.built_at)
+        self.duration  = duration
+
+    def age(self):
+        return max(0.0, self.clock() - self.built_at)
+
+    def is_fresh(self, max_age):
+        return self.age() <= max_age and date.fromtimestamp(self.clock()) == self.built_day
+
+
+class Precomputer:
+    """
+    Periodically rebuilds a ForecastTable with build() — a coroutine
+    function returning {store_id: row} — and serves lookups from it.
+
+    interval : seconds between refreshes (a failed refresh retries sooner)
+    max_age  : rows older than this are not served (default 2 × interval)
+    """
+
+    def __init__(self, build, interval=DEFAULT_INTERVAL_SECONDS, max_age=None, clock=time.time):
+        self.build      = build
+        self.interval   = float(interval)
+        self.max_age    = float(max_age if max_age is not None else 2 * self.interval)
+        self.clock      = clock
+        self.table      = None
+        self.refreshes  = 0
+        self.failures   = 0
+        self.last_error = None
+        self.hits       = 0
+        self.misses     = 0
+        self._task      = None
+
+    async def refresh(self):
+        """
+        Build a new table now and publish it; returns the table. A build
+        that raises or returns no rows is counted in failures / last_error
+        and re-raised, and the current table stays published.
+        """
+        t0 = time.perf_counter()
+        try:
+            rows = await self.build()
+            if not rows:
+                raise RuntimeError('build returned no rows')
+        except Exception as e:
+            self.failures  += 1
+            self.last_error = f'{type(e).__name__}: {e}'
+            raise
+        table = ForecastTable(rows, duration=time.perf_counter() - t0, clock=self.clock)
+        self.table       = table
+        self.refreshes  += 1
+        self.last_error  = None
+        return table
+
+    async def _run(self):
+        while True:
+            try:
+                table = await self.refresh()
+                print(f'Precomputed forecasts for {len(table.rows)} stores in {table.duration:.1f}s')
+                delay = self.interval
+            except Exception:
+                print(f'Forecast precompute failed: {self.last_error}')
+                delay = min(RETRY_SECONDS, self.interval)
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def lookup(self, store_id):
+        """(row, age_seconds) from a fresh table, or None."""
+        table = self.table
+        row   = table.rows.get(store_id) if table is not None and table.is_fresh(self.max_age) else None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row, table.age()
+
+    def stats(self):
+        table = self.table
+        return {
+            'running'    : self._task is not None,
+            'interval'   : self.interval,
+            'stores'     : len(table.rows) if table else 0,
+            'age_s'      : round(table.age(), 1) if table else None,
+            'fresh'      : table.is_fresh(self.max_age) if table else False,
+            'build_s'    : round(table.duration, 3) if table else None,
+            'refreshes'  : self.refreshes,
+            'failures'   : self.failures,
+            'hits'       : self.hits,
+            'misses'     : self.misses,
+            'last_error' : self.last_error,
+        }
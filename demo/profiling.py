@@ -0,0 +1,214 @@
+"""
+Valvoline Weather Analytics — On-Demand Request Profiling
+
+/metrics shows where time goes on average; this shows it for one call.
+A request sent with
+
+    X-Profile: 1          (or ?profile=1)      stage timings only
+    X-Profile: sample     (or ?profile=sample) stage timings + stack samples
+
+gets a Server-Timing header with the stages it went through (weather
+fetch, weather impact, feature build, model predict, prompt build, LLM
+queue, LLM call — see metrics.stage) and the time to the response headers:
+
+    Server-Timing: weather_fetch;dur=182.4, prompt_build;dur=0.6, llm_call;dur=2311.0, app;dur=2496.1
+
+Streamed responses send their headers before generation is done, so the
+header covers only what finished by then; the complete breakdown is
+printed when the response ends.
+
+With PROFILE_DIR set, 'sample' also runs a stack sampler for the length of
+the request: every PROFILE_SAMPLE_INTERVAL seconds (0.005) it records the
+Python stack of every busy thread (event loop and threadpool; threads
+parked in a wait or select are skipped), and writes
+
+    <id>.collapsed   folded stacks for flamegraph.pl / speedscope
+    <id>.json        path, stage timings and the hottest functions
+
+where <id> is returned in X-Profile-Id. Concurrent requests show up in
+the samples too; one sampling profile runs at a time and the rest get
+stage timings only. Without PROFILE_DIR nothing is written to disk.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from metrics import request_stages
+
+PROFILE_HEADER           = b'x-profile'
+DEFAULT_SAMPLE_INTERVAL  = 0.005
+TOP_FUNCTIONS            = 25
+
+MODE_TIMING, MODE_SAMPLE = 'timing', 'sample'
+
+
+def profile_mode(scope):
+    """MODE_TIMING, MODE_SAMPLE or None from the X-Profile header or ?profile= flag."""
+    value = None
+    for name, raw in scope.get('headers', ()):
+        if name == PROFILE_HEADER:
+            value = raw.decode('latin-1')
+            break
+    if value is None:
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        value = query.get('profile', [None])[0]
+    value = (value or '').strip().lower()
+    if value == MODE_SAMPLE:
+        return MODE_SAMPLE
+    if value in ('1', 'true', 'yes', MODE_TIMING):
+        return MODE_TIMING
+    return None
+
+
+def stage_totals(timings):
+    """[(stage, total_seconds, calls)] in order of first occurrence."""
+    totals = {}
+    for name, seconds in timings:
+        total, calls = totals.get(name, (0.0, 0))
+        totals[name] = (total + seconds, calls + 1)
+    return [(name, total, calls) for name, (total, calls) in totals.items()]
+
+
+def server_timing(timings, app_seconds=None):
+    """Server-Timing header value; repeated stages are summed, with the call count as desc."""
+    parts = []
+    for name, total, calls in stage_totals(timings):
+        entry = f'{name};dur={total * 1000:.1f}'
+        if calls > 1:
+            entry += f';desc="{calls} calls"'
+        parts.append(entry)
+    if app_seconds is not None:
+        parts.append(f'app;dur={app_seconds * 1000:.1f}')
+    return ', '.join(parts)
+
+
+# Innermost frames of threads that are parked, not working (idle pool workers, the idle event loop)
+IDLE_FRAMES = {('threading.py', 'wait'), ('queue.py', 'get'), ('selectors.py', 'select')}
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all other threads every `interval`
+    seconds from a daemon thread. Results are folded stacks
+    ('root;caller;callee' → samples).
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = float(interval)
+        self.stacks   = Counter()
+        self.samples  = 0
+        self._stop    = threading.Event()
+        self._thread  = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in IDLE_FRAMES:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def top_functions(self, n=TOP_FUNCTIONS):
+        """[(function, self samples)] for the innermost frames seen most often."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def write(self, path_stem, summary):
+        path_stem = Path(path_stem)
+        path_stem.parent.mkdir(parents=True, exist_ok=True)
+        path_stem.with_suffix('.collapsed').write_text(
+            ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common()))
+        summary = dict(summary, samples=self.samples, interval_s=self.interval,
+                       top_functions=self.top_functions())
+        path_stem.with_suffix('.json').write_text(json.dumps(summary, indent=2))
+
+
+class ProfileMiddleware:
+    """
+    ASGI middleware that profiles requests asking for it (see module
+    docstring); everything else passes straight through.
+    """
+
+    def __init__(self, app, profile_dir=None, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.app         = app
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.interval    = interval
+        self._sampling   = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        mode = profile_mode(scope) if scope['type'] == 'http' else None
+        if mode is None:
+            return await self.app(scope, receive, send)
+
+        timings    = []
+        token      = request_stages.set(timings)
+        t0         = time.perf_counter()
+        sampler    = None
+        profile_id = None
+        if mode == MODE_SAMPLE and self.profile_dir is not None and self._sampling.acquire(blocking=False):
+            slug       = re.sub(r'[^A-Za-z0-9]+', '-', scope['path']).strip('-') or 'root'
+            profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}"
+            sampler    = StackSampler(self.interval).start()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', server_timing(timings, time.perf_counter() - t0).encode()))
+                if profile_id is not None:
+                    headers.append((b'x-profile-id', profile_id.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total = time.perf_counter() - t0
+            request_stages.reset(token)
+            breakdown = ', '.join(f'{name} {secs * 1000:.1f}' + (f' ×{calls}' if calls > 1 else '')
+                                  for name, secs, calls in stage_totals(timings))
+            print(f"Profile {scope['method']} {scope['path']}: {total * 1000:.1f} ms — {breakdown or 'no stages'}")
+            if sampler is not None:
+                sampler.stop()
+                self._sampling.release()
+                try:
+                    sampler.write(self.profile_dir / profile_id, {
+                        'method'  : scope['method'],
+                        'path'    : scope['path'],
+                        'query'   : scope.get('query_string', b'').decode('latin-1'),
+                        'total_ms': round(total * 1000, 1),
+                        'stages'  : [{'stage': name, 'ms': round(secs * 1000, 1), 'calls': calls}
+                                     for name, secs, calls in stage_totals(timings)],
+                    })
+                    print(f'  Profile written to {self.profile_dir / profile_id}.collapsed')
+                except OSError as e:
+                    print(f'  Profile {profile_id} could not be written: {e}')
+
@@ -0,0 +1,127 @@
+"""
+Valvoline Weather Analytics — Shared Model Arrays
+
+Each uvicorn worker used to unpickle all six LightGBM boosters into its
+own heap, so every extra worker paid for the models again. This module
+exports the pickle's two model trios — the forward model with its 90%
+interval, which the API serves, and model_B with its interval, which
+needs lagged features no endpoint builds yet — as fused FlatEnsembles
+(tree_engine) on disk, and loads them back memory-mapped read-only.
+Every worker then maps the same files and the node arrays live once, in
+the OS page cache, however many workers run.
+
+The processed data is shared the same way through the columnar snapshot
+(snapshot.py); together they keep the per-worker resident memory to the
+interpreter and the small per-store lookup tables.
+
+Build with:
+    python scripts/build_shared_models.py
+
+Layout:
+    shared_models/
+        manifest.json          → groups, features, categoricals, label encoder
+                                 classes, source pickle size and digest
+        model_B_interval/      → FlatEnsemble.save() of model_B, Q05, Q95
+        model_FWD_interval/    → FlatEnsemble.save() of FWD, FWD_Q05, FWD_Q95
+
+The flat walk is bit-identical to LightGBM but roughly twice as slow per
+row as the native booster, so the API only serves from these arrays when
+SHARED_MODELS=1 — worth it when memory, not CPU, limits the worker count.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import manifest as build_manifest
+from tree_engine import FlatEnsemble, FusedModel
+
+SHARED_MODELS_DIRNAME = 'shared_models'
+SHARED_MODELS_VERSION = 2
+
+# group name → (model keys in output column order, feature list key) in the production pickle
+MODEL_GROUPS = {
+    'model_B_interval'  : (('model_B_oc_regression', 'model_Q05_lower_bound', 'model_Q95_upper_bound'),
+                           'features'),
+    'model_FWD_interval': (('model_FWD', 'model_FWD_Q05', 'model_FWD_Q95'), 'forward_features'),
+}
+
+# Non-model entries of the pickle, kept in the manifest so a worker serving
+# the shared arrays never has to unpickle the boosters to get at them
+METADATA_KEYS = ('features', 'forward_features', 'categoricals', 'label_encoders')
+
+
+def _metadata(models):
+    meta = {key: list(models[key]) for key in METADATA_KEYS if key != 'label_encoders'}
+    # A fitted LabelEncoder is just its classes_
+    meta['label_encoders'] = {col: le.classes_.tolist() for col, le in models['label_encoders'].items()}
+    return meta
+
+
+def write_shared_models(models, out_dir, source_pkl=None):
+    """Export the MODEL_GROUPS of the production pickle dict under out_dir. Returns the manifest."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    groups = {}
+    for name, (keys, feature_key) in MODEL_GROUPS.items():
+        features = models[feature_key]
+        fused    = FlatEnsemble.fuse([FlatEnsemble.from_lightgbm(models[k], features) for k in keys])
+        fused.save(out_dir / name)
+        groups[name] = {'models': list(keys), 'trees': fused.n_trees, 'nodes': int(len(fused.value))}
+
+    manifest = {
+        'version'   : SHARED_MODELS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'groups'    : groups,
+        'metadata'  : _metadata(models),
+        # Content digest rather than mtime: the pickle is copied into the
+        # Docker image separately from the exported arrays.
+        'source'    : build_manifest.source_stats(source_pkl, digest=True) if source_pkl else None,
+    }
+    return build_manifest.write_manifest(out_dir, manifest)
+
+
+def read_manifest(shared_dir):
+    manifest = build_manifest.read_manifest(shared_dir, SHARED_MODELS_VERSION)
+    if manifest is None or set(manifest.get('groups', ())) != set(MODEL_GROUPS):
+        return None
+    return manifest
+
+
+def shared_models_are_current(shared_dir, pkl_path):
+    """True if an export exists and was made from the model pickle currently on disk."""
+    manifest = read_manifest(shared_dir)
+    return manifest is not None and build_manifest.built_from(manifest, pkl_path, digest=True)
+
+
+def load_shared_models(shared_dir, mmap=True):
+    """
+    {group name: FusedModel} backed by the exported arrays. With mmap=True
+    the arrays are mapped read-only, so all processes share one copy.
+    """
+    shared_dir = Path(shared_dir)
+    if read_manifest(shared_dir) is None:
+        raise FileNotFoundError(f'No shared model manifest in {shared_dir}')
+    return {name: FusedModel.from_flat(FlatEnsemble.load(shared_dir / name, mmap=mmap))
+            for name in MODEL_GROUPS}
+
+
+def load_shared_metadata(shared_dir):
+    """
+    The pickle's METADATA_KEYS entries from the manifest, label encoders
+    rebuilt as fitted LabelEncoders, so callers can use them unchanged.
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    manifest = read_manifest(shared_dir)
+    if manifest is None:
+        raise FileNotFoundError(f'No shared model manifest in {shared_dir}')
+    meta     = dict(manifest['metadata'])
+    encoders = {}
+    for col, classes in meta['label_encoders'].items():
+        encoders[col]          = LabelEncoder()
+        encoders[col].classes_ = np.array(classes, dtype=object)
+    meta['label_encoders'] = encoders
+    return meta
@@ -0,0 +1,121 @@
+"""
+Valvoline Weather Analytics — Columnar Data Snapshot
+
+processed_data.csv holds ~579k store-days and parsing it dominates API
+startup. This module writes the table once as one typed .npy file per
+column plus a manifest.json, and loads it back by memory-mapping those
+files, so startup no longer parses any text.
+
+Build with:
+    python scripts/build_snapshot.py
+
+Layout:
+    processed_data_snapshot/
+        manifest.json        → row count, column order, dtypes, source CSV stats
+        columns/<name>.npy   → one array per column
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import manifest as build_manifest
+
+SNAPSHOT_DIRNAME = 'processed_data_snapshot'
+COLUMNS_DIRNAME  = 'columns'
+SNAPSHOT_VERSION = 1
+
+
+def _column_file(name):
+    # Column names are plain identifiers in processed_data.csv, but keep
+    # the file name safe regardless of what ends up in the header.
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name) + '.npy'
+
+
+def write_snapshot(df, out_dir, source_csv=None):
+    """Write df as a columnar snapshot under out_dir. Returns the manifest."""
+    out_dir  = Path(out_dir)
+    cols_dir = out_dir / COLUMNS_DIRNAME
+    cols_dir.mkdir(parents=True, exist_ok=True)
+
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        entry  = {'name': name, 'file': _column_file(name)}
+
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            entry['kind'] = 'datetime'
+            values = series.to_numpy()
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            entry['kind'] = 'numeric'
+            values = series.to_numpy(dtype=bool)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            entry['kind'] = 'numeric'
+            # Nullable integer columns come back as float so NaN survives.
+            if series.isna().any():
+                values = series.to_numpy(dtype=float)
+            else:
+                values = series.to_numpy(dtype=getattr(series.dtype, 'numpy_dtype', series.dtype))
+        else:
+            # Text columns (store_city, store_state, ...) are low-cardinality:
+            # store integer codes and keep the categories in the manifest.
+            entry['kind'] = 'category'
+            cat = pd.Categorical(series)
+            entry['categories'] = [str(c) for c in cat.categories]
+            values = np.asarray(cat.codes, dtype=np.int32)
+
+        entry['dtype'] = str(values.dtype)
+        np.save(cols_dir / entry['file'], values, allow_pickle=False)
+        columns.append(entry)
+
+    manifest = {
+        'version'   : SNAPSHOT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'rows'      : int(len(df)),
+        'columns'   : columns,
+        'source'    : build_manifest.source_stats(source_csv) if source_csv else None,
+    }
+    return build_manifest.write_manifest(out_dir, manifest)
+
+
+def read_manifest(snapshot_dir):
+    return build_manifest.read_manifest(snapshot_dir, SNAPSHOT_VERSION)
+
+
+def snapshot_is_current(snapshot_dir, csv_path):
+    """
+    True if a snapshot exists and was built from the CSV currently on disk.
+    A missing CSV (e.g. inside the Docker image) counts as current.
+    """
+    manifest = read_manifest(snapshot_dir)
+    return manifest is not None and build_manifest.built_from(manifest, csv_path)
+
+
+def load_snapshot(snapshot_dir, mmap=True):
+    """
+    Load a snapshot as a DataFrame. With mmap=True the numeric columns stay
+    backed by the .npy files (copy-on-write), so the OS page cache serves
+    them and nothing is parsed.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest     = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f'No snapshot manifest in {snapshot_dir}')
+
+    mmap_mode = 'c' if mmap else None
+    data = {}
+    for entry in manifest['columns']:
+        values = np.load(
+            snapshot_dir / COLUMNS_DIRNAME / entry['file'],
+            mmap_mode=mmap_mode, allow_pickle=False,
+        )
+        if len(values) != manifest['rows']:
+            raise ValueError(f"Snapshot column {entry['name']} has {len(values)} rows, "
+                             f"expected {manifest['rows']}")
+        if entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        data[entry['name']] = values
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,108 @@
+"""
+Valvoline Weather Analytics — Store Profiles
+
+Static per-store attributes (location, bays, market/area ids, demand
+normalisers, weather sensitivities) are repeated on every row of
+processed_data. Endpoints used to find them with a full boolean scan of
+the table; this module reads them once at startup into a compact
+slot-based record per store so each lookup is a dict hit.
+"""
+
+DOW_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# column → (attribute type, default when the column is absent)
+# Defaults match the fallbacks the endpoints have always used.
+PROFILE_COLUMNS = {
+    'store_city'            : (str,   ''),
+    'store_state'           : (str,   ''),
+    'bay_count'             : (int,   3),
+    'market_id'             : (None,  0),
+    'area_id'               : (None,  0),
+    'region_id'             : (None,  0),
+    'marketing_area_id'     : (None,  0),
+    'tz_code'               : (None,  0),
+    'is_sunday_closed_store': (int,   0),
+    'store_fleet_dependency': (float, 0.067),
+    'area_avg_oc'           : (float, 45.0),
+    'market_avg_oc'         : (float, 45.0),
+    'store_vs_area_demand'  : (float, 1.0),
+    'store_vs_market_demand': (float, 1.0),
+    'store_rain_sensitivity': (float, 0.947),
+    'store_snow_sensitivity': (float, 0.960),
+    'store_dow_volatility'  : (float, 5.0),
+    'store_growth_rate'     : (float, 1.0),
+}
+
+
+class StoreProfile:
+    """Static attributes of one store, taken from its first row in processed_data."""
+
+    __slots__ = ('store_id', 'dow_baseline', 'mean_dow_baseline') + tuple(PROFILE_COLUMNS)
+
+    def __init__(self, store_id, values, dow_baseline, mean_dow_baseline):
+        self.store_id          = store_id
+        self.dow_baseline      = dow_baseline
+        self.mean_dow_baseline = mean_dow_baseline
+        for col in PROFILE_COLUMNS:
+            setattr(self, col, values[col])
+
+    @property
+    def city(self):
+        return self.store_city
+
+    @property
+    def state(self):
+        return self.store_state
+
+    @property
+    def rain_impact_pct(self):
+        return round((self.store_rain_sensitivity - 1) * 100, 1)
+
+    @property
+    def snow_impact_pct(self):
+        return round((self.store_snow_sensitivity - 1) * 100, 1)
+
+    def __repr__(self):
+        return f'StoreProfile({self.store_id}, {self.store_city}, {self.store_state})'
+
+
+def _cast(kind, value):
+    if kind is None:
+        return value
+    if kind is str:
+        return value if isinstance(value, str) else ('' if value is None else str(value))
+    return kind(value)
+
+
+def build_store_profiles(df, dow_baseline_lookup=None):
+    """
+    Build {store_id: StoreProfile} from processed_data, ordered by store_id.
+
+    dow_baseline_lookup is the {(store_id, dow): baseline} table; a weekday
+    missing from it falls back to the store's mean baseline.
+    """
+    first_rows = df.drop_duplicates('store_id', keep='first').sort_values('store_id')
+    columns    = {
+        col: (first_rows[col].tolist() if col in first_rows.columns else None)
+        for col in PROFILE_COLUMNS
+    }
+
+    if 'store_dow_baseline' in df.columns:
+        mean_baseline = df.groupby('store_id')['store_dow_baseline'].mean().to_dict()
+    else:
+        mean_baseline = {}
+    dow_baseline_lookup = dow_baseline_lookup or {}
+
+    profiles = {}
+    for i, store_id in enumerate(first_rows['store_id'].tolist()):
+        values = {}
+        for col, (kind, default) in PROFILE_COLUMNS.items():
+            raw = columns[col][i] if columns[col] is not None else default
+            values[col] = _cast(kind, raw)
+
+        mean_dow     = float(mean_baseline.get(store_id, 45.0))
+        dow_baseline = tuple(
+            float(dow_baseline_lookup.get((store_id, dow), mean_dow)) for dow in range(7)
+        )
+        profiles[int(store_id)] = StoreProfile(int(store_id), values, dow_baseline, mean_dow)
+    return profiles
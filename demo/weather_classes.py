@@ -0,0 +1,83 @@
+"""
+Valvoline Weather Analytics — Weather Classification
+
+One vectorised pass over tavg / prcp / snow / wspd arrays produces every
+weather flag the model uses, both severity scores and the wx_type bucket
+that drives the impact tables. The model path (forward_batch) and the
+impact path (api.get_weather_impact, chat reports) share it.
+
+Two severities exist on purpose and are kept apart:
+    severity       — model feature: cold/heat + snow + heavy rain + wind, capped at 4
+    storm_severity — wx_type rule: like severity but heat does not count and
+                     there is no cap; >= 3 means 'severe'
+"""
+
+import numpy as np
+
+# wx_type codes are indices into this tuple
+WX_TYPES = (
+    'clear', 'very_cold', 'hot', 'light_rain', 'heavy_rain',
+    'any_snow', 'heavy_snow', 'freezing', 'high_wind', 'severe',
+)
+WX_CODES = {name: code for code, name in enumerate(WX_TYPES)}
+
+WEATHER_FLAGS = (
+    'is_freezing', 'is_very_cold', 'is_cold', 'is_comfortable', 'is_hot', 'is_extreme_heat',
+    'has_rain', 'has_heavy_rain', 'has_snow', 'has_heavy_snow', 'has_high_wind',
+)
+
+
+def classify_weather_arrays(tavg, prcp, snow, wspd):
+    """
+    Arrays (or scalars) of daily weather → dict of int arrays:
+    every WEATHER_FLAGS flag, 'severity', 'storm_severity' and 'wx_code'.
+    """
+    tavg = np.atleast_1d(np.asarray(tavg, dtype=float))
+    prcp = np.atleast_1d(np.asarray(prcp, dtype=float))
+    snow = np.atleast_1d(np.asarray(snow, dtype=float))
+    wspd = np.atleast_1d(np.asarray(wspd, dtype=float))
+
+    is_freezing     = tavg <= 0
+    is_very_cold    = (tavg > 0)  & (tavg <= 7)
+    is_cold         = (tavg > 7)  & (tavg <= 16)
+    is_comfortable  = (tavg > 16) & (tavg <= 27)
+    is_hot          = (tavg > 27) & (tavg <= 35)
+    is_extreme_heat = tavg > 35
+    has_rain        = prcp > 0.1
+    has_heavy_rain  = prcp > 10
+    has_snow        = (snow > 0)   & (tavg <= 2)
+    has_heavy_snow  = (snow > 150) & (tavg <= 2)
+    has_high_wind   = wspd > 30
+
+    precip_wind = (np.where(has_heavy_snow, 2, has_snow.astype(int))
+                   + has_heavy_rain + has_high_wind)
+    storm_severity = np.where(is_freezing, 2, is_very_cold.astype(int)) + precip_wind
+    severity       = np.where(is_freezing | is_extreme_heat, 2,
+                              (is_very_cold | is_hot).astype(int)) + precip_wind
+    severity       = np.minimum(severity, 4)
+
+    # First matching rule wins, in the same order the scalar rules used
+    wx_code = np.select(
+        [storm_severity >= 3, has_heavy_snow, has_snow, has_heavy_rain, has_rain,
+         has_high_wind, is_freezing, is_very_cold, is_hot],
+        [WX_CODES[t] for t in ('severe', 'heavy_snow', 'any_snow', 'heavy_rain', 'light_rain',
+                               'high_wind', 'freezing', 'very_cold', 'hot')],
+        default=WX_CODES['clear'],
+    )
+
+    flags = {
+        'is_freezing': is_freezing, 'is_very_cold': is_very_cold, 'is_cold': is_cold,
+        'is_comfortable': is_comfortable, 'is_hot': is_hot, 'is_extreme_heat': is_extreme_heat,
+        'has_rain': has_rain, 'has_heavy_rain': has_heavy_rain, 'has_snow': has_snow,
+        'has_heavy_snow': has_heavy_snow, 'has_high_wind': has_high_wind,
+    }
+    out = {name: values.astype(int) for name, values in flags.items()}
+    out['severity']       = severity
+    out['storm_severity'] = storm_severity
+    out['wx_code']        = wx_code
+    return out
+
+
+def wx_types(codes):
+    """wx_code array → list of wx_type names."""
+    return [WX_TYPES[c] for c in np.asarray(codes).tolist()]
@@ -0,0 +1,90 @@
+"""
+Valvoline Weather Analytics — Open-Meteo Fetching
+
+Open-Meteo's forecast endpoint accepts comma-separated latitude and
+longitude lists and answers with one result per location. fetch_forecasts
+uses that to get many stores' forecasts in a few calls: locations are
+split into chunks of OPEN_METEO_BATCH_SIZE (URL length and upstream
+fair-use limits), the chunks are requested concurrently over the pooled
+client, and the response is split back into one forecast per location.
+
+A single-store lookup is the same call with one location.
+"""
+
+import asyncio
+import os
+
+DAILY_VARIABLES = (
+    'temperature_2m_max', 'temperature_2m_min', 'temperature_2m_mean',
+    'precipitation_sum', 'snowfall_sum', 'windspeed_10m_max',
+)
+
+BATCH_SIZE = int(os.environ.get('OPEN_METEO_BATCH_SIZE', 100))
+
+
+def parse_open_meteo_daily(data, limit=None):
+    """Open-Meteo 'daily' block → list of weather dicts in model units."""
+    n = len(data['time']) if limit is None else min(limit, len(data['time']))
+    forecast = []
+    for i in range(n):
+        forecast.append({
+            'date': data['time'][i],
+            'tavg': float(data['temperature_2m_mean'][i] or 15.0),
+            'tmin': float(data['temperature_2m_min'][i]  or 10.0),
+            'tmax': float(data['temperature_2m_max'][i]  or 20.0),
+            'prcp': float(data['precipitation_sum'][i]   or 0.0),
+            'snow': float((data['snowfall_sum'][i] or 0.0) * 10),
+            'wspd': float(data['windspeed_10m_max'][i]   or 0.0),
+        })
+    return forecast
+
+
+def forecast_url(coords, days=None, start=None, end=None):
+    """
+    Relative /v1/forecast URL for [(lat, lon), ...] and either a rolling
+    horizon (days) or a fixed range (start, end as YYYY-MM-DD).
+    """
+    lats = ','.join(str(lat) for lat, _ in coords)
+    lons = ','.join(str(lon) for _, lon in coords)
+    url  = (
+        f"/v1/forecast?"
+        f"latitude={lats}&longitude={lons}"
+        f"&daily={','.join(DAILY_VARIABLES)}"
+        f"&timezone=auto"
+    )
+    if days is not None:
+        return url + f"&forecast_days={days}"
+    return url + f"&start_date={start}&end_date={end}"
+
+
+async def _fetch_chunk(client, coords, days, start, end):
+    response = await client.get(forecast_url(coords, days, start, end))
+    response.raise_for_status()
+    body = response.json()
+    # One location → a single object; several → a list in request order
+    results = body if isinstance(body, list) else [body]
+    if len(results) != len(coords):
+        raise ValueError(f'Open-Meteo returned {len(results)} locations for {len(coords)} requested')
+    return [parse_open_meteo_daily(r['daily'], limit=days) for r in results]
+
+
+async def fetch_forecasts(client, coords, days=None, start=None, end=None, batch_size=None):
+    """
+    Forecasts for every (lat, lon) in coords, aligned with coords. Each
+    entry is a list of daily weather dicts, or the exception raised for
+    that location's chunk.
+    """
+    coords     = list(coords)
+    batch_size = batch_size or BATCH_SIZE
+    chunks     = [coords[i:i + batch_size] for i in range(0, len(coords), batch_size)]
+    answers    = await asyncio.gather(
+        *(_fetch_chunk(client, chunk, days, start, end) for chunk in chunks),
+        return_exceptions=True,
+    )
+    out = []
+    for chunk, answer in zip(chunks, answers):
+        if isinstance(answer, Exception):
+            out.extend([answer] * len(chunk))
+        else:
+            out.extend(answer)
+    return out
@@ -0,0 +1,63 @@
+import sys
+import argparse
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+DATA_DIR = ROOT / "notebooks" / "valvoline_production"
+
+for p in [ROOT, DEMO]:
+    if str(p) not in sys.path:
+        sys.path.append(str(p))
+
+from shared_models import (MODEL_GROUPS, METADATA_KEYS, SHARED_MODELS_DIRNAME, load_shared_metadata, load_shared_models,
+                           write_shared_models)
+
+# initial argument parsing
+parser = argparse.ArgumentParser(description="Export the served model trios as memory-mappable fused arrays.")
+parser.add_argument("--models", default=str(DATA_DIR / "valvoline_models_production.pkl"), help="Model pickle.")
+parser.add_argument("--out", default=None, help=f"Output directory. (default: <models dir>/{SHARED_MODELS_DIRNAME})")
+parser.add_argument("--check-rows", type=int, default=256, help="Random rows used for the parity check.")
+args = parser.parse_args()
+
+models_path = Path(args.models)
+out_dir = Path(args.out) if args.out else models_path.parent / SHARED_MODELS_DIRNAME
+
+with open(models_path, "rb") as f:
+    models = pickle.load(f)
+
+t0 = time.perf_counter()
+manifest = write_shared_models(models, out_dir, source_pkl=models_path)
+t_export = time.perf_counter() - t0
+
+shared = load_shared_models(out_dir)
+rng = np.random.default_rng(0)
+for name, (keys, feature_key) in MODEL_GROUPS.items():
+    features = models[feature_key]
+    X = rng.normal(0, 20, (args.check_rows, len(features)))
+    for j, feature in enumerate(features):
+        if feature in models["categoricals"]:
+            X[:, j] = rng.integers(0, 12, len(X))
+    expected = np.column_stack([models[k].predict(pd.DataFrame(X, columns=features)) for k in keys])
+    max_diff = float(np.max(np.abs(shared[name].predict(X) - expected)))
+    assert max_diff == 0.0, f"{name}: shared predictions differ from LightGBM by {max_diff}"
+
+    group = manifest["groups"][name]
+    print(f"{name:<20} trees={group['trees']:<5} nodes={group['nodes']:<9,} parity OK")
+
+meta = load_shared_metadata(out_dir)
+for key in METADATA_KEYS:
+    if key == "label_encoders":
+        assert {c: le.classes_.tolist() for c, le in meta[key].items()} == \
+               {c: le.classes_.tolist() for c, le in models[key].items()}, "label encoders differ"
+    else:
+        assert meta[key] == list(models[key]), f"{key} differs"
+print(f"metadata             {', '.join(METADATA_KEYS)} OK")
+
+print("Shared models written to:", out_dir.resolve())
+print(f"Export: {t_export:.2f}s")
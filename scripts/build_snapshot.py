@@ -0,0 +1,40 @@
+import sys
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+DATA_DIR = ROOT / "notebooks" / "valvoline_production"
+
+for p in [ROOT, DEMO]:
+    if str(p) not in sys.path:
+        sys.path.append(str(p))
+
+from snapshot import SNAPSHOT_DIRNAME, write_snapshot, load_snapshot
+
+# initial argument parsing
+parser = argparse.ArgumentParser(description="Convert processed_data.csv into the API's columnar snapshot.")
+parser.add_argument("--csv", default=str(DATA_DIR / "processed_data.csv"), help="Source CSV.")
+parser.add_argument("--out", default=None, help=f"Snapshot directory. (default: <csv dir>/{SNAPSHOT_DIRNAME})")
+args = parser.parse_args()
+
+csv_path = Path(args.csv)
+out_dir = Path(args.out) if args.out else csv_path.parent / SNAPSHOT_DIRNAME
+
+t0 = time.perf_counter()
+df = pd.read_csv(csv_path, parse_dates=["invoice_date"])
+t_csv = time.perf_counter() - t0
+
+manifest = write_snapshot(df, out_dir, source_csv=csv_path)
+
+t0 = time.perf_counter()
+check = load_snapshot(out_dir)
+t_snap = time.perf_counter() - t0
+assert check.shape == df.shape, f"Snapshot shape {check.shape} != CSV shape {df.shape}"
+
+print("Snapshot written to:", out_dir.resolve())
+print(f"Rows: {manifest['rows']:,}  Columns: {len(manifest['columns'])}")
+print(f"CSV parse: {t_csv:.2f}s  Snapshot load: {t_snap:.3f}s")
@@ -0,0 +1,60 @@
+import sys
+import argparse
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+DATA_DIR = ROOT / "notebooks" / "valvoline_production"
+
+for p in [ROOT, DEMO]:
+    if str(p) not in sys.path:
+        sys.path.append(str(p))
+
+from tree_engine import FlatEnsemble
+
+# model key → feature list key in the production pickle
+MODEL_FEATURES = {
+    "model_B_oc_regression": "features",
+    "model_Q05_lower_bound": "features",
+    "model_Q95_upper_bound": "features",
+    "model_FWD": "forward_features",
+    "model_FWD_Q05": "forward_features",
+    "model_FWD_Q95": "forward_features",
+}
+
+# initial argument parsing
+parser = argparse.ArgumentParser(description="Export the production LightGBM models as flat node arrays.")
+parser.add_argument("--models", default=str(DATA_DIR / "valvoline_models_production.pkl"), help="Model pickle.")
+parser.add_argument("--out", default=str(DATA_DIR / "flat_models"), help="Output directory, one subdirectory per model.")
+parser.add_argument("--check-rows", type=int, default=256, help="Random rows used for the parity check.")
+args = parser.parse_args()
+
+with open(args.models, "rb") as f:
+    models = pickle.load(f)
+
+rng = np.random.default_rng(0)
+out_dir = Path(args.out)
+for key, feature_key in MODEL_FEATURES.items():
+    features = models[feature_key]
+    t0 = time.perf_counter()
+    flat = FlatEnsemble.from_lightgbm(models[key], features)
+    flat.save(out_dir / key)
+    t_export = time.perf_counter() - t0
+
+    X = rng.normal(0, 20, (args.check_rows, len(features)))
+    for j, name in enumerate(features):
+        if name in models["categoricals"]:
+            X[:, j] = rng.integers(0, 12, len(X))
+    expected = models[key].predict(pd.DataFrame(X, columns=features))
+    max_diff = float(np.max(np.abs(flat.predict(X) - expected)))
+    assert max_diff == 0.0, f"{key}: flat predictions differ from LightGBM by {max_diff}"
+
+    print(f"{key:<24} trees={flat.n_trees:<5} nodes={len(flat.value):<8,} depth={flat.depth}  "
+          f"export {t_export:.2f}s  parity OK")
+
+print("Flat models written to:", out_dir.resolve())
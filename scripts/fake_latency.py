@@ -0,0 +1,59 @@
+"""
+Latency distributions for the local upstream stand-ins
+(fake_open_meteo.py, fake_ollama.py).
+
+A spec is a plain number of seconds or kind:params:
+
+    0.05                   fixed 50 ms
+    fixed:0.05             same
+    uniform:0.02:0.2       uniform between 20 and 200 ms
+    normal:0.1:0.03        normal, mean 100 ms, sd 30 ms (clipped at 0)
+    lognormal:0.1:0.5      log-normal with median 100 ms and sigma 0.5 —
+                           a long right tail, like real upstream APIs
+"""
+
+import math
+import random
+
+
+class Latency:
+    """Callable returning one delay in seconds per call; seeded, so runs repeat."""
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, kind='fixed', params=(0.0,), seed=0):
+        if kind not in self.KINDS:
+            raise ValueError(f'Unknown latency kind {kind!r}; expected one of {self.KINDS}')
+        expected = 1 if kind == 'fixed' else 2
+        if len(params) != expected:
+            raise ValueError(f'{kind} latency takes {expected} parameter(s), got {len(params)}')
+        self.kind   = kind
+        self.params = tuple(float(p) for p in params)
+        self._rng   = random.Random(seed)
+
+    def __call__(self):
+        a = self.params[0]
+        if self.kind == 'fixed':
+            return a
+        b = self.params[1]
+        if self.kind == 'uniform':
+            return self._rng.uniform(a, b)
+        if self.kind == 'normal':
+            return max(0.0, self._rng.gauss(a, b))
+        return self._rng.lognormvariate(math.log(a), b) if a > 0 else 0.0
+
+    def __repr__(self):
+        return ':'.join([self.kind, *(f'{p:g}' for p in self.params)])
+
+
+def parse_latency(spec, seed=0):
+    """Latency from a spec string (see module docstring), a number, or an existing Latency."""
+    if isinstance(spec, Latency):
+        return spec
+    if isinstance(spec, (int, float)):
+        return Latency('fixed', (spec,), seed)
+    text = str(spec).strip()
+    if ':' not in text:
+        return Latency('fixed', (float(text),), seed)
+    kind, *params = text.split(':')
+    return Latency(kind, [float(p) for p in params], seed)
@@ -0,0 +1,170 @@
+"""
+Local stand-in for Ollama's chat API, for offline load tests of the
+chat endpoints.
+
+Serves POST /api/chat like Ollama does — one JSON body, or with
+"stream": true one NDJSON chunk per token and a final "done" chunk —
+including prompt_eval_count / eval_count and the *_duration timings.
+Generation time is simulated:
+
+    --latency         time to first token (prompt evaluation), a delay or
+                      distribution spec (see fake_latency.py)
+    --token-latency   delay per generated token
+    --tokens          tokens per answer (capped by options.num_predict)
+    --parallel        generations run at once; the rest wait, like a
+                      single GPU serving OLLAMA_NUM_PARALLEL requests
+    --drop-after      close streams after this many tokens without the
+                      final "done" chunk, like an Ollama that crashed or
+                      was restarted mid-answer
+
+GET /api/tags lists the model and GET /stats returns request counts.
+
+    python scripts/fake_ollama.py --port 11435 --latency lognormal:0.3:0.4
+    OLLAMA_URL=http://127.0.0.1:11435 uvicorn api:app --port 8000
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fake_latency import parse_latency
+
+MODEL_NAME = 'llama3.1:8b'
+ANSWER     = ('90% confident between 38 and 54 oil changes, most likely around 46. Light rain midweek '
+              'trims a few percent off your normal Wednesday, and the weekend looks busy as usual. ').split(' ')
+
+
+def _answer_tokens(n):
+    words = [w for w in ANSWER if w]
+    return [(' ' if i else '') + words[i % len(words)] for i in range(n)]
+
+
+class FakeOllama(ThreadingHTTPServer):
+    """Threaded HTTP server simulating Ollama generation times and concurrency."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, token_latency=0.0, tokens=60, parallel=1, drop_after=None):
+        super().__init__(address, _Handler)
+        self.latency       = parse_latency(latency)
+        self.token_latency = parse_latency(token_latency, seed=1)
+        self.tokens        = int(tokens)
+        self.slots         = threading.Semaphore(max(1, int(parallel)))
+        self.drop_after    = drop_after
+        self.requests      = 0
+        self.streamed      = 0
+        self.lock          = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def delays(self):
+        with self.lock:
+            return self.latency(), self.token_latency()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/api/tags':
+            return self._send(200, {'models': [{'name': MODEL_NAME, 'model': MODEL_NAME}]})
+        if self.path == '/stats':
+            return self._send(200, {'requests': self.server.requests, 'streamed': self.server.streamed})
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/api/chat':
+            return self._send(404, {'error': 'not found'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            messages = body['messages']
+        except (KeyError, ValueError):
+            return self._send(400, {'error': 'invalid request'})
+
+        server  = self.server
+        stream  = bool(body.get('stream', True))
+        limit   = int((body.get('options') or {}).get('num_predict') or server.tokens)
+        tokens  = _answer_tokens(min(server.tokens, limit))
+        prompt  = max(1, sum(len(m.get('content') or '') for m in messages) // 4)
+        with server.lock:
+            server.requests += 1
+            server.streamed += stream
+
+        with server.slots:
+            first, per_token = server.delays()
+            t0 = time.perf_counter()
+            time.sleep(first)
+            timings = {
+                'load_duration'       : 0,
+                'prompt_eval_count'   : prompt,
+                'prompt_eval_duration': int(first * 1e9),
+                'eval_count'          : len(tokens),
+                'eval_duration'       : int(per_token * len(tokens) * 1e9),
+            }
+            if not stream:
+                time.sleep(per_token * len(tokens))
+                return self._send(200, dict(self._chunk(''.join(tokens), True), **timings,
+                                            total_duration=int((time.perf_counter() - t0) * 1e9)))
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                if server.drop_after is not None and i >= server.drop_after:
+                    return
+                time.sleep(per_token)
+                self._write_line(self._chunk(token, False))
+            self._write_line(dict(self._chunk('', True), **timings,
+                                  total_duration=int((time.perf_counter() - t0) * 1e9)))
+
+    @staticmethod
+    def _chunk(content, done):
+        return {
+            'model'     : MODEL_NAME,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'message'   : {'role': 'assistant', 'content': content},
+            'done'      : done,
+        }
+
+    def _write_line(self, obj):
+        self.wfile.write(json.dumps(obj).encode() + b'\n')
+        self.wfile.flush()
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_in_thread(host='127.0.0.1', port=0, **kwargs):
+    """Start a FakeOllama on a background thread; returns the server."""
+    server = FakeOllama((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local stand-in for Ollama's chat API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--latency', default='0.3', help='Time to first token: seconds or a distribution.')
+    parser.add_argument('--token-latency', default='0.02', help='Delay per generated token.')
+    parser.add_argument('--tokens', type=int, default=60, help='Tokens per answer.')
+    parser.add_argument('--parallel', type=int, default=1, help='Generations run at once.')
+    parser.add_argument('--drop-after', type=int, default=None, help='Cut streams after this many tokens.')
+    args = parser.parse_args()
+
+    server = FakeOllama((args.host, args.port), latency=args.latency, token_latency=args.token_latency,
+                        tokens=args.tokens, parallel=args.parallel, drop_after=args.drop_after)
+    print(f'Fake Ollama listening on {server.url} (first token {server.latency}, '
+          f'{server.token_latency} per token, {args.parallel} parallel)')
+    server.serve_forever()
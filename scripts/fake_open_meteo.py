@@ -0,0 +1,140 @@
+"""
+Local stand-in for the Open-Meteo forecast API, for offline testing of
+the API's weather fetching and cache warm-up.
+
+Serves GET /v1/forecast with the same shape as the real service:
+comma-separated latitude/longitude lists, daily=..., forecast_days or
+start_date/end_date. One location answers with an object, several with a
+list. Weather values are deterministic per (lat, lon, date). GET /stats
+returns request and location counts. --latency takes a fixed delay or a
+distribution (see fake_latency.py).
+
+    python scripts/fake_open_meteo.py --port 8081 --latency lognormal:0.08:0.4
+    OPEN_METEO_URL=http://127.0.0.1:8081 uvicorn api:app --port 8000
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fake_latency import parse_latency
+
+MAX_LOCATIONS = 1000
+
+
+def _daily_values(lat, lon, day):
+    seed = zlib.crc32(f'{lat:.4f},{lon:.4f},{day}'.encode())
+    tavg = -8 + (seed % 400) / 10                    # -8 .. 32 °C
+    return {
+        'temperature_2m_mean': round(tavg, 1),
+        'temperature_2m_min' : round(tavg - 5, 1),
+        'temperature_2m_max' : round(tavg + 5, 1),
+        'precipitation_sum'  : [0.0, 0.0, 0.4, 3.2, 12.5][(seed >> 9) % 5],
+        'snowfall_sum'       : [0.0, 0.0, 0.0, 1.5, 18.0][(seed >> 12) % 5] if tavg <= 2 else 0.0,
+        'windspeed_10m_max'  : float((seed >> 15) % 45),
+    }
+
+
+def forecast_response(query):
+    """
+    Response body for a parsed /v1/forecast query ({name: [value]}).
+    Raises ValueError for requests the real API would reject.
+    """
+    lats = [float(v) for v in query['latitude'][0].split(',')]
+    lons = [float(v) for v in query['longitude'][0].split(',')]
+    if len(lats) != len(lons):
+        raise ValueError('latitude and longitude must have the same number of elements')
+    if len(lats) > MAX_LOCATIONS:
+        raise ValueError(f'at most {MAX_LOCATIONS} locations per request')
+
+    if 'start_date' in query:
+        first = date.fromisoformat(query['start_date'][0])
+        last  = date.fromisoformat(query['end_date'][0])
+    else:
+        first = date.today()
+        last  = first + timedelta(days=int(query.get('forecast_days', ['7'])[0]) - 1)
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+    variables = query.get('daily', [''])[0].split(',')
+    results   = []
+    for lat, lon in zip(lats, lons):
+        rows  = [_daily_values(lat, lon, d.isoformat()) for d in days]
+        daily = {'time': [d.isoformat() for d in days]}
+        for var in variables:
+            daily[var] = [row.get(var) for row in rows]
+        results.append({'latitude': lat, 'longitude': lon, 'timezone': 'GMT', 'daily': daily})
+    return results[0] if len(results) == 1 else results
+
+
+class FakeOpenMeteo(ThreadingHTTPServer):
+    """Threaded HTTP server with request counters and optional latency (seconds or spec)."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0):
+        super().__init__(address, _Handler)
+        self.latency   = parse_latency(latency)
+        self.requests  = 0
+        self.locations = 0
+        self.lock      = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/stats':
+            return self._send(200, {'requests': self.server.requests, 'locations': self.server.locations})
+        if parsed.path != '/v1/forecast':
+            return self._send(404, {'error': True, 'reason': 'not found'})
+        try:
+            body = forecast_response(parse_qs(parsed.query))
+        except (KeyError, ValueError) as e:
+            return self._send(400, {'error': True, 'reason': str(e)})
+        with self.server.lock:
+            self.server.requests  += 1
+            self.server.locations += len(body) if isinstance(body, list) else 1
+            delay = self.server.latency()
+        if delay:
+            time.sleep(delay)
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_in_thread(host='127.0.0.1', port=0, latency=0.0):
+    """Start a FakeOpenMeteo on a background thread; returns the server."""
+    server = FakeOpenMeteo((host, port), latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local stand-in for the Open-Meteo forecast API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', default='0', help='Delay before each response: seconds or a distribution, '
+                                                       'e.g. uniform:0.02:0.2 or lognormal:0.08:0.4.')
+    args = parser.parse_args()
+
+    server = FakeOpenMeteo((args.host, args.port), latency=args.latency)
+    print(f'Fake Open-Meteo listening on {server.url} (latency {server.latency})')
+    server.serve_forever()
@@ -0,0 +1,288 @@
+"""
+Load benchmark for the API against local Open-Meteo and Ollama stand-ins.
+
+Starts fake_open_meteo and fake_ollama with the given latency
+distributions, starts `uvicorn api:app` pointed at them, then drives a
+weighted mix of requests at fixed concurrency:
+
+    week         GET  /predict/week/{store}/{today}
+    7days        POST /predict/7days          (live forecast)
+    impact       POST /predict/impact         (weather supplied)
+    chat         POST /v1/chat/completions    (fast-path and LLM questions)
+    chat_stream  POST /v1/chat/completions    ("stream": true, timed to [DONE])
+
+After a warm-up period, every request is timed for --duration seconds.
+Throughput, error counts and p50/p95/p99 latency, overall and per
+endpoint, are written as JSON together with the commit, the settings and
+the API's /health counters. --compare prints the change against an earlier
+result file.
+
+    python scripts/load_benchmark.py --concurrency 16 --duration 60 --out bench/load.json
+    python scripts/load_benchmark.py --mix week=1,chat=1 --llm-latency lognormal:0.5:0.5 \\
+        --api-env SHARED_MODELS=1 --workers 4 --compare bench/load.json
+"""
+
+import sys
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+SCRIPTS = ROOT / "scripts"
+
+if str(SCRIPTS) not in sys.path:
+    sys.path.append(str(SCRIPTS))
+
+import fake_ollama
+import fake_open_meteo
+
+KINDS = ("week", "7days", "impact", "chat", "chat_stream")
+QUESTIONS = (
+    "How many oil changes should store {store} expect tomorrow?",      # fast path
+    "What's the weekly range for store {store}?",                      # fast path
+    "Why would the weather affect store {store} this week?",           # LLM
+    "Should I add staff at store {store} on Saturday?",                # LLM
+)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}; expected one of {KINDS}")
+        mix[kind] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def summarize(samples, duration):
+    """samples: [(status, seconds)] → counts, throughput and latency percentiles (ms)."""
+    latencies = sorted(s for _, s in samples)
+    statuses = Counter(str(status) for status, _ in samples)
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / duration, 2),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+def build_request(kind, store, today, rng):
+    if kind == "week":
+        return "GET", f"/predict/week/{store}/{today}", None
+    if kind == "7days":
+        return "POST", "/predict/7days", {"store_id": store, "start_date": today}
+    if kind == "impact":
+        weather = [{"tavg": round(rng.uniform(-10, 32), 1), "prcp": rng.choice([0.0, 0.0, 2.5, 14.0]),
+                    "snow": rng.choice([0.0, 0.0, 0.0, 6.0]), "wspd": round(rng.uniform(0, 45), 1)}
+                   for _ in range(7)]
+        return "POST", "/predict/impact", {"store_id": store, "start_date": today, "weather": weather}
+    question = rng.choice(QUESTIONS).format(store=store)
+    body = {"model": "valvoline-weather", "messages": [{"role": "user", "content": question}]}
+    if kind == "chat_stream":
+        body["stream"] = True
+    return "POST", "/v1/chat/completions", body
+
+
+async def run_load(base_url, stores, mix, concurrency, warmup, duration, seed):
+    kinds, weights = zip(*[(k, w) for k, w in mix.items() if w > 0])
+    today = date.today().isoformat()
+    samples = defaultdict(list)
+    t_start = time.perf_counter()
+    measure_from = t_start + warmup
+    stop_at = measure_from + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300.0) as client:
+
+        async def worker(i):
+            rng = random.Random(seed * 1000 + i)
+            while True:
+                t0 = time.perf_counter()
+                if t0 >= stop_at:
+                    return
+                kind = rng.choices(kinds, weights)[0]
+                method, path, body = build_request(kind, rng.choice(stores), today, rng)
+                try:
+                    if kind == "chat_stream":
+                        async with client.stream(method, path, json=body) as response:
+                            async for _ in response.aiter_bytes():
+                                pass
+                    else:
+                        response = await client.request(method, path, json=body)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - t0
+                if t0 >= measure_from:
+                    samples[kind].append((status, elapsed))
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return samples
+
+
+def wait_for_api(base_url, process, timeout, wait_precompute):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"API exited with code {process.returncode} during startup")
+        try:
+            health = httpx.get(f"{base_url}/health", timeout=2).json()
+            precompute = health.get("precompute", {})
+            built = precompute.get("refreshes", 0) or precompute.get("failures", 0)
+            if not wait_precompute or not precompute.get("running") or built:
+                return health
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"API not ready after {timeout}s")
+
+
+def section(report, name):
+    return report["overall"] if name == "overall" else report["endpoints"].get(name)
+
+
+def print_report(report, previous=None):
+    names = ["overall", *report["endpoints"]]
+    print(f"\n{'endpoint':<12} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in names:
+        s = section(report, name)
+        line = (f"{name:<12} {s['requests']:>7} {s['errors']:>5} {s['throughput_rps']:>8} "
+                f"{s['p50_ms'] or 0:>9} {s['p95_ms'] or 0:>9} {s['p99_ms'] or 0:>9}")
+        before = section(previous, name) if previous else None
+        if before and before["requests"] and s["requests"]:
+            line += (f"   vs {previous['meta']['commit']}: rps {s['throughput_rps'] / before['throughput_rps'] - 1:+.0%}, "
+                     f"p50 {s['p50_ms'] / before['p50_ms'] - 1:+.0%}, p99 {s['p99_ms'] / before['p99_ms'] - 1:+.0%}")
+        print(line)
+
+
+# initial argument parsing
+parser = argparse.ArgumentParser(description="Load-test the API against local Open-Meteo and Ollama stand-ins.")
+parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at any time.")
+parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds.")
+parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds of load before measuring.")
+parser.add_argument("--mix", type=parse_mix, default=parse_mix("week=3,7days=3,impact=3,chat=1"),
+                    help=f"Request weights, kind=weight,... (kinds: {', '.join(KINDS)}).")
+parser.add_argument("--weather-latency", default="lognormal:0.08:0.4", help="Fake Open-Meteo delay (fake_latency.py spec).")
+parser.add_argument("--llm-latency", default="lognormal:0.3:0.4", help="Fake Ollama time to first token.")
+parser.add_argument("--token-latency", default="0.01", help="Fake Ollama delay per generated token.")
+parser.add_argument("--tokens", type=int, default=60, help="Tokens per fake Ollama answer.")
+parser.add_argument("--llm-parallel", type=int, default=1, help="Generations the fake Ollama runs at once.")
+parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+parser.add_argument("--api-env", action="append", default=[], metavar="KEY=VALUE",
+                    help="Extra environment for the API (repeatable), e.g. SHARED_MODELS=1.")
+parser.add_argument("--api-log", default=os.devnull, help="File for the API's output.")
+parser.add_argument("--startup-timeout", type=float, default=180.0, help="Seconds to wait for the API.")
+parser.add_argument("--seed", type=int, default=0, help="Seed for request choice and payloads.")
+parser.add_argument("--out", default="load_benchmark.json", help="Result JSON file.")
+parser.add_argument("--compare", default=None, help="Earlier result JSON to compare against.")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    weather = fake_open_meteo.start_in_thread(latency=args.weather_latency)
+    llm = fake_ollama.start_in_thread(latency=args.llm_latency, token_latency=args.token_latency,
+                                      tokens=args.tokens, parallel=args.llm_parallel)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    env = dict(os.environ, OPEN_METEO_URL=weather.url, OLLAMA_URL=llm.url)
+    env.update(kv.split("=", 1) for kv in args.api_env)
+    with open(args.api_log, "a") as log:
+        api = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=DEMO, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        t0 = time.perf_counter()
+        wait_for_api(base_url, api, args.startup_timeout, wait_precompute=True)
+        startup = time.perf_counter() - t0
+        stores = [s["store_id"] for s in httpx.get(f"{base_url}/stores", timeout=30).json()["stores"]]
+        print(f"API ready in {startup:.1f}s with {len(stores)} stores — "
+              f"{args.concurrency} concurrent for {args.warmup:g}s warm-up + {args.duration:g}s")
+
+        samples = asyncio.run(run_load(base_url, stores, args.mix, args.concurrency,
+                                       args.warmup, args.duration, args.seed))
+        health = httpx.get(f"{base_url}/health", timeout=30).json()
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            api.kill()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "startup_s": round(startup, 2),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "api_log")},
+        },
+        "overall": summarize([s for kind in samples.values() for s in kind], args.duration),
+        "endpoints": {kind: summarize(samples[kind], args.duration) for kind in KINDS if kind in samples},
+        "upstream": {
+            "open_meteo": {"requests": weather.requests, "locations": weather.locations},
+            "ollama": {"requests": llm.requests, "streamed": llm.streamed},
+        },
+        "api_health": health,
+    }
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    previous = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, previous)
+    print("\nResults written to:", out.resolve())
@@ -0,0 +1,252 @@
+"""
+Micro-benchmark for the API's hot helper functions, with a regression gate.
+
+Times each function in isolation, in the API process's own state (models,
+data and lookup tables loaded by importing demo/api.py), on a spread of
+representative stores — the smallest, median and largest by history and
+points in between — and a fixed week of mixed weather:
+
+    classify_weather_arrays   weather classes for a fleet chunk (64 stores x 7 days)
+    predict_day_forward       one store-day forward forecast with interval
+    get_weather_impact        7-day impact table (history cached, as served)
+    get_historical_impact     per-store history scan (lru_cache bypassed)
+    build_system_prompt       per-request prompt (static sections cached)
+    system_prompt_sections    first prompt for a store (lru_cache bypassed)
+    load_models               unpickling the model file
+    load_shared_models        mapping the shared model arrays (if exported)
+
+Each case is calibrated to run for at least --min-time seconds per round
+and timed for --repeat rounds; the median per-call time is what counts.
+
+    python scripts/micro_benchmark.py --save-baseline      # on the reference commit
+    python scripts/micro_benchmark.py --check              # on the change; exit 1 on regression
+
+--check fails when any function's median is more than --threshold slower
+than in the baseline (0.5 = 50%). Cases that look regressed are measured
+once more before failing, so a single noisy round does not. Baselines
+are only comparable on the same machine; a warning is printed otherwise.
+"""
+
+import sys
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+
+DEFAULT_BASELINE = ROOT / "micro_benchmark_baseline.json"
+
+# One week of weather, one day per common wx_type (see WEEK_TYPES)
+WEEK_START = "2025-01-06"
+WEEK = [
+    {"tavg": 18.0, "prcp": 0.0, "snow": 0.0, "wspd": 8.0},     # clear
+    {"tavg": 12.0, "prcp": 3.0, "snow": 0.0, "wspd": 12.0},    # light rain
+    {"tavg": 10.0, "prcp": 22.0, "snow": 0.0, "wspd": 20.0},   # heavy rain
+    {"tavg": 1.0, "prcp": 4.0, "snow": 6.0, "wspd": 15.0},     # snow
+    {"tavg": 4.0, "prcp": 0.0, "snow": 0.0, "wspd": 5.0},      # very cold
+    {"tavg": 33.0, "prcp": 0.0, "snow": 0.0, "wspd": 6.0},     # hot
+    {"tavg": 15.0, "prcp": 0.0, "snow": 0.0, "wspd": 55.0},    # high wind
+]
+WEEK_TYPES = ("clear", "light_rain", "heavy_rain", "any_snow", "very_cold", "hot", "high_wind")
+
+# Rows per classify_weather_arrays call: one /predict/fleet/week chunk
+FLEET_CHUNK_STORES = 64
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def measure(fn, arg_sets, repeat=7, min_time=0.1):
+    """
+    Per-call timings of fn over arg_sets (cycled). The call count per round
+    doubles until a round takes at least min_time; then `repeat` rounds are
+    timed. Returns calls per round and min/median/max microseconds per call.
+    """
+    def run(calls):
+        n = len(arg_sets)
+        t0 = time.perf_counter()
+        for i in range(calls):
+            fn(*arg_sets[i % n])
+        return time.perf_counter() - t0
+
+    calls = 1
+    while run(calls) < min_time and calls < 1 << 24:
+        calls *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        gc.collect()
+        rounds.append(run(calls) / calls * 1e6)
+    return {
+        "calls": calls,
+        "repeat": repeat,
+        "min_us": round(min(rounds), 3),
+        "median_us": round(statistics.median(rounds), 3),
+        "max_us": round(max(rounds), 3),
+    }
+
+
+def compare(results, baseline, threshold):
+    """[(name, before_us, after_us, ratio, regressed)] for the cases in both result sets."""
+    rows = []
+    for name, after in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = after["median_us"] / before["median_us"]
+        rows.append((name, before["median_us"], after["median_us"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def pick_stores(row_counts, n):
+    """n stores spread evenly over the stores sorted by history length (smallest to largest)."""
+    ranked = [store for store, _ in sorted(row_counts.items(), key=lambda kv: (kv[1], kv[0]))]
+    if n >= len(ranked):
+        return ranked
+    if n == 1:
+        return [ranked[len(ranked) // 2]]
+    return [ranked[round(i * (len(ranked) - 1) / (n - 1))] for i in range(n)]
+
+
+def build_cases(api, stores):
+    """{name: (fn, arg_sets)} against the loaded API module."""
+    import numpy as np
+    import pandas as pd
+    from shared_models import load_shared_models, shared_models_are_current
+    from weather_classes import classify_weather_arrays
+
+    dates = [str((pd.Timestamp(WEEK_START) + pd.Timedelta(days=i)).date()) for i in range(len(WEEK))]
+    days = list(zip(dates, WEEK))
+
+    def load_models():
+        with open(api.MODEL_PATH, "rb") as f:
+            return pickle.load(f)
+
+    chunk = [np.array([wx[key] for wx in WEEK] * FLEET_CHUNK_STORES) for key in ("tavg", "prcp", "snow", "wspd")]
+
+    cases = {
+        "classify_weather_arrays": (classify_weather_arrays, [tuple(chunk)]),
+        "predict_day_forward": (api.predict_day_forward,
+                                [(store, day, wx) for store in stores for day, wx in days]),
+        "get_weather_impact": (api.get_weather_impact, [(store, WEEK, WEEK_START) for store in stores]),
+        "get_historical_impact": (api.get_historical_impact.__wrapped__, [(store,) for store in stores]),
+        "build_system_prompt": (api.build_system_prompt, [(store,) for store in stores]),
+        "system_prompt_sections": (api.system_prompt_sections.__wrapped__, [(store,) for store in stores]),
+        "load_models": (load_models, [()]),
+    }
+    if shared_models_are_current(api.shared_models_path, api.MODEL_PATH):
+        cases["load_shared_models"] = (load_shared_models, [(api.shared_models_path,)])
+    return cases
+
+
+def print_results(results, rows, threshold):
+    before = {name: (b, ratio, regressed) for name, b, _, ratio, regressed in rows}
+    print(f"\n{'function':<24} {'median us':>12} {'min us':>12} {'calls':>8}   vs baseline")
+    for name, r in results.items():
+        line = f"{name:<24} {r['median_us']:>12,.1f} {r['min_us']:>12,.1f} {r['calls']:>8}"
+        if name in before:
+            b, ratio, regressed = before[name]
+            line += f"   {b:,.1f} us ({ratio - 1:+.0%})" + (f"  REGRESSED > +{threshold:.0%}" if regressed else "")
+        print(line)
+
+
+# initial argument parsing
+parser = argparse.ArgumentParser(description="Time the API's hot helper functions and gate on regressions.")
+parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline.")
+parser.add_argument("--check", action="store_true", help="Exit 1 if any function regressed beyond --threshold.")
+parser.add_argument("--threshold", type=float, default=0.5, help="Allowed slowdown vs baseline (0.5 = 50%%).")
+parser.add_argument("--stores", default=None, help="Comma-separated store IDs. (default: --n-stores spread by history)")
+parser.add_argument("--n-stores", type=int, default=5, help="Representative stores to pick.")
+parser.add_argument("--only", default=None, help="Comma-separated function names to run.")
+parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per function.")
+parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per round.")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if str(DEMO) not in sys.path:
+        sys.path.append(str(DEMO))
+    import api
+
+    row_counts = {int(store): len(rows) for store, rows in api.store_row_index.items() if store in api.store_profiles}
+    stores = [int(s) for s in args.stores.split(",")] if args.stores else pick_stores(row_counts, args.n_stores)
+    unknown = [s for s in stores if s not in api.store_profiles]
+    if unknown:
+        raise SystemExit(f"Unknown store IDs: {unknown}")
+
+    cases = build_cases(api, stores)
+    if args.only:
+        names = [n.strip() for n in args.only.split(",")]
+        missing = [n for n in names if n not in cases]
+        if missing:
+            raise SystemExit(f"Unknown functions {missing}; expected some of {list(cases)}")
+        cases = {n: cases[n] for n in names}
+
+    print(f"\nTiming {len(cases)} functions on stores {stores} "
+          f"({args.repeat} rounds of >= {args.min_time:g}s each)")
+    results = {}
+    for name, (fn, arg_sets) in cases.items():
+        results[name] = measure(fn, arg_sets, args.repeat, args.min_time)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    rows = compare(results, baseline["results"], args.threshold) if baseline else []
+
+    if args.check:
+        if baseline is None:
+            raise SystemExit(f"No baseline at {baseline_path} — run with --save-baseline first")
+        if baseline["meta"]["machine"] != machine():
+            print(f"Warning: baseline was recorded on {baseline['meta']['machine']}, this is {machine()}")
+        # Measure suspected regressions once more and keep the faster run
+        for name, *_, regressed in rows:
+            if regressed:
+                retry = measure(*cases[name], args.repeat, args.min_time)
+                if retry["median_us"] < results[name]["median_us"]:
+                    results[name] = retry
+        rows = compare(results, baseline["results"], args.threshold)
+
+    print_results(results, rows, args.threshold)
+    if baseline:
+        print(f"\nBaseline: {baseline_path} ({baseline['meta']['commit']}, {baseline['meta']['created_at']})")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "meta": {
+                "commit": git_commit(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "machine": machine(),
+                "stores": stores,
+                "settings": {"repeat": args.repeat, "min_time": args.min_time},
+            },
+            "results": results,
+        }, indent=2))
+        print("Baseline written to:", baseline_path.resolve())
+
+    if args.check:
+        regressed = [name for name, *_, r in rows if r]
+        if regressed:
+            raise SystemExit(f"\nRegression beyond +{args.threshold:.0%}: {', '.join(regressed)}")
+        print(f"\nNo function slower than baseline by more than {args.threshold:.0%}")
@@ -0,0 +1,30 @@
+# tests/test_answer_cache.py
+# Run: pytest tests/test_answer_cache.py -q
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from answer_cache import answer_key, normalize_message
+
+
+def test_normalization_ignores_case_spacing_and_trailing_punctuation():
+    assert normalize_message("  How will RAIN\n affect   this week?? ") == "how will rain affect this week"
+    assert normalize_message("What’s normal for Saturday?") == "what's normal for saturday"
+    assert normalize_message("rain on saturday") != normalize_message("snow on saturday")
+
+
+def test_key_changes_with_store_prompt_and_conversation():
+    prompt = "STORE 79609 ... forecast: Mon Heavy Rain 35-52 OC"
+    turn = [{"role": "user", "content": "How will rain affect this week?"}]
+    key = answer_key(79609, prompt, turn)
+
+    assert key == answer_key(79609, prompt, [{"role": "user", "content": "how will rain affect this week"}])
+    assert key != answer_key(80003, prompt, turn)
+    # New forecast snapshot → new system prompt → old answers no longer match
+    assert key != answer_key(79609, prompt.replace("Heavy Rain", "Clear"), turn)
+    followup = turn + [{"role": "assistant", "content": "About -3%."}, {"role": "user", "content": "And snow?"}]
+    assert key != answer_key(79609, prompt, followup)
@@ -0,0 +1,207 @@
+# tests/test_demo_api.py
+# Run: pytest tests/test_demo_api.py -q
+# Endpoint tests for demo/api.py against the local Open-Meteo and Ollama
+# stand-ins in scripts/. Needs the model pickle and processed data.
+import asyncio
+import importlib
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+for path in (DEMO, ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+DATA_FILES = (ROOT / "notebooks/valvoline_production/valvoline_models_production.pkl",
+              ROOT / "notebooks/valvoline_production/processed_data.csv",
+              ROOT / "data_raw/store_info.csv")
+if not all(p.exists() for p in DATA_FILES) and not Path("/valvoline").exists():
+    pytest.skip("model pickle and processed data not available", allow_module_level=True)
+
+import fake_ollama
+import fake_open_meteo
+
+TOKENS = 8
+
+
+@pytest.fixture(scope="module")
+def stack():
+    from fastapi.testclient import TestClient
+
+    weather = fake_open_meteo.start_in_thread()
+    llm = fake_ollama.start_in_thread(tokens=TOKENS)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPEN_METEO_URL", weather.url)
+        mp.setenv("OLLAMA_URL", llm.url)
+        mp.setenv("PRECOMPUTE_INTERVAL", "0")
+        api = importlib.import_module("api")
+        with TestClient(api.app) as client:
+            ns = SimpleNamespace(api=api, client=client, weather=weather, llm=llm)
+            yield ns
+    ns.weather.shutdown()
+    llm.shutdown()
+
+
+def _sse_events(response):
+    """data: payloads of a text/event-stream body, in order."""
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = response.text.split("\n\n")
+    assert blocks[-1] == ""
+    assert all(block.startswith("data: ") for block in blocks[:-1])
+    return [block[len("data: "):] for block in blocks[:-1]]
+
+
+def _stream_chat(client, question):
+    body = {"model": "valvoline-weather", "stream": True, "stream_options": {"include_usage": True},
+            "messages": [{"role": "user", "content": question}]}
+    response = client.post("/v1/chat/completions", json=body)
+    assert response.status_code == 200
+    events = _sse_events(response)
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant"}
+    assert chunks[-2]["choices"][0]["finish_reason"] == "stop"
+    usage_chunk = chunks[-1]
+    assert usage_chunk["choices"] == [] and "usage" in usage_chunk
+    answer = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks[1:-2])
+    return answer, usage_chunk["usage"]
+
+
+def test_streamed_chat_framing_usage_and_cached_replay(stack):
+    question = "Why would the weather affect store 79609 this week?"
+    before = stack.llm.requests
+
+    answer, usage = _stream_chat(stack.client, question)
+    assert stack.llm.requests == before + 1
+    assert answer == "".join(fake_ollama._answer_tokens(TOKENS))
+    assert usage["completion_tokens"] == TOKENS and usage["prompt_tokens"] > 0
+
+    again, usage = _stream_chat(stack.client, question)
+    assert stack.llm.requests == before + 1           # answered from the cache
+    assert again == answer and usage["cached"] is True
+
+
+def test_stream_cut_off_before_done_is_not_cached(stack):
+    question = "Should I add staff at store 79609 on Saturday?"
+    generations = stack.api.prompt_stats.totals()
+    before = stack.llm.requests
+    stack.llm.drop_after = 3
+    try:
+        answer, _ = _stream_chat(stack.client, question)
+    finally:
+        stack.llm.drop_after = None
+    assert answer.startswith("".join(fake_ollama._answer_tokens(3)))
+    assert "Ollama closed the stream" in answer
+    assert stack.api.prompt_stats.totals() == generations
+
+    answer, usage = _stream_chat(stack.client, question)
+    assert stack.llm.requests == before + 2           # generated again, not replayed
+    assert answer == "".join(fake_ollama._answer_tokens(TOKENS)) and not usage.get("cached")
+
+
+def test_fleet_week_streams_one_line_per_store_in_chunks(stack, monkeypatch):
+    api = stack.api
+    batches = []
+    predict = api.predict_forward_batch
+
+    def counting_predict(store_ids, dates, weather_list):
+        batches.append(len(set(store_ids)))
+        return predict(store_ids, dates, weather_list)
+
+    monkeypatch.setattr(api, "predict_forward_batch", counting_predict)
+    start = date.today().isoformat()
+    response = stack.client.get(f"/predict/fleet/week/{start}", params={"chunk_size": 16})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = response.text.splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == len(api.store_profiles)
+    assert sorted(r["store_id"] for r in rows) == sorted(api.store_profiles)
+    forecasts = [r for r in rows if "forecast" in r]
+    assert forecasts and all(len(r["forecast"]) == 7 and r["week_start"] == start for r in forecasts)
+    assert all(r["weekly_total"] == sum(f["predicted_oc"] for f in r["forecast"]) for r in forecasts)
+
+    assert len(batches) == -(-len(api.store_profiles) // 16)
+    assert max(batches) <= 16 and sum(batches) == len(forecasts)
+
+
+def test_fleet_week_rejects_bad_dates_and_chunk_sizes(stack):
+    assert stack.client.get("/predict/fleet/week/not-a-date").status_code == 400
+    assert stack.client.get("/predict/fleet/week/2025-01-06", params={"chunk_size": 0}).status_code == 422
+
+
+def test_unknown_stores_do_not_grow_the_prompt_cache(stack):
+    sections = stack.api.system_prompt_sections
+    before = sections.cache_info().currsize
+    for store_id in (1, 2, 3, 4):
+        response = stack.client.post("/predict/chat", json={"store_id": store_id, "message": "Busy tomorrow?"})
+        assert response.status_code == 404
+    assert sections.cache_info().currsize == before
+
+
+def test_refresh_with_weather_down_keeps_the_last_table(stack):
+    api, client = stack.api, stack.client
+    assert client.post("/forecasts/refresh").status_code == 200
+    before = client.get("/health").json()["precompute"]
+    assert before["stores"] > 0
+
+    port = stack.weather.server_address[1]
+    stack.weather.shutdown()
+    stack.weather.server_close()
+    api.weather_cache.clear()
+    try:
+        response = client.post("/forecasts/refresh")
+        after = client.get("/health").json()["precompute"]
+    finally:
+        stack.weather = fake_open_meteo.start_in_thread(port=port)
+
+    assert response.status_code == 502
+    assert after["stores"] == before["stores"] and after["refreshes"] == before["refreshes"]
+    assert after["failures"] == before["failures"] + 1
+    assert after["last_error"] == f"RuntimeError: weather for only 0 of {before['stores']} stores"
+    assert api.precomputer.lookup(79609) is not None
+
+
+def test_fleet_week_with_weather_down_does_not_retry_per_store(stack):
+    api, client = stack.api, stack.client
+    port = stack.weather.server_address[1]
+    stack.weather.shutdown()
+    stack.weather.server_close()
+    api.weather_cache.clear()
+    requests = api.upstream.counts["weather"].requests
+    try:
+        response = client.get("/predict/fleet/week/2025-03-03", params={"chunk_size": 16})
+    finally:
+        stack.weather = fake_open_meteo.start_in_thread(port=port)
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["store_id"] for r in rows) == sorted(api.store_profiles)
+    assert all(r["error"].startswith("weather unavailable") for r in rows)
+    chunks = -(-len(api.store_profiles) // 16)
+    assert api.upstream.counts["weather"].requests - requests == chunks
+
+
+def test_streamed_chat_waits_for_a_queue_slot_before_the_stream_starts(stack, monkeypatch):
+    api = stack.api
+    queue = api.AdmissionQueue(1, max_queue=1, max_wait=0.05)
+    monkeypatch.setattr(api, "llm_queue", queue)
+    body = {"model": "valvoline-weather", "stream": True,
+            "messages": [{"role": "user", "content": "Why is store 79609 quiet when it snows?"}]}
+
+    asyncio.run(queue.acquire())                      # someone else holds the only slot
+    response = stack.client.post("/v1/chat/completions", json=body)
+    assert response.status_code == 503 and int(response.headers["retry-after"]) >= 1
+    assert queue.timed_out == 1
+
+    queue.release()
+    answer, _ = _stream_chat(stack.client, body["messages"][0]["content"])
+    assert answer == "".join(fake_ollama._answer_tokens(TOKENS))
+    assert queue.active == 0 and queue.admitted == 2
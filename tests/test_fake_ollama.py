@@ -0,0 +1,54 @@
+# tests/test_fake_ollama.py
+# Run: pytest tests/test_fake_ollama.py -q
+import json
+import statistics
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "scripts") not in sys.path:
+    sys.path.append(str(ROOT / "scripts"))
+
+from fake_latency import parse_latency
+from fake_ollama import start_in_thread
+
+
+def test_latency_specs():
+    assert parse_latency(0.05)() == 0.05
+    assert parse_latency("fixed:0.05")() == 0.05
+    assert all(0.02 <= parse_latency("uniform:0.02:0.2", seed=i)() <= 0.2 for i in range(20))
+
+    tail = parse_latency("lognormal:0.1:0.5", seed=3)
+    draws = [tail() for _ in range(2000)]
+    assert statistics.median(draws) == pytest.approx(0.1, rel=0.1)
+    assert max(draws) > 3 * statistics.median(draws)
+    again = parse_latency("lognormal:0.1:0.5", seed=3)
+    assert [again() for _ in range(5)] == draws[:5]           # seeded: runs repeat
+
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1:2")
+    with pytest.raises(ValueError):
+        parse_latency("uniform:0.1")
+
+
+def test_chat_answers_like_ollama_streamed_and_not():
+    server = start_in_thread(tokens=5)
+    try:
+        body = {"model": "llama3.1:8b", "messages": [{"role": "user", "content": "How many oil changes?"}]}
+        with httpx.Client(base_url=server.url) as client:
+            whole = client.post("/api/chat", json=dict(body, stream=False)).json()
+            with client.stream("POST", "/api/chat", json=dict(body, options={"num_predict": 3})) as r:
+                chunks = [json.loads(line) for line in r.iter_lines() if line]
+            stats = client.get("/stats").json()
+    finally:
+        server.shutdown()
+
+    assert whole["done"] and whole["eval_count"] == 5 and whole["prompt_eval_count"] > 0
+    assert len(whole["message"]["content"].split()) == 5
+    assert [c["done"] for c in chunks] == [False] * 3 + [True]
+    assert chunks[-1]["eval_count"] == 3
+    assert "".join(c["message"]["content"] for c in chunks) == " ".join(whole["message"]["content"].split()[:3])
+    assert stats == {"requests": 2, "streamed": 1}
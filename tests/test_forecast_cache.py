@@ -0,0 +1,122 @@
+# tests/test_forecast_cache.py
+# Run: pytest tests/test_forecast_cache.py -q
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from forecast_cache import ForecastCache, forecast_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    cache = ForecastCache(ttl=60, clock=clock)
+    calls = []
+    key = forecast_key(38.04001, -84.54, "days", 7)
+    assert key == forecast_key(38.04, -84.54, "days", 7)
+
+    fetch = lambda: calls.append(1) or [{"tavg": 10.0}]
+    assert cache.get_or_fetch(key, fetch) == [{"tavg": 10.0}]
+    assert cache.get_or_fetch(key, fetch) == [{"tavg": 10.0}]
+    clock.now = 61
+    cache.get_or_fetch(key, fetch)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ForecastCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "forecast"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", slow_fetch)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    while cache.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == ["forecast"] * 8
+
+
+def test_failed_fetch_is_not_cached():
+    cache = ForecastCache(ttl=60)
+
+    def boom():
+        raise TimeoutError("upstream")
+
+    with pytest.raises(TimeoutError):
+        cache.get_or_fetch("k", boom)
+    assert cache.get_or_fetch("k", lambda: "ok") == "ok"
+    assert cache.stats()["errors"] == 1
+
+
+def test_async_concurrent_misses_share_one_fetch():
+    cache = ForecastCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "forecast"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch_async("k", fetch) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["forecast"] * 10
+    assert calls == [1]
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_cancelled_leader_hands_the_fetch_to_a_waiter():
+    cache = ForecastCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "forecast"
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_fetch_async("k", fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_fetch_async("k", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()                       # e.g. its client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["forecast"] * 3
+    assert calls == [1, 1]                    # the cancelled fetch, then one waiter's
+    assert cache.get("k") == "forecast"
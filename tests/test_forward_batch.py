@@ -0,0 +1,105 @@
+# tests/test_forward_batch.py
+# Run: pytest tests/test_forward_batch.py -q
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from forward_batch import UNKNOWN_CODE, EncoderTable, ForwardBatchPredictor, weather_arrays
+from store_profiles import build_store_profiles
+
+FEATURES = ["dow", "month", "is_holiday", "is_day_before_holiday", "is_christmas_week",
+            "p_abnormal", "tavg", "tmin", "tmax", "severity", "market_id",
+            "temp_x_market", "store_dow_baseline", "not_built_here"]
+
+
+class ColumnModel:
+    """Stub model: predicts one column of the feature frame plus an offset."""
+
+    def __init__(self, column, offset=0.0):
+        self.column, self.offset = column, offset
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        return frame[self.column].to_numpy() + self.offset
+
+
+def _predictor():
+    df = pd.DataFrame({"store_id": [79609, 84321], "market_id": [7, 99],
+                       "store_city": ["Lexington", "Columbus"], "store_state": ["KY", "OH"]})
+    profiles = build_store_profiles(df)
+    le_month = LabelEncoder().fit(np.array([str(m) for m in range(1, 13)]))
+    le_market = LabelEncoder().fit(np.array(["7", "12"]))
+    models = (ColumnModel("store_dow_baseline"), ColumnModel("store_dow_baseline", -5),
+              ColumnModel("store_dow_baseline", 5))
+    predictor = ForwardBatchPredictor(models, FEATURES, {"month": le_month, "market_id": le_market},
+                                      profiles, lambda store_id, dow, month: 40.0 + dow)
+    return predictor, models
+
+
+def test_weather_arrays_default_tmin_tmax():
+    wx = weather_arrays([{"tavg": 10}, {"tavg": 0, "tmin": -3, "tmax": None, "prcp": 2}])
+    assert wx["tmin"].tolist() == [5.0, -3.0]
+    assert wx["tmax"].tolist() == [15.0, 5.0]
+    assert wx["prcp"].tolist() == [0.0, 2.0]
+
+
+def test_matrix_calendar_holiday_and_encoding():
+    predictor, _ = _predictor()
+    dates = pd.to_datetime(["2026-12-24", "2026-02-10"])
+    wx = weather_arrays([{"tavg": -1, "snow": 200}, {"tavg": 36}])
+    X, extras = predictor.build_matrix([79609, 84321], dates, wx)
+    row = dict(zip(FEATURES, X[0]))
+    assert row["is_day_before_holiday"] == 1 and row["is_christmas_week"] == 1
+    assert row["p_abnormal"] == 1.0
+    # Months are string-sorted by LabelEncoder: '12' sorts before '2'
+    assert row["month"] == 3 and dict(zip(FEATURES, X[1]))["month"] == 4
+    # Interactions use the raw market id; the id itself is encoded
+    assert row["temp_x_market"] == -7.0 and row["market_id"] == 1
+    # Unknown market 99 falls back to code 0
+    assert dict(zip(FEATURES, X[1]))["market_id"] == 0
+    # freezing (+2) and heavy snow (+2); extreme heat alone is 2
+    assert extras["severity"].tolist() == [4, 2]
+    assert X[:, FEATURES.index("not_built_here")].tolist() == [0.0, 0.0]
+
+
+def test_predict_calls_each_model_once_and_orders_interval():
+    predictor, models = _predictor()
+    dates = pd.date_range("2026-03-02", periods=7)
+    out = predictor.predict([79609] * 7, dates, weather_arrays([{"tavg": 12}] * 7))
+    assert [m.calls for m in models] == [1, 1, 1]
+    assert np.all(out["lower"] <= out["pred"]) and np.all(out["pred"] <= out["upper"])
+    assert out["pred"].tolist() == [40.0 + d for d in range(7)]
+    assert np.allclose(out["pct_vs_normal"], 0.0)
+
+
+def test_store_templates_are_pre_encoded_and_not_mutated():
+    predictor, _ = _predictor()
+    template = dict(zip(FEATURES, predictor.templates[predictor.template_index[79609]]))
+    assert template["market_id"] == 1 and template["tavg"] == 0.0
+    before = predictor.templates.copy()
+    dates = pd.to_datetime(["2026-01-05", "2026-01-06"])
+    X, _ = predictor.build_matrix([79609, 79609], dates, weather_arrays([{"tavg": 5}, {"tavg": 9}]))
+    assert X[:, FEATURES.index("temp_x_market")].tolist() == [35.0, 63.0]
+    assert np.array_equal(predictor.templates, before)
+
+
+def test_encoder_table_matches_label_encoder_with_explicit_unknowns():
+    le = LabelEncoder().fit(np.array(["-1", "3", "12", "2", "40"]))
+    table = EncoderTable(le)
+    known = np.array([-1, 3, 12, 2, 40, 3.7])
+    expected = le.transform([str(int(v)) for v in known])
+    assert table.encode(known).tolist() == expected.tolist()
+    assert table.encode([7, 41, -5, np.nan, np.inf]).tolist() == [UNKNOWN_CODE] * 5
+
+    wide = EncoderTable(LabelEncoder().fit(np.array(["1", "90000000"])))
+    assert wide.dense is None
+    assert wide.encode([90000000, 1, 5]).tolist() == [1, 0, UNKNOWN_CODE]
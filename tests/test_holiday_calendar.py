@@ -0,0 +1,55 @@
+# tests/test_holiday_calendar.py
+# Run: pytest tests/test_holiday_calendar.py -q
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from holiday_calendar import DATE_COLUMNS, HOLIDAY_COLUMNS, HolidayCalendar, compute_holiday_features, to_days
+
+
+def test_calendar_lookup_matches_direct_computation():
+    calendar = HolidayCalendar(2021, 2023)
+    days = to_days(pd.date_range("2021-01-01", "2023-12-31"))
+    table = calendar.lookup(days)
+    direct = compute_holiday_features(days)
+    for col in HOLIDAY_COLUMNS:
+        assert np.array_equal(table[col], direct[col]), col
+
+
+def test_calendar_known_days_and_out_of_range_fallback():
+    calendar = HolidayCalendar(2024, 2026)
+    frame = calendar.frame(["2026-12-24", "2026-07-04", "2026-11-27", "2040-12-25", "2017-01-02"])
+    assert list(frame.columns) == list(HOLIDAY_COLUMNS)
+    # Christmas Eve: day before a holiday inside the Christmas window
+    assert frame.loc[0, "is_day_before_holiday"] == 1 and frame.loc[0, "p_abnormal"] == 1.0
+    assert frame.loc[1, "is_holiday"] == 1 and frame.loc[1, "is_july4_week"] == 1
+    # Day after Thanksgiving 2026
+    assert frame.loc[2, "is_day_after_holiday"] == 1 and frame.loc[2, "p_abnormal"] == 0.7
+    # Dates outside the precomputed span are still answered
+    assert frame.loc[3, "is_holiday"] == 1 and frame.loc[3, "is_christmas_week"] == 1
+    assert frame.loc[4, "is_holiday"] == 1
+
+
+def test_date_parts_match_pandas_inside_and_outside_the_span():
+    calendar = HolidayCalendar(2024, 2026)
+    dates = ["2024-12-30", "2026-01-01", "2026-12-31", "2040-06-15", "2017-01-01"]
+    days = to_days([pd.Timestamp(dates[0]), *dates[1:]])
+    assert days.tolist() == to_days(pd.to_datetime(dates)).tolist()
+
+    parts = calendar.date_parts(days)
+    idx = pd.DatetimeIndex(dates)
+    expected = {
+        "dow": idx.dayofweek, "month": idx.month, "year": idx.year, "day_of_year": idx.dayofyear,
+        "week_of_year": idx.isocalendar().week, "quarter": idx.quarter,
+    }
+    for col in DATE_COLUMNS:
+        assert parts[col].tolist() == list(expected[col]), col
+    # ISO weeks cross year boundaries: 2024-12-30 is week 1 of 2025
+    assert parts["week_of_year"].tolist()[:3] == [1, 1, 53]
@@ -0,0 +1,71 @@
+# tests/test_http_clients.py
+# Run: pytest tests/test_http_clients.py -q
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from http_clients import UpstreamClients, UpstreamConfig
+
+
+def test_config_reads_environment(monkeypatch):
+    monkeypatch.setenv("OLLAMA_URL", "http://gpu-box:11434/")
+    monkeypatch.setenv("OLLAMA_MAX_CONNECTIONS", "2")
+    monkeypatch.setenv("OPEN_METEO_TIMEOUT", "3.5")
+    llm = UpstreamConfig.ollama("localhost")
+    weather = UpstreamConfig.open_meteo()
+    assert (llm.base_url, llm.max_connections, llm.read_timeout) == ("http://gpu-box:11434", 2, 120.0)
+    assert (weather.base_url, weather.read_timeout) == ("https://api.open-meteo.com", 3.5)
+
+
+def test_requests_do_not_block_each_other():
+    async def slow(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    clients = UpstreamClients(UpstreamConfig("http://weather", 8, 5), UpstreamConfig("http://llm", 8, 5),
+                              transport=httpx.MockTransport(slow))
+
+    async def main():
+        t0 = time.perf_counter()
+        responses = await asyncio.gather(clients.llm.post("/api/chat"), clients.weather.get("/v1/forecast"),
+                                         clients.weather.get("/v1/forecast"))
+        elapsed = time.perf_counter() - t0
+        await clients.aclose()
+        return responses, elapsed
+
+    responses, elapsed = asyncio.run(main())
+    assert [r.json()["path"] for r in responses] == ["/api/chat", "/v1/forecast", "/v1/forecast"]
+    assert elapsed < 0.5
+
+
+def test_requests_and_failures_are_counted_per_upstream():
+    def handler(request):
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(503 if request.url.path == "/busy" else 200)
+
+    clients = UpstreamClients(UpstreamConfig("http://weather", 8, 5), UpstreamConfig("http://llm", 8, 5),
+                              transport=httpx.MockTransport(handler))
+
+    async def main():
+        await clients.weather.get("/v1/forecast")
+        await clients.llm.post("/busy")
+        try:
+            await clients.llm.post("/down")
+        except httpx.ConnectError:
+            pass
+        await clients.aclose()
+
+    asyncio.run(main())
+    assert clients.stats() == {
+        "weather": {"requests": 1, "errors": {}},
+        "llm": {"requests": 2, "errors": {"http_5xx": 1, "ConnectError": 1}},
+    }
@@ -0,0 +1,57 @@
+# tests/test_intent_router.py
+# Run: pytest tests/test_intent_router.py -q
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from intent_router import Intent, match_intent, render_answer
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+IMPACT = [
+    {"date": f"2026-03-0{i + 2}", "day": DAYS[i], "weather": "Heavy Rain" if i == 5 else "Clear",
+     "normal_oc": 45, "expected_oc": 44 if i == 5 else 45, "low_oc": 34, "high_oc": 56,
+     "pct_impact": -3.1 if i == 5 else 0.0}
+    for i in range(7)
+]
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("How many oil changes tomorrow at 79609?", Intent("day", 1, None)),
+    ("how many cars should I expect today", Intent("day", 0, None)),
+    ("Expected OC the day after tomorrow?", Intent("day", 2, None)),
+    ("how many oil changes on Saturday?", Intent("day", None, "Saturday")),
+    ("What's my weekly range?", Intent("week", None, None)),
+    ("What should I expect this week at store 79609?", Intent("week", None, None)),
+])
+def test_numeric_questions_are_recognised(question, intent):
+    assert match_intent(question) == intent
+
+
+@pytest.mark.parametrize("question", [
+    "How many oil changes should I expect tomorrow and how does the weather affect it?",
+    "It is forecasted to rain heavily this Saturday. How many compared to a normal Saturday?",
+    "Why was last week slow?",
+    "How many oil changes on Saturday and Sunday?",
+    "hello",
+])
+def test_everything_else_goes_to_the_llm(question):
+    assert match_intent(question) is None
+
+
+def test_answers_lead_with_the_range():
+    day = render_answer(Intent("day", None, "Saturday"), IMPACT, 79609, "Lexington", "KY")
+    assert day.startswith("Saturday March 7 at store 79609 (Lexington, KY): 90% confident between 34 and 56")
+    assert "-3.1% vs your normal Saturday of 45" in day
+
+    week = render_answer(Intent("week", None, None), IMPACT, 79609, "Lexington", "KY")
+    assert "90% confident between 238 and 392 oil changes in total, most likely around 314" in week
+    assert "Biggest weather effect: Saturday (Heavy Rain, -3.1%)" in week
+
+    assert render_answer(Intent("day", 9, None), IMPACT, 79609, "Lexington", "KY") is None
+    assert render_answer(Intent("day", 1, None), [], 79609, "Lexington", "KY") is None
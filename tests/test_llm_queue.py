@@ -0,0 +1,75 @@
+# tests/test_llm_queue.py
+# Run: pytest tests/test_llm_queue.py -q
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from llm_queue import BATCH, INTERACTIVE, AdmissionQueue, QueueRejected, parse_priority
+
+
+def test_interactive_requests_jump_ahead_of_batch():
+    order = []
+
+    async def job(queue, name, priority, delay):
+        await asyncio.sleep(delay)
+        async with queue.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        queue = AdmissionQueue(concurrency=1, max_queue=5)
+        await asyncio.gather(job(queue, "running", INTERACTIVE, 0), job(queue, "batch", BATCH, 0.01),
+                             job(queue, "chat", INTERACTIVE, 0.02))
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert order == ["running", "chat", "batch"]
+    assert (stats["admitted"], stats["active"], stats["queued"]) == (3, 0, 0)
+    assert stats["wait_max_ms"] >= 50
+
+
+def test_full_queue_rejects_with_429_and_timeout_with_503():
+    async def main():
+        queue = AdmissionQueue(concurrency=1, max_queue=1, max_wait=0.05)
+        await queue.acquire()
+        waiter = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(QueueRejected) as full:
+            await queue.acquire()
+        with pytest.raises(QueueRejected) as slow:
+            await waiter
+        queue.release(2.0)
+        return queue, full.value, slow.value
+
+    queue, full, slow = asyncio.run(main())
+    assert (full.status, slow.status) == (429, 503)
+    assert full.retry_after >= 1
+    assert (queue.active, queue.queued, queue.rejected, queue.timed_out) == (0, 0, 1, 1)
+
+
+def test_cancelled_waiter_does_not_leak_the_slot():
+    async def main():
+        queue = AdmissionQueue(concurrency=1, max_queue=2)
+        await queue.acquire()
+        waiter = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        queue.release()
+        await asyncio.wait_for(queue.acquire(), 0.5)
+        return queue
+
+    queue = asyncio.run(main())
+    assert (queue.active, queue.queued) == (1, 0)
+
+
+def test_priority_header_values():
+    assert parse_priority("batch") == parse_priority(" Batch ") == BATCH
+    assert parse_priority(None) == parse_priority("urgent") == INTERACTIVE
@@ -0,0 +1,39 @@
+# tests/test_llm_usage.py
+# Run: pytest tests/test_llm_usage.py -q
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from llm_usage import PromptStats, ollama_usage
+
+
+def test_usage_from_ollama_counters():
+    usage = ollama_usage({"prompt_eval_count": 1200, "eval_count": 80, "prompt_eval_duration": 900_000_000,
+                          "eval_duration": 2_000_000_000, "total_duration": 3_000_000_000})
+    assert (usage["prompt_tokens"], usage["completion_tokens"], usage["total_tokens"]) == (1200, 80, 1280)
+    assert (usage["prompt_eval_ms"], usage["eval_ms"], usage["total_ms"], usage["load_ms"]) == (900.0, 2000.0, 3000.0, 0.0)
+    # Ollama omits prompt_eval_count when the whole prompt came from its cache
+    assert ollama_usage({"eval_count": 5})["prompt_tokens"] == 0
+
+
+def test_per_store_averages_sorted_by_cost():
+    stats = PromptStats()
+    small = [{"role": "system", "content": "x" * 100}, {"role": "user", "content": "hi"}]
+    large = [{"role": "system", "content": "x" * 4000}, {"role": "user", "content": "hi"}]
+    stats.record(1, small, ollama_usage({"prompt_eval_count": 100, "prompt_eval_duration": 1e8}))
+    stats.record(2, large, ollama_usage({"prompt_eval_count": 900, "prompt_eval_duration": 9e8}))
+    stats.record(2, large, ollama_usage({"prompt_eval_count": 1100, "prompt_eval_duration": 1.1e9}))
+
+    rows = stats.per_store(sort="prompt_eval_ms")
+    assert [r["store_id"] for r in rows] == [2, 1]
+    assert (rows[0]["requests"], rows[0]["prompt_chars"], rows[0]["prompt_tokens"]) == (2, 4002, 1000)
+    assert (rows[0]["max_prompt_tokens"], rows[0]["prompt_eval_ms"]) == (1100, 1000.0)
+    assert stats.totals()["prompt_tokens"] == 2100
+    with pytest.raises(ValueError):
+        stats.per_store(sort="nope")
@@ -0,0 +1,68 @@
+# tests/test_metrics.py
+# Run: pytest tests/test_metrics.py -q
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from metrics import HTTP_LATENCY, HTTP_REQUESTS, MetricsMiddleware, Registry
+
+
+def test_histogram_and_collector_render_in_exposition_format():
+    registry = Registry()
+    latency = registry.histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 3.0):
+        latency.observe(value, stage="llm_call")
+    errors = registry.counter("errors_total", "Errors.", ("kind",))
+    errors.inc(kind='say "hi"')
+
+    @registry.collector
+    def caches():
+        yield ("cache_hit_ratio", "gauge", "Hit ratio.", [({"cache": "weather"}, 0.75)])
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="llm_call",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="llm_call",le="0.1"} 3' in text
+    assert 'stage_seconds_bucket{stage="llm_call",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="llm_call"} 4' in text
+    assert 'errors_total{kind="say \\"hi\\""} 1.0' in text
+    assert 'cache_hit_ratio{cache="weather"} 0.75' in text
+
+
+def test_middleware_labels_route_templates_and_times_streams():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item}")
+    def item(item: int):
+        return {"item": item}
+
+    @app.get("/metrics-test-stream")
+    def stream():
+        def body():
+            yield "a"
+            time.sleep(0.05)
+            yield "b"
+        return StreamingResponse(body())
+
+    with TestClient(app) as client:
+        client.get("/metrics-test/1")
+        client.get("/metrics-test/2")
+        client.get("/metrics-test/x")
+        client.get("/metrics-test-stream")
+        client.get("/nowhere")
+
+    assert HTTP_REQUESTS.value(method="GET", route="/metrics-test/{item}", status=200) == 2
+    assert HTTP_REQUESTS.value(method="GET", route="/metrics-test/{item}", status=422) == 1
+    assert HTTP_REQUESTS.value(method="GET", route="unmatched", status=404) == 1
+    assert HTTP_LATENCY.count(method="GET", route="/metrics-test-stream") == 1
+    assert HTTP_LATENCY.sum(method="GET", route="/metrics-test-stream") >= 0.05
@@ -0,0 +1,45 @@
+# tests/test_micro_benchmark.py
+# Run: pytest tests/test_micro_benchmark.py -q
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+for path in (DEMO, ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from micro_benchmark import WEEK, WEEK_TYPES, compare, measure, pick_stores
+from weather_classes import classify_weather_arrays, wx_types
+
+
+def test_measure_calibrates_and_cycles_arguments():
+    seen = []
+    result = measure(lambda x: seen.append(x), [(1,), (2,), (3,)], repeat=3, min_time=0.005)
+    assert result["calls"] > 1 and result["repeat"] == 3
+    assert result["min_us"] <= result["median_us"] <= result["max_us"]
+    assert set(seen) == {1, 2, 3}
+
+    slow = measure(lambda: time.sleep(0.002), [()], repeat=3, min_time=0.001)
+    assert slow["calls"] == 1 and slow["median_us"] >= 2000
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {"fast": {"median_us": 10.0}, "slow": {"median_us": 10.0}, "gone": {"median_us": 1.0}}
+    results = {"fast": {"median_us": 12.0}, "slow": {"median_us": 100.0}, "new": {"median_us": 5.0}}
+    rows = compare(results, baseline, threshold=0.5)
+    assert [(name, round(ratio, 2), regressed) for name, _, _, ratio, regressed in rows] == [
+        ("fast", 1.2, False), ("slow", 10.0, True)]
+
+
+def test_representative_stores_span_smallest_to_largest():
+    counts = {store: rows for store, rows in zip(range(100, 110), [50, 10, 90, 30, 70, 20, 80, 40, 60, 100])}
+    assert pick_stores(counts, 3) == [101, 100, 109]
+    assert pick_stores(counts, 1) == [108]
+    assert len(pick_stores(counts, 20)) == 10
+
+
+def test_benchmark_week_has_one_day_per_listed_weather_type():
+    columns = [[day[key] for day in WEEK] for key in ("tavg", "prcp", "snow", "wspd")]
+    assert wx_types(classify_weather_arrays(*columns)["wx_code"]) == list(WEEK_TYPES)
@@ -0,0 +1,98 @@
+# tests/test_precompute.py
+# Run: pytest tests/test_precompute.py -q
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+import precompute
+from precompute import Precomputer
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_rows_are_served_until_stale_or_next_day():
+    clock = FakeClock(datetime(2026, 3, 2, 9, 0).timestamp())
+
+    async def build():
+        return {79609: {"weather": ["w"]}}
+
+    pre = Precomputer(build, interval=600, clock=clock)
+    assert pre.lookup(79609) is None
+
+    asyncio.run(pre.refresh())
+    clock.now += 300
+    assert pre.lookup(79609) == ({"weather": ["w"]}, 300)
+    assert pre.lookup(1) is None
+
+    clock.now += 1000                     # older than max_age (2 × interval)
+    assert pre.lookup(79609) is None
+
+    asyncio.run(pre.refresh())
+    clock.now = datetime(2026, 3, 3, 0, 1).timestamp()   # forecast no longer starts today
+    assert pre.lookup(79609) is None
+    assert pre.stats()["refreshes"] == 2
+
+
+def test_background_task_retries_after_failure(monkeypatch):
+    monkeypatch.setattr(precompute, "RETRY_SECONDS", 0.01)
+    attempts = []
+
+    async def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("weather down")
+        return {79609: {}}
+
+    async def main():
+        pre = Precomputer(build, interval=10)
+        pre.start()
+        for _ in range(100):
+            if pre.table is not None:
+                break
+            await asyncio.sleep(0.01)
+        stats = pre.stats()
+        await pre.stop()
+        return pre, stats
+
+    pre, stats = asyncio.run(main())
+    assert stats["running"] and stats["stores"] == 1
+    assert stats["failures"] == 1 and stats["last_error"] is None
+    assert not pre.stats()["running"]
+
+
+def test_failed_or_empty_refresh_keeps_the_last_table():
+    results = [{79609: {"weather": ["w"]}}, {}, ConnectionError("weather down")]
+
+    async def build():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    pre = Precomputer(build, interval=600)
+    asyncio.run(pre.refresh())
+    table = pre.table
+    with pytest.raises(RuntimeError, match="no rows"):
+        asyncio.run(pre.refresh())
+    with pytest.raises(ConnectionError):
+        asyncio.run(pre.refresh())
+    assert pre.table is table
+
+    stats = pre.stats()
+    assert stats["stores"] == 1 and stats["refreshes"] == 1 and stats["failures"] == 2
+    assert stats["last_error"] == "ConnectionError: weather down"
+    assert pre.lookup(79609) is not None
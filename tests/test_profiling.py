@@ -0,0 +1,61 @@
+# tests/test_profiling.py
+# Run: pytest tests/test_profiling.py -q
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from metrics import observe_stage, stage
+from profiling import MODE_SAMPLE, MODE_TIMING, ProfileMiddleware, profile_mode, server_timing
+
+
+def test_profile_flag_and_server_timing_format():
+    assert profile_mode({"headers": [(b"x-profile", b"1")], "query_string": b""}) == MODE_TIMING
+    assert profile_mode({"headers": [], "query_string": b"a=1&profile=sample"}) == MODE_SAMPLE
+    assert profile_mode({"headers": [(b"x-profile", b"off")], "query_string": b"profile=1"}) is None
+    assert profile_mode({"headers": [], "query_string": b""}) is None
+
+    timings = [("weather_fetch", 0.1824), ("model_predict", 0.002), ("model_predict", 0.003)]
+    assert server_timing(timings, 0.25) == (
+        'weather_fetch;dur=182.4, model_predict;dur=5.0;desc="2 calls", app;dur=250.0')
+
+
+def test_profiled_requests_get_their_own_stage_breakdown(tmp_path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.add_middleware(ProfileMiddleware, profile_dir=tmp_path, interval=0.001)
+
+    @app.get("/slow")
+    def slow():                       # sync endpoint: runs in the threadpool
+        with stage("model_predict"):
+            time.sleep(0.03)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        observe_stage("store_lookup", 0.001)
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        plain = client.get("/slow")
+        timed = client.get("/fast", headers={"X-Profile": "1"})
+        sampled = client.get("/slow?profile=sample")
+
+    assert "server-timing" not in plain.headers
+    assert timed.headers["server-timing"].startswith("store_lookup;dur=1.0, app;dur=")
+    assert "model_predict" not in timed.headers["server-timing"]
+    assert sampled.headers["server-timing"].startswith("model_predict;dur=")
+
+    profile_id = sampled.headers["x-profile-id"]
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["path"] == "/slow"
+    assert [s["stage"] for s in summary["stages"]] == ["model_predict"]
+    assert summary["samples"] > 0
+    assert "slow (test_profiling.py" in (tmp_path / f"{profile_id}.collapsed").read_text()
@@ -0,0 +1,87 @@
+# tests/test_shared_models.py
+# Run: pytest tests/test_shared_models.py -q
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+lgb = pytest.importorskip("lightgbm")
+from sklearn.preprocessing import LabelEncoder
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from shared_models import (MODEL_GROUPS, load_shared_metadata, load_shared_models, shared_models_are_current,
+                           write_shared_models)
+from tree_engine import fuse_models
+
+FEATURES = ["tavg", "prcp", "market_id"]
+
+
+def _models():
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame({
+        "tavg": rng.normal(12, 10, 2000),
+        "prcp": rng.exponential(3, 2000),
+        "market_id": rng.integers(0, 20, 2000),
+    })
+    y = 40 + 0.3 * X["tavg"] - 0.5 * X["prcp"] + X["market_id"] % 4 + rng.normal(0, 2, 2000)
+
+    def fit(**params):
+        model = lgb.LGBMRegressor(n_estimators=30, num_leaves=15, verbose=-1, **params)
+        return model.fit(X, y, categorical_feature=["market_id"])
+
+    encoder = LabelEncoder().fit([str(m) for m in range(20)])
+    models = {"features": FEATURES, "forward_features": FEATURES, "categoricals": ["market_id"],
+              "label_encoders": {"market_id": encoder}}
+    for keys, _ in MODEL_GROUPS.values():
+        point, low, high = keys
+        models[point] = fit(objective="regression_l1")
+        models[low] = fit(objective="quantile", alpha=0.05)
+        models[high] = fit(objective="quantile", alpha=0.95)
+    return models, X
+
+
+def test_shared_models_are_memory_mapped_and_match_lightgbm(tmp_path):
+    models, X = _models()
+    write_shared_models(models, tmp_path)
+    shared = load_shared_models(tmp_path)
+
+    T = X.iloc[:300].to_numpy(dtype=float)
+    T[:10, 0] = np.nan
+    for name, (keys, _) in MODEL_GROUPS.items():
+        assert isinstance(shared[name].flat.nodes, np.memmap)
+        expected = fuse_models([models[k] for k in keys], FEATURES).predict(T)
+        assert np.array_equal(shared[name].predict(T), expected)
+
+
+def test_export_goes_stale_when_the_pickle_changes(tmp_path):
+    models, _ = _models()
+    pkl = tmp_path / "models.pkl"
+    pkl.write_bytes(pickle.dumps(models))
+    out = tmp_path / "shared_models"
+
+    assert not shared_models_are_current(out, pkl)
+    write_shared_models(models, out, source_pkl=pkl)
+    assert shared_models_are_current(out, pkl)
+
+    pkl.write_bytes(pickle.dumps({**models, "extra": 1}))
+    assert not shared_models_are_current(out, pkl)
+    with pytest.raises(FileNotFoundError):
+        load_shared_models(tmp_path)
+
+
+def test_metadata_loads_from_the_manifest_without_the_pickle(tmp_path):
+    models, _ = _models()
+    write_shared_models(models, tmp_path)
+    meta = load_shared_metadata(tmp_path)
+
+    assert meta["features"] == FEATURES and meta["categoricals"] == ["market_id"]
+    encoder = meta["label_encoders"]["market_id"]
+    labels = ["3", "17", "0"]
+    assert encoder.transform(labels).tolist() == models["label_encoders"]["market_id"].transform(labels).tolist()
@@ -0,0 +1,65 @@
+# tests/test_snapshot.py
+# Run: pytest tests/test_snapshot.py -q
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from snapshot import load_snapshot, snapshot_is_current, write_snapshot
+
+
+def _sample_frame():
+    return pd.DataFrame({
+        "store_id": [79609, 79609, 84321],
+        "invoice_date": pd.to_datetime(["2022-01-01", "2022-01-02", "2022-01-01"]),
+        "oc_count": [41.0, np.nan, 52.0],
+        "bay_count": [3, 3, 4],
+        "store_city": ["Lexington", "Lexington", None],
+        "store_state": ["KY", "KY", "OH"],
+    })
+
+
+def test_snapshot_roundtrip_preserves_values_and_dtypes(tmp_path):
+    df = _sample_frame()
+    write_snapshot(df, tmp_path / "snap")
+    back = load_snapshot(tmp_path / "snap")
+
+    assert list(back.columns) == list(df.columns)
+    assert back["store_id"].dtype == np.int64
+    assert back["invoice_date"].dtype == df["invoice_date"].dtype
+    assert (back["invoice_date"] == df["invoice_date"]).all()
+    assert np.allclose(back["oc_count"], df["oc_count"], equal_nan=True)
+    assert back["store_city"].iloc[0] == "Lexington"
+    assert pd.isna(back["store_city"].iloc[2])
+    assert back["store_state"].tolist() == ["KY", "KY", "OH"]
+
+
+def test_snapshot_columns_are_memory_mapped(tmp_path):
+    write_snapshot(_sample_frame(), tmp_path / "snap")
+    back = load_snapshot(tmp_path / "snap")
+    assert isinstance(back["bay_count"].values.base, np.memmap) or \
+        isinstance(back["bay_count"].values, np.memmap)
+
+
+def test_snapshot_is_stale_after_csv_changes(tmp_path):
+    csv = tmp_path / "processed_data.csv"
+    df = _sample_frame()
+    df.to_csv(csv, index=False)
+    write_snapshot(df, tmp_path / "snap", source_csv=csv)
+    assert snapshot_is_current(tmp_path / "snap", csv)
+
+    df.iloc[:2].to_csv(csv, index=False)
+    os.utime(csv, ns=(1, 1))
+    assert not snapshot_is_current(tmp_path / "snap", csv)
+
+    # Deployed image: only the snapshot ships, the CSV is absent.
+    csv.unlink()
+    assert snapshot_is_current(tmp_path / "snap", csv)
+    assert not snapshot_is_current(tmp_path / "missing", csv)
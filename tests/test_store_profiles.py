@@ -0,0 +1,56 @@
+# tests/test_store_profiles.py
+# Run: pytest tests/test_store_profiles.py -q
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from store_profiles import build_store_profiles
+
+
+def _frame():
+    return pd.DataFrame({
+        "store_id": [84321, 79609, 79609, 84321],
+        "dow": [0, 0, 1, 0],
+        "store_city": ["Columbus", "Lexington", "Lexington", "Columbus"],
+        "store_state": ["OH", "KY", "KY", "OH"],
+        "bay_count": [4, 3, 3, 4],
+        "market_id": [12, 7, 7, 12],
+        "store_rain_sensitivity": [0.95, 0.90, 0.99, 0.95],
+        "store_dow_baseline": [50.0, 40.0, 44.0, 50.0],
+    })
+
+
+def test_profiles_take_first_row_per_store_sorted_by_id():
+    df = _frame()
+    lookup = df.groupby(["store_id", "dow"])["store_dow_baseline"].first().to_dict()
+    profiles = build_store_profiles(df, lookup)
+
+    assert list(profiles) == [79609, 84321]
+    lex = profiles[79609]
+    assert (lex.city, lex.state, lex.bay_count, lex.market_id) == ("Lexington", "KY", 3, 7)
+    # First row wins, as with df[df.store_id == id].iloc[0]
+    assert lex.store_rain_sensitivity == 0.90
+    assert lex.rain_impact_pct == -10.0
+
+
+def test_missing_columns_use_endpoint_defaults():
+    profiles = build_store_profiles(_frame())
+    p = profiles[84321]
+    assert p.store_snow_sensitivity == 0.960
+    assert p.store_fleet_dependency == 0.067
+    assert p.tz_code == 0
+
+
+def test_dow_baseline_falls_back_to_store_mean():
+    df = _frame()
+    lookup = df.groupby(["store_id", "dow"])["store_dow_baseline"].first().to_dict()
+    lex = build_store_profiles(df, lookup)[79609]
+    assert lex.dow_baseline[0] == 40.0
+    assert lex.dow_baseline[1] == 44.0
+    assert lex.dow_baseline[5] == 42.0
@@ -0,0 +1,122 @@
+# tests/test_tree_engine.py
+# Run: pytest tests/test_tree_engine.py -q
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+lgb = pytest.importorskip("lightgbm")
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+MODEL_PATH = ROOT / "notebooks" / "valvoline_production" / "valvoline_models_production.pkl"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from tree_engine import CompiledModel, FlatEnsemble, FusedModel, SeparateModels, compile_model, fuse_models
+
+
+def _training_frame(n=3000, seed=7):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "tavg": rng.normal(12, 10, n),
+        "prcp": rng.exponential(3, n),
+        "snow": np.where(rng.random(n) < 0.8, 0.0, rng.exponential(50, n)),
+        "market_id": rng.integers(0, 30, n),
+        "dow": rng.integers(0, 7, n),
+    })
+    y = 40 + 0.3 * X["tavg"] - 0.5 * X["prcp"] - 0.02 * X["snow"] + X["market_id"] % 5 + 2 * (X["dow"] == 5)
+    return X, y + rng.normal(0, 2, n)
+
+
+def _fit(objective, **params):
+    X, y = _training_frame()
+    model = lgb.LGBMRegressor(objective=objective, n_estimators=60, num_leaves=31,
+                              max_depth=6, verbose=-1, **params)
+    return model.fit(X, y, categorical_feature=["market_id", "dow"]), X
+
+
+def _scoring_frame(X):
+    T = X.iloc[:400].copy()
+    T.iloc[:20, 0] = np.nan          # missing numeric
+    T.iloc[20:40, 3] = 99            # category never seen in training
+    T.iloc[40:60, 3] = np.nan        # missing category
+    return T
+
+
+@pytest.mark.parametrize("objective,params", [
+    ("regression_l1", {}),
+    ("quantile", {"alpha": 0.05}),
+    ("regression", {"zero_as_missing": True}),
+])
+def test_flat_walk_matches_lightgbm(objective, params):
+    model, X = _fit(objective, **params)
+    T = _scoring_frame(X)
+    flat = FlatEnsemble.from_lightgbm(model)
+    assert np.array_equal(flat.predict(T.to_numpy()), model.predict(T))
+
+
+def test_column_order_and_engines_agree(tmp_path):
+    model, X = _fit("regression_l1")
+    T = _scoring_frame(X)
+    features = ["dow", "snow", "market_id", "prcp", "tavg", "unused"]
+    M = T.reindex(columns=features, fill_value=0.0).to_numpy()
+    expected = model.predict(T)
+
+    for engine in CompiledModel.ENGINES:
+        assert np.array_equal(compile_model(model, features, engine).predict(M), expected)
+
+    FlatEnsemble.from_lightgbm(model, features).save(tmp_path / "fwd")
+    loaded = FlatEnsemble.load(tmp_path / "fwd")
+    assert isinstance(loaded.nodes, np.memmap)
+    assert np.array_equal(loaded.predict(M[0]), expected[:1])
+
+
+def test_non_lightgbm_model_falls_back_to_frame():
+    class Stub:
+        def predict(self, frame):
+            return frame["a"].to_numpy() * 2
+
+    wrapped = compile_model(Stub(), ["a", "b"])
+    assert wrapped.predict(np.array([[1.0, 5.0], [3.0, 5.0]])).tolist() == [2.0, 6.0]
+
+
+@pytest.mark.skipif(not MODEL_PATH.exists(), reason="production model pickle not present")
+def test_production_forward_models_parity():
+    with open(MODEL_PATH, "rb") as f:
+        models = pickle.load(f)
+    features = models["forward_features"]
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 20, (64, len(features)))
+    for j, name in enumerate(features):
+        if name in models["categoricals"]:
+            X[:, j] = rng.integers(0, 12, len(X))
+    frame = pd.DataFrame(X, columns=features)
+    for key in ("model_FWD", "model_FWD_Q05", "model_FWD_Q95"):
+        flat = FlatEnsemble.from_lightgbm(models[key], features)
+        assert np.array_equal(flat.predict(X), models[key].predict(frame))
+
+
+def test_fused_trio_matches_separate_models():
+    X, y = _training_frame()
+    trio = [lgb.LGBMRegressor(objective=obj, alpha=alpha, n_estimators=40, num_leaves=31,
+                              verbose=-1).fit(X, y, categorical_feature=["market_id", "dow"])
+            for obj, alpha in [("regression_l1", 0.5), ("quantile", 0.05), ("quantile", 0.95)]]
+    T = _scoring_frame(X)
+    expected = np.column_stack([m.predict(T) for m in trio])
+    features = ["tavg", "dow", "prcp", "snow", "market_id"]
+    M = T[features].to_numpy()
+
+    for engine in CompiledModel.ENGINES:
+        fused = fuse_models(trio, features, engine)
+        assert isinstance(fused, FusedModel)
+        assert np.array_equal(fused.predict(M), expected)
+
+    # Different iteration counts cannot share one booster; fall back per model.
+    short = lgb.LGBMRegressor(n_estimators=10, verbose=-1).fit(X, y)
+    mixed = fuse_models([trio[0], short], features)
+    assert isinstance(mixed, SeparateModels)
+    assert np.array_equal(mixed.predict(M)[:, 1], short.predict(T))
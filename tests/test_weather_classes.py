@@ -0,0 +1,52 @@
+# tests/test_weather_classes.py
+# Run: pytest tests/test_weather_classes.py -q
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+if str(DEMO) not in sys.path:
+    sys.path.append(str(DEMO))
+
+from weather_classes import WX_TYPES, classify_weather_arrays, wx_types
+
+
+def _scalar_wx_type(tavg, prcp, snow, wspd):
+    """The original per-day rules of the former scalar api.classify_weather."""
+    has_heavy_rain = prcp > 10
+    has_rain = prcp > 0.1
+    has_heavy_snow = snow > 150 and tavg <= 2
+    has_snow = snow > 0 and tavg <= 2
+    is_freezing = tavg <= 0
+    is_very_cold = 0 < tavg <= 7
+    is_hot = 27 < tavg <= 35
+    has_high_wind = wspd > 30
+    severity = (2 if is_freezing else 1 if is_very_cold else 0) + \
+        (2 if has_heavy_snow else 1 if has_snow else 0) + has_heavy_rain + has_high_wind
+    for cond, name in [(severity >= 3, "severe"), (has_heavy_snow, "heavy_snow"), (has_snow, "any_snow"),
+                       (has_heavy_rain, "heavy_rain"), (has_rain, "light_rain"), (has_high_wind, "high_wind"),
+                       (is_freezing, "freezing"), (is_very_cold, "very_cold"), (is_hot, "hot")]:
+        if cond:
+            return name
+    return "clear"
+
+
+GRID = list(itertools.product([-5, 0, 2, 5, 7, 12, 27, 30, 35, 38],
+                              [0, 0.1, 0.5, 10, 12], [0, 10, 150, 200], [0, 30, 45]))
+
+
+def test_wx_type_matches_scalar_rules_on_grid():
+    tavg, prcp, snow, wspd = (np.array(col, dtype=float) for col in zip(*GRID))
+    got = wx_types(classify_weather_arrays(tavg, prcp, snow, wspd)["wx_code"])
+    assert got == [_scalar_wx_type(*row) for row in GRID]
+
+
+def test_model_severity_counts_heat_and_caps_storm_severity_does_not():
+    out = classify_weather_arrays([38, 38, -5], [0, 12, 12], [0, 0, 200], [0, 45, 45])
+    assert out["severity"].tolist() == [2, 4, 4]
+    assert out["storm_severity"].tolist() == [0, 2, 6]
+    assert [WX_TYPES[c] for c in out["wx_code"]] == ["clear", "heavy_rain", "severe"]
+    assert out["is_extreme_heat"].tolist() == [1, 1, 0] and out["has_heavy_snow"].tolist() == [0, 0, 1]
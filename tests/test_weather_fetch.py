@@ -0,0 +1,57 @@
+# tests/test_weather_fetch.py
+# Run: pytest tests/test_weather_fetch.py -q
+import asyncio
+import sys
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demo"
+for path in (DEMO, ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from fake_open_meteo import forecast_response
+from weather_fetch import fetch_forecasts
+
+
+def _fetch(coords, handler, **kwargs):
+    async def main():
+        async with httpx.AsyncClient(base_url="http://weather", transport=httpx.MockTransport(handler)) as client:
+            return await fetch_forecasts(client, coords, **kwargs)
+    return asyncio.run(main())
+
+
+def test_locations_are_chunked_and_split_back_in_order():
+    calls = []
+
+    def handler(request):
+        query = parse_qs(request.url.query.decode())
+        calls.append(len(query["latitude"][0].split(",")))
+        return httpx.Response(200, json=forecast_response(query))
+
+    coords = [(30 + i / 100, -90 - i / 100) for i in range(250)]
+    out = _fetch(coords, handler, days=7, batch_size=100)
+
+    assert sorted(calls) == [50, 100, 100]
+    assert len(out) == 250 and all(len(days) == 7 for days in out)
+    # Each location gets its own forecast, identical to fetching it alone
+    single = _fetch([coords[137]], handler, days=7)
+    assert out[137] == single[0]
+    assert out[0] != out[1]
+
+
+def test_failed_chunk_only_affects_its_locations():
+    def handler(request):
+        query = parse_qs(request.url.query.decode())
+        if query["latitude"][0].startswith("40"):
+            return httpx.Response(503)
+        return httpx.Response(200, json=forecast_response(query))
+
+    coords = [(30.0, -90.0), (31.0, -91.0), (40.0, -80.0), (41.0, -81.0)]
+    out = _fetch(coords, handler, start="2025-01-01", end="2025-01-03", batch_size=2)
+
+    assert [len(days) for days in out[:2]] == [3, 3]
+    assert all(isinstance(e, httpx.HTTPStatusError) for e in out[2:])